@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASS 字幕文本的可见文字提取
+把事件文本拆成覆盖标签块、转义符（\\N \\n \\h）、绘图命令和可见文字，
+只把可见文字交给繁体转换，转换结果再按原来的标签结构拼回去。
+"""
+
+import re
+
+# 覆盖标签块（包括 {注释}）、换行和硬空格转义、原始换行
+_NON_TEXT = re.compile(r'\{[^}]*\}|\\[Nnh]|\n')
+# 绘图模式开关：\p1 及以上开启，\p0 关闭（不会匹配 \pos、\pbo）
+_DRAWING = re.compile(r'\\p(\d+)')
+
+
+def split_event_text(text):
+    """把事件文本拆成 [(是否需要转换, 片段), ...]，片段按顺序连接即为原文"""
+    if '{' not in text and '\\' not in text and '\n' not in text:
+        return [(bool(text.strip()), text)]
+
+    parts = []
+    drawing = False
+    pos = 0
+    for m in _NON_TEXT.finditer(text):
+        if m.start() > pos:
+            segment = text[pos:m.start()]
+            parts.append((not drawing and bool(segment.strip()), segment))
+        token = m.group()
+        if token[0] == '{':
+            for level in _DRAWING.findall(token):
+                drawing = int(level) > 0
+        parts.append((False, token))
+        pos = m.end()
+    if pos < len(text):
+        segment = text[pos:]
+        parts.append((not drawing and bool(segment.strip()), segment))
+    return parts
+
+
+def extract_runs(texts):
+    """提取一组事件文本中需要转换的文字片段
+
+    返回 (片段列表, 模板列表)，转换后的片段交给 splice_runs 拼回原来的结构。
+    片段不含换行，可以安全地按行发送。
+    """
+    runs = []
+    templates = []
+    for text in texts:
+        parts = split_event_text(text)
+        runs.extend(segment for translatable, segment in parts if translatable)
+        templates.append(parts)
+    return runs, templates
+
+
+def splice_runs(templates, converted):
+    """把转换后的片段按顺序填回模板，返回与原文一一对应的文本列表"""
+    it = iter(converted)
+    texts = []
+    for parts in templates:
+        texts.append(''.join(next(it) if translatable else segment for translatable, segment in parts))
+    return texts
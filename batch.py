@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量转换的调度、取消与进度汇总
+不依赖 PyQt5，图形界面和命令行共用：
+BatchScheduler 从惰性迭代器投放任务并限制同时执行的数量，BatchProgress 在工作线程中汇总结果，
+界面按固定频率读取快照刷新进度，不再为每个文件向界面线程发送信号。
+CancelToken 是一批任务共用的取消标记，流水线在阶段之间检查，等待在线转换的任务在取消时立即返回。
+"""
+
+import time
+import threading
+from collections import Counter
+
+from timings import BatchTimings
+
+# 保留详细信息的失败文件数上限，其余只计数
+MAX_ERROR_DETAILS = 1000
+
+
+class ConversionCancelled(Exception):
+    """转换已取消"""
+
+    def __init__(self, message='已取消'):
+        super().__init__(message)
+
+
+class CancelToken:
+    """协作式取消标记（线程安全）
+
+    取消后 cancelled 为 True，check() 抛出 ConversionCancelled；
+    register 的回调在取消时调用一次（在调用 cancel 的线程中），用于唤醒正在等待的任务。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """取消（重复调用无效果）"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            callback()
+
+    def check(self):
+        """已取消时抛出 ConversionCancelled"""
+        if self._event.is_set():
+            raise ConversionCancelled()
+
+    def wait(self, timeout):
+        """等待 timeout 秒或直到取消，返回是否已取消（可以代替 time.sleep）"""
+        return self._event.wait(timeout)
+
+    def register(self, callback):
+        """登记取消时的回调，返回注销函数；已经取消时立即调用"""
+        with self._lock:
+            if not self._event.is_set():
+                key = self._next_id
+                self._next_id += 1
+                self._callbacks[key] = callback
+                return lambda: self._unregister(key)
+        callback()
+        return lambda: None
+
+    def _unregister(self, key):
+        with self._lock:
+            self._callbacks.pop(key, None)
+
+
+class BatchScheduler:
+    """从惰性迭代器投放任务，同时执行的任务数不超过窗口大小（线程安全）
+
+    submit 为投放函数（线程池的 start 或流水线的 submit），tasks 产出要投放的任务，
+    任务在投放时才创建，结束后不再被引用，内存占用与批次大小无关。
+    每个任务结束时调用 task_done()（可在工作线程中调用），调度器随即投放下一个；
+    暂停后不再投放，已投放的任务照常完成；取消后丢弃所有未投放的任务。
+    """
+
+    def __init__(self, submit, tasks, window):
+        self.submit = submit
+        self.tasks = iter(tasks)
+        self.window = max(1, window)
+        self.in_flight = 0
+        self.paused = False
+        self.exhausted = False
+        self._lock = threading.RLock()
+
+    def start(self):
+        """开始投放任务"""
+        self.fill()
+
+    def pause(self):
+        """暂停投放新任务"""
+        with self._lock:
+            self.paused = True
+
+    def resume(self):
+        """继续投放任务"""
+        with self._lock:
+            self.paused = False
+        self.fill()
+
+    def fill(self):
+        """把执行中的任务补满窗口"""
+        with self._lock:
+            while not self.paused and not self.exhausted and self.in_flight < self.window:
+                task = next(self.tasks, None)
+                if task is None:
+                    self.exhausted = True
+                    break
+                self.in_flight += 1
+                self.submit(task)
+
+    def cancel(self):
+        """丢弃所有未投放的任务"""
+        with self._lock:
+            self.exhausted = True
+            self.tasks = iter(())
+
+    def task_done(self):
+        """一个任务结束"""
+        with self._lock:
+            self.in_flight -= 1
+        self.fill()
+
+
+def format_duration(seconds):
+    """秒数格式化为 H:MM:SS 或 M:SS"""
+    seconds = int(round(seconds))
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    if h:
+        return f"{h}:{m:02d}:{s:02d}"
+    return f"{m}:{s:02d}"
+
+
+class BatchProgress:
+    """一批文件的进度汇总（线程安全）
+
+    工作线程对每个结果记录调用 add_result，界面线程定时调用 snapshot 读取进度；
+    暂停的时间不计入速度和剩余时间的估算。取消的文件单独计数，不算作失败。
+    timings 汇总结果记录中各步骤的耗时（见 timings.BatchTimings）。
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.ok = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.lines = 0
+        self.errors = []
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._paused_at = None
+        self._paused_seconds = 0.0
+        self.timings = BatchTimings()
+
+    def add_result(self, result):
+        """记录一个文件的结果"""
+        with self._lock:
+            self.done += 1
+            if result['ok']:
+                self.ok += 1
+                self.lines += result.get('lines', 0)
+            elif result.get('cancelled'):
+                self.cancelled += 1
+            else:
+                self.failed += 1
+                if len(self.errors) < MAX_ERROR_DETAILS:
+                    self.errors.append((result['path'], result['message']))
+        self.timings.add(result)
+
+    def cancel_remaining(self):
+        """把还没有结果的文件全部记为取消（取消批次、已投放的任务都交回结果之后调用）"""
+        with self._lock:
+            self.cancelled += self.total - self.done
+            self.done = self.total
+
+    def pause(self):
+        with self._lock:
+            if self._paused_at is None:
+                self._paused_at = time.perf_counter()
+
+    def resume(self):
+        with self._lock:
+            if self._paused_at is not None:
+                self._paused_seconds += time.perf_counter() - self._paused_at
+                self._paused_at = None
+
+    def snapshot(self):
+        """当前进度：完成数、成功/失败/取消数、字幕条数、速度（文件/秒、行/秒）和剩余时间（秒，未知时为 None）"""
+        with self._lock:
+            done, ok, failed, cancelled, lines = self.done, self.ok, self.failed, self.cancelled, self.lines
+            now = self._paused_at or time.perf_counter()
+            elapsed = now - self._start - self._paused_seconds
+        files_per_sec = done / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - done
+        return {
+            'total': self.total,
+            'done': done,
+            'ok': ok,
+            'failed': failed,
+            'cancelled': cancelled,
+            'lines': lines,
+            'elapsed': elapsed,
+            'files_per_sec': files_per_sec,
+            'lines_per_sec': lines / elapsed if elapsed > 0 else 0.0,
+            'eta': remaining / files_per_sec if files_per_sec > 0 and remaining > 0 else None,
+            'finished': done >= self.total,
+        }
+
+    def error_summary(self):
+        """失败信息汇总：相同的错误合并计数，后面附逐个文件的详情"""
+        with self._lock:
+            errors = list(self.errors)
+            failed = self.failed
+        lines = [f"{count} 个文件: {message}" for message, count in Counter(m for _, m in errors).most_common()]
+        lines.append('')
+        lines.extend(f"{path}: {message}" for path, message in errors)
+        if failed > len(errors):
+            lines.append(f"……其余 {failed - len(errors)} 个失败文件未列出")
+        return '\n'.join(lines)
@@ -0,0 +1,1130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换性能基准测试
+生成测试字幕语料，测量进程池引擎从 1 个核心扩展到 N 个核心的吞吐量
+
+用法:
+  python benchmark.py scaling [--files 10000] [--max-workers N]
+  python benchmark.py fastpath [--files 200]
+  python benchmark.py streaming [--size-mb 200]
+  python benchmark.py zhconvert [--size-mb 8] [--corpus 文本文件] [--compare-online] [--capture 输出文件]
+  python benchmark.py client [--requests 200] [--threads 8] [--error-rate 0.1]
+  python benchmark.py chunking [--lines 20000] [--chunk-chars 20000]
+  python benchmark.py payload [--events 5000] [--ass 字幕.ass]
+  python benchmark.py restyle [--events 50000]
+  python benchmark.py incremental [--files 100000]
+  python benchmark.py pipeline [--files 2000] [--read-latency 0.005]
+  python benchmark.py startup [--runs 5] [--max-ms 1000]
+  python benchmark.py suite [--seed 0] [--scale 1.0] [--classes tiny episode ...] [--output 结果.json]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import tempfile
+
+import zhlocal
+import converter
+import pipeline
+from engine import ProcessPoolEngine, run_jobs
+from manifest import IncrementalTracker
+from converter import (DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE, DEFAULT_SUBTITLE_COLOR, DEFAULT_OUTLINE_COLOR,
+                       convert_file, convert_texts_to_china)
+
+
+def format_srt_time(ms):
+    """毫秒转 SRT 时间格式"""
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+def write_srt(path, events, rng):
+    """写入一个随机内容的 SRT 文件"""
+    lines = []
+    t = 0
+    for i in range(1, events + 1):
+        start = t + rng.randint(100, 2000)
+        end = start + rng.randint(800, 4000)
+        t = end
+        text = ''.join(rng.choice('字幕測試轉換繁體中文abcdefg ') for _ in range(rng.randint(5, 30)))
+        lines.append(f"{i}\n{format_srt_time(start)} --> {format_srt_time(end)}\n{text}\n")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def write_large_srt(path, size_mb, rng):
+    """逐条写入一个指定大小的 SRT 文件，生成过程本身不占用大量内存"""
+    limit = size_mb * 1024 * 1024
+    t = 0
+    i = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while f.tell() < limit:
+            i += 1
+            start = t + rng.randint(100, 2000)
+            end = start + rng.randint(800, 4000)
+            t = end % (9 * 3600000)
+            text = ''.join(rng.choice('字幕測試轉換繁體中文abcdefg ') for _ in range(rng.randint(5, 30)))
+            f.write(f"{i}\n{format_srt_time(start)} --> {format_srt_time(end)}\n{text}\n\n")
+    return i
+
+
+def peak_rss_mb():
+    """当前进程的峰值内存（MB），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def make_scaling_corpus(directory, files, events, seed=0):
+    """生成扩展性测试用的语料，返回文件路径列表"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, f"sub_{i:06d}.srt")
+        write_srt(path, events, rng)
+        paths.append(path)
+    return paths
+
+
+# 快速路径黄金语料：覆盖 pysubs2 解析器的各种边界情况
+GOLDEN_SAMPLES = {
+    'basic.srt': "1\n00:00:01,000 --> 00:00:02,500\n你好，世界\n第二行\n\n2\n00:00:03,000 --> 00:00:04,000\nHello\n",
+    'crlf_bom.srt': "\ufeff1\r\n00:00:01,000 --> 00:00:02,000\r\n繁體中文\r\n\r\n2\r\n00:00:02,500 --> 00:00:03,000\r\nline\r\n",
+    'html.srt': "1\n00:00:01,000 --> 00:00:02,000\n<i>斜体</i> < b >粗</ b> <font color=\"red\">红</font> <u>u</u><s>s</s>\n",
+    'empty_cue.srt': "1\n00:00:01,000 --> 00:00:02,000\n\n2\n00:00:03,000 --> 00:00:04,000\ntext\n\n3\n00:00:05,000 --> 00:00:06,000\n\n\n",
+    'short_times.srt': "1\n0:0:1.5 --> 0:0:2.25\nshort\n2\n00:00:03,999 --> 00:00:04,995\nrounding\n",
+    'no_trailing_newline.srt': "1\n00:00:01,000 --> 00:00:02,000\nlast line",
+    'numbers_in_text.srt': "1\n00:00:01,000 --> 00:00:02,000\n2024\n年\n\n2\n00:00:03,000 --> 00:00:04,000\n100\n",
+    'commas.srt': "1\n00:00:01,000 --> 00:00:02,000\na, b, c {\\an8}tag\n",
+    'really_ass.srt': "[Script Info]\nScriptType: v4.00+\n\n[V4+ Styles]\nFormat: Name, Fontname\n\n[Events]\n"
+                      "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+                      "Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,ass\n",
+    'overflow.srt': "1\n11:00:00,000 --> 11:00:01,000\ntoo late\n",
+    'basic.vtt': "WEBVTT\n\n00:01.000 --> 00:02.000\nhi vtt\n\nintro\n01:00:03.000 --> 01:00:04.500 align:start\n<c.yellow>彩色</c> <i>it</i>\n",
+    'crlf.vtt': "WEBVTT\r\n\r\nNOTE comment\r\n\r\n00:00:01.000 --> 00:00:02.000\r\nline1\r\nline2\r\n",
+    'blank_first_line.srt': "1\n00:00:01,000 --> 00:00:02,000\n\nafter blank\n\n2\n00:00:03,000 --> 00:00:04,000\n  \nindented\n",
+    'odd_timing.srt': "1\n00:00:01,000 --> 00:00:02,000 X1:100 X2:200\ncoords\n\n2\n00:00:03,000-->00:00:04,000\nno spaces\n",
+    'timestamps_in_text.srt': "1\n00:00:01,000 --> 00:00:02,000\nat 00:00:05,000 and 00:00:06,000\n\n"
+                              "2\n00:00:03,000 --> 00:00:04,000\nnote: 12:30\n",
+    'vtt_hours.vtt': "WEBVTT\n\n1:00:01.000 --> 1:00:02.50\nshort hours\n\n100:00:00.000 --> 100:00:01.000\nlong hours\n",
+}
+
+
+def make_golden_corpus(directory, files, seed=0):
+    """生成快速路径对比语料：固定边界样例 + 随机 SRT / VTT 文件（每个 200~600 条，相当于一集剧集）"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, content in GOLDEN_SAMPLES.items():
+        path = os.path.join(directory, name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        paths.append(path)
+    for i in range(files):
+        path = os.path.join(directory, f"random_{i:05d}.srt")
+        write_srt(path, rng.randint(200, 600), rng)
+        if i % 2:
+            # 转成 VTT 格式
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            os.remove(path)
+            path = path[:-4] + '.vtt'
+            content = "WEBVTT\n\n" + re.sub(r"(\d{2}:\d{2}:\d{2}),(\d{3})", r"\1.\2", content)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        paths.append(path)
+    return paths
+
+
+def run_fastpath(args):
+    """对比快速路径与 pysubs2 路径：输出必须逐字节一致，并测量速度"""
+    work_dir = tempfile.mkdtemp(prefix='toass-bench-')
+    try:
+        paths = make_golden_corpus(os.path.join(work_dir, 'in'), args.files)
+        options = default_options()
+        options['insert_options'] = ['片头']
+        options['subtitle_configs'] = [{
+            'name': '片头', 'start_time': '00:00:00.000', 'end_time': '00:00:05.000',
+            'ass_statement': '{\\an8\\fad(200,200)}插入字幕'
+        }]
+
+        # 边界样例只用于一致性检查，计时只统计随机生成的常规文件
+        timed_paths = [p for p in paths if os.path.basename(p).startswith('random_')]
+        timings = {}
+        outputs = {}
+        for mode, fast in (('pysubs2', False), ('fastpath', True)):
+            out_dir = os.path.join(work_dir, mode)
+            os.makedirs(out_dir)
+            for path in paths:
+                convert_file(path, os.path.join(out_dir, os.path.basename(path) + '.ass'),
+                             fast_path=fast, **options)
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for path in timed_paths:
+                    convert_file(path, os.path.join(out_dir, os.path.basename(path) + '.ass'),
+                                 fast_path=fast, **options)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[mode] = best
+            outputs[mode] = out_dir
+
+        mismatches = []
+        for path in paths:
+            name = os.path.basename(path) + '.ass'
+            with open(os.path.join(outputs['pysubs2'], name), 'rb') as f:
+                expected = f.read()
+            with open(os.path.join(outputs['fastpath'], name), 'rb') as f:
+                actual = f.read()
+            if expected != actual:
+                mismatches.append(os.path.basename(path))
+
+        result = {
+            'benchmark': 'fastpath',
+            'files': len(paths),
+            'timed_files': len(timed_paths),
+            'pysubs2_ms_per_file': round(timings['pysubs2'] / len(timed_paths) * 1000, 3),
+            'fastpath_ms_per_file': round(timings['fastpath'] / len(timed_paths) * 1000, 3),
+            'speedup': round(timings['pysubs2'] / timings['fastpath'], 2),
+            'min_speedup': args.min_speedup,
+            'mismatches': mismatches,
+        }
+        result['speedup_met'] = result['speedup'] >= args.min_speedup
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 1 if mismatches or not result['speedup_met'] else 0
+
+
+def run_convert_one(args):
+    """在独立进程中转换单个文件并报告耗时和峰值内存（供 streaming 测试调用）"""
+    start = time.perf_counter()
+    convert_file(args.input, args.output, streaming=args.stream, **default_options())
+    print(json.dumps({'seconds': round(time.perf_counter() - start, 3), 'peak_rss_mb': peak_rss_mb()}))
+    return 0
+
+
+def run_streaming(args):
+    """对比流式转换和整体读入的峰值内存"""
+    import subprocess
+
+    work_dir = tempfile.mkdtemp(prefix='toass-bench-')
+    try:
+        path = os.path.join(work_dir, 'huge.srt')
+        print(f"生成 {args.size_mb} MB 的 SRT 文件 ...", file=sys.stderr)
+        events = write_large_srt(path, args.size_mb, random.Random(0))
+
+        results = {}
+        for mode, flag in (('streaming', '--stream'), ('in_memory', '--no-stream')):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '_convert-one', path,
+                 os.path.join(work_dir, f'{mode}.ass'), flag],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[mode] = json.loads(output)
+            print(f"{mode:>10}: {results[mode]['seconds']:.2f}s  峰值内存 {results[mode]['peak_rss_mb']} MB",
+                  file=sys.stderr)
+
+        print(json.dumps({'benchmark': 'streaming', 'size_mb': args.size_mb, 'events': events,
+                          'results': results}, ensure_ascii=False, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+def make_traditional_lines(size_mb, rng):
+    """用离线词典中的繁体词条拼出指定大小的字幕文本行"""
+    words = []
+    for group in zhlocal.CONVERSION_CHAIN:
+        for name in group:
+            words.extend(zhlocal.load_dictionary(name))
+    words.extend(['，', '。', '！', '？', '…', 'OK', ' ', '的', '了', '我們'])
+
+    lines = []
+    size = 0
+    target = size_mb * 1024 * 1024
+    while size < target:
+        line = ''.join(rng.choice(words) for _ in range(rng.randint(4, 16)))
+        lines.append(line)
+        size += len(line.encode('utf-8')) + 1
+    return lines
+
+
+def online_options(args):
+    """命令行指定的在线转换参数（未指定的使用默认值）"""
+    options = {}
+    if args.url:
+        options['url'] = args.url
+    if args.proxy is not None:
+        options['proxy'] = args.proxy
+    return options
+
+
+def capture_online(lines, path, options):
+    """用在线转换（繁化姬）转换语料，逐行写入 path，作为离线转换一致性测试的期望结果"""
+    print(f"在线转换 {len(lines)} 行 ...", file=sys.stderr)
+    online = convert_texts_to_china(lines, 'online', options)
+    if len(online) != len(lines):
+        print(f"在线转换返回 {len(online)} 行，与语料的 {len(lines)} 行不一致", file=sys.stderr)
+        return 1
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(online) + '\n')
+    print(json.dumps({'benchmark': 'zhconvert', 'captured': len(online), 'output': path}, ensure_ascii=False))
+    return 0
+
+
+def run_zhconvert(args):
+    """测量离线繁体中国化的词典加载时间和吞吐量，可选与在线转换结果对比"""
+    if args.corpus:
+        with open(args.corpus, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    else:
+        lines = make_traditional_lines(args.size_mb, random.Random(0))
+    if args.capture:
+        return capture_online(lines, args.capture, online_options(args))
+    text = '\n'.join(lines)
+    size = len(text.encode('utf-8'))
+
+    start = time.perf_counter()
+    converter = zhlocal.LocalConverter()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        converted = converter.convert(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    result = {
+        'benchmark': 'zhconvert',
+        'lines': len(lines),
+        'bytes': size,
+        'load_ms': round(load_ms, 2),
+        'seconds': round(best, 4),
+        'mb_per_second': round(size / best / 1024 / 1024, 2),
+        'lines_preserved': converted.count('\n') == text.count('\n'),
+    }
+
+    if args.compare_online:
+        # 在线转换需要网络和代理，只对前若干行做对比
+        sample = lines[:args.compare_lines]
+        print(f"在线转换 {len(sample)} 行用于对比 ...", file=sys.stderr)
+        online = convert_texts_to_china(sample, 'online', online_options(args))
+        local = convert_texts_to_china(sample, 'local')
+        diffs = [{'source': src, 'local': a, 'online': b}
+                 for src, a, b in zip(sample, local, online) if a != b]
+        result['compare'] = {
+            'lines': len(sample),
+            'online_lines': len(online),
+            'matched': len(sample) - len(diffs),
+            'match_rate': round((len(sample) - len(diffs)) / max(1, len(sample)), 4),
+            'diffs': diffs[:20],
+        }
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+def run_client(args):
+    """用本地模拟服务测试在线转换客户端：连接复用的吞吐量、限速和出错重试"""
+    from concurrent.futures import ThreadPoolExecutor
+    import zhclient
+    import zhserver
+    from converter import ZHCONVERT_OPTIONS
+
+    server = zhserver.start_server(latency=args.latency, error_rate=args.error_rate,
+                                   throttle_rate=args.throttle_rate)
+    lines = make_traditional_lines(1, random.Random(0))
+    texts = ['\n'.join(lines[i * args.lines:(i + 1) * args.lines]) for i in range(args.requests)]
+
+    def run(make_client):
+        clients = []
+        failed = 0
+
+        def convert(text):
+            client = make_client()
+            clients.append(client)
+            return client.convert(text, ZHCONVERT_OPTIONS)
+
+        connections = server.stats['connections']
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as executor:
+            futures = [executor.submit(convert, text) for text in texts]
+            for future in futures:
+                if future.exception() is not None:
+                    failed += 1
+        elapsed = time.perf_counter() - start
+
+        metrics = clients[0].metrics() if len(set(map(id, clients))) == 1 else None
+        for client in set(clients):
+            client.close()
+        return {
+            'seconds': round(elapsed, 3),
+            'requests_per_second': round(len(texts) / elapsed, 1),
+            'failed': failed,
+            'connections': server.stats['connections'] - connections,
+            'client': metrics,
+        }
+
+    try:
+        results = {}
+        # 每个请求新建连接（相当于原来直接调用 requests.post）
+        results['no_pooling'] = run(lambda: zhclient.ZhConvertClient(
+            server.url, proxy='', retries=args.retries, backoff=0.05))
+        shared = zhclient.ZhConvertClient(server.url, proxy='', gzip_body=args.gzip, rate=args.rate,
+                                          burst=args.threads, retries=args.retries, backoff=0.05,
+                                          pool_size=args.threads)
+        results['pooled'] = run(lambda: shared)
+        for name, result in results.items():
+            print(f"{name:>10}: {result['requests_per_second']} 请求/秒，连接 {result['connections']}，失败 {result['failed']}", file=sys.stderr)
+
+        print(json.dumps({'benchmark': 'client', 'requests': len(texts), 'threads': args.threads,
+                          'latency': args.latency, 'error_rate': args.error_rate,
+                          'throttle_rate': args.throttle_rate, 'results': results,
+                          'server': server.stats}, ensure_ascii=False, indent=2))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+def run_chunking(args):
+    """用本地模拟服务对比超长文本整体发送和分块并发发送的耗时，并检查逐行对应"""
+    import zhclient
+    import zhserver
+    import zhdispatch
+    from converter import ZHCONVERT_OPTIONS
+
+    server = zhserver.start_server(latency=args.latency, latency_per_kchar=args.latency_per_kchar)
+    lines = make_traditional_lines(64, random.Random(0))[:args.lines]
+    expected = [zhlocal.convert_to_china_text(line) for line in lines]
+    client = zhclient.ZhConvertClient(server.url, proxy='', pool_size=max(args.concurrency))
+
+    def convert(text, abandoned=None):
+        return client.convert(text, ZHCONVERT_OPTIONS, abandoned)
+
+    try:
+        modes = [('single_request', sum(len(line) + 10 for line in lines), 1)]
+        modes += [(f'chunked_x{n}', args.chunk_chars, n) for n in args.concurrency]
+        results = {}
+        for name, max_payload, concurrency in modes:
+            dispatcher = zhdispatch.ConversionDispatcher(convert, max_payload, concurrency)
+            start = time.perf_counter()
+            converted = dispatcher.convert(lines)
+            elapsed = time.perf_counter() - start
+            results[name] = {
+                'seconds': round(elapsed, 3),
+                'requests': dispatcher.requests,
+                'aligned': converted == expected,
+            }
+            print(f"{name:>15}: {elapsed:.2f}s，{dispatcher.requests} 个请求", file=sys.stderr)
+
+        print(json.dumps({'benchmark': 'chunking', 'lines': len(lines),
+                          'chars': sum(len(line) for line in lines), 'chunk_chars': args.chunk_chars,
+                          'latency': args.latency, 'latency_per_kchar': args.latency_per_kchar,
+                          'results': results}, ensure_ascii=False, indent=2))
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+    return 0 if all(result['aligned'] for result in results.values()) else 1
+
+
+def make_typesetting_events(events, rng):
+    """生成特效字幕风格的事件文本：大量覆盖标签、逐字特效和绘图事件"""
+    words = list(zhlocal.load_dictionary('TSPhrases.txt'))
+    texts = []
+    for i in range(events):
+        kind = i % 4
+        if kind == 0:
+            # 定位、淡入淡出、字体和颜色
+            texts.append('{\\fn方正粗圓_GBK\\fs60\\pos(%d,%d)\\fad(200,200)\\blur3\\c&H%06X&\\3c&H000000&}%s\\N%s' % (
+                rng.randint(0, 1920), rng.randint(0, 1080), rng.randint(0, 0xFFFFFF),
+                rng.choice(words), rng.choice(words)))
+        elif kind == 1:
+            # 逐字卡拉OK
+            texts.append(''.join('{\\k%d\\t(0,%d,\\fscx120\\fscy120)}%s' % (rng.randint(10, 60), rng.randint(100, 500), ch)
+                                 for ch in rng.choice(words)))
+        elif kind == 2:
+            # 绘图事件
+            points = ' '.join('l %d %d' % (rng.randint(0, 500), rng.randint(0, 500)) for _ in range(20))
+            texts.append('{\\an7\\pos(0,0)\\bord0\\shad0\\p1}m 0 0 %s{\\p0}' % points)
+        else:
+            # 普通对白
+            texts.append(rng.choice(words) + '，' + rng.choice(words))
+    return texts
+
+
+def run_payload(args):
+    """对比发送完整事件文本和只发送可见文字时的转换数据量"""
+    import asstext
+    import pysubs2
+
+    if args.ass:
+        texts = [event.text for event in pysubs2.load(args.ass, encoding='utf-8').events]
+    else:
+        texts = make_typesetting_events(args.events, random.Random(0))
+
+    start = time.perf_counter()
+    runs, _ = asstext.extract_runs(texts)
+    extract_ms = (time.perf_counter() - start) * 1000
+
+    raw_chars = len('\n'.join(texts))
+    sent_chars = len('\n'.join(runs))
+    print(json.dumps({
+        'benchmark': 'payload',
+        'events': len(texts),
+        'raw_chars': raw_chars,
+        'text_runs': len(runs),
+        'sent_chars': sent_chars,
+        'reduction': round(raw_chars / max(1, sent_chars), 2),
+        'extract_ms': round(extract_ms, 2),
+    }, ensure_ascii=False, indent=2))
+    return 0
+
+
+def run_restyle(args):
+    """ASS 转 ASS：对比只改文件头的路径与 pysubs2 完整路径的速度，并检查两者的样式和事件一致"""
+    import pysubs2
+
+    work_dir = tempfile.mkdtemp(prefix='toass-bench-')
+    try:
+        subs = pysubs2.SSAFile()
+        subs.info['PlayResX'] = '1280'
+        subs.info['PlayResY'] = '720'
+        for i, text in enumerate(make_typesetting_events(args.events, random.Random(0))):
+            subs.events.append(pysubs2.SSAEvent(start=i * 100, end=i * 100 + 2000, text=text))
+        path = os.path.join(work_dir, 'typeset.ass')
+        subs.save(path)
+
+        timings = {}
+        outputs = {}
+        for mode, fast in (('pysubs2', False), ('restyle', True)):
+            outputs[mode] = os.path.join(work_dir, f'{mode}.ass')
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                convert_file(path, outputs[mode], fast_path=fast, **default_options())
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[mode] = best
+
+        expected = pysubs2.load(outputs['pysubs2'])
+        actual = pysubs2.load(outputs['restyle'])
+        equal = (expected.styles == actual.styles and expected.events == actual.events
+                 and all(expected.info.get(key) == actual.info.get(key) for key in ('PlayResX', 'PlayResY')))
+        print(json.dumps({
+            'benchmark': 'restyle',
+            'events': args.events,
+            'size_mb': round(os.path.getsize(path) / (1024 * 1024), 2),
+            'pysubs2_ms': round(timings['pysubs2'] * 1000, 2),
+            'restyle_ms': round(timings['restyle'] * 1000, 2),
+            'speedup': round(timings['pysubs2'] / timings['restyle'], 2),
+            'equal': equal,
+        }, ensure_ascii=False, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0 if equal else 1
+
+
+def default_options():
+    """基准测试使用的转换选项（不做繁体转换，避免网络影响）"""
+    return {
+        'insert_options': [],
+        'subtitle_configs': [],
+        'subtitle_color': DEFAULT_SUBTITLE_COLOR,
+        'outline_color': DEFAULT_OUTLINE_COLOR,
+        'delete_original': False,
+        'convert_to_china': False,
+        'font_family': DEFAULT_FONT_FAMILY,
+        'font_size': DEFAULT_FONT_SIZE,
+    }
+
+
+def worker_counts(max_workers):
+    """1, 2, 4, ... 直到 max_workers"""
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def run_scaling(args):
+    """测量进程池引擎在不同进程数下的吞吐量"""
+    work_dir = tempfile.mkdtemp(prefix='toass-bench-')
+    try:
+        print(f"生成语料: {args.files} 个文件，每个 {args.events} 条字幕 ...", file=sys.stderr)
+        paths = make_scaling_corpus(os.path.join(work_dir, 'in'), args.files, args.events)
+        out_dir = os.path.join(work_dir, 'out')
+        os.makedirs(out_dir)
+        jobs = [(p, os.path.join(out_dir, os.path.basename(p)[:-4] + '.ass')) for p in paths]
+        options = default_options()
+
+        rows = []
+        baseline = None
+        for workers in worker_counts(args.max_workers):
+            with ProcessPoolEngine(workers) as engine:
+                # 预热：确保进程已启动并导入依赖
+                list(engine.run(jobs[:workers], options, chunksize=1))
+                start = time.perf_counter()
+                failed = sum(1 for r in engine.run(jobs, options) if not r['ok'])
+                elapsed = time.perf_counter() - start
+            files_per_sec = len(jobs) / elapsed
+            baseline = baseline or files_per_sec
+            row = {
+                'workers': workers,
+                'seconds': round(elapsed, 3),
+                'files_per_sec': round(files_per_sec, 1),
+                'speedup': round(files_per_sec / baseline, 2),
+                'failed': failed,
+            }
+            rows.append(row)
+            print(f"{workers:>3} 进程: {elapsed:8.2f}s  {files_per_sec:9.1f} 文件/秒  加速比 {row['speedup']:.2f}x",
+                  file=sys.stderr)
+
+        print(json.dumps({'benchmark': 'scaling', 'files': args.files, 'events': args.events, 'results': rows},
+                         ensure_ascii=False, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+def run_incremental(args):
+    """全量转换后测量没有变化时增量转换的检查耗时"""
+    work_dir = tempfile.mkdtemp(prefix='toass-bench-')
+    try:
+        print(f"生成语料: {args.files} 个文件，每个 {args.events} 条字幕 ...", file=sys.stderr)
+        paths = make_scaling_corpus(os.path.join(work_dir, 'in'), args.files, args.events)
+        out_dir = os.path.join(work_dir, 'out')
+        os.makedirs(out_dir)
+        jobs = [(p, os.path.join(out_dir, os.path.basename(p)[:-4] + '.ass')) for p in paths]
+        options = default_options()
+
+        # 首次全量转换并写入清单
+        start = time.perf_counter()
+        tracker = IncrementalTracker(options)
+        pending, _ = tracker.filter(jobs)
+        with ProcessPoolEngine(args.workers or None) as engine:
+            for result in engine.run(pending, options):
+                if result['ok']:
+                    tracker.record(result['output'])
+        tracker.save()
+        full_seconds = time.perf_counter() - start
+        print(f"全量转换: {full_seconds:.2f}s", file=sys.stderr)
+
+        def check():
+            start = time.perf_counter()
+            pending, skipped = IncrementalTracker(options).filter(jobs)
+            return time.perf_counter() - start, len(pending), len(skipped)
+
+        rows = {}
+        # 没有任何变化：只比较大小和修改时间
+        rows['unchanged'] = check()
+        # 修改时间变化但内容相同（例如重新复制）：需要计算哈希
+        touched = jobs[:args.touched]
+        for src, _ in touched:
+            os.utime(src)
+        rows['touched'] = check()
+        # 设置改变：所有文件都需要重新转换
+        options = dict(options, font_size=options['font_size'] + 1)
+        rows['settings_changed'] = check()
+
+        results = {}
+        for name, (seconds, pending_count, skipped_count) in rows.items():
+            results[name] = {
+                'seconds': round(seconds, 3),
+                'files_per_sec': round(len(jobs) / seconds, 1),
+                'pending': pending_count,
+                'skipped': skipped_count,
+            }
+            print(f"{name:>16}: {seconds:8.3f}s  需要转换 {pending_count}  跳过 {skipped_count}", file=sys.stderr)
+
+        print(json.dumps({'benchmark': 'incremental', 'files': args.files, 'events': args.events,
+                          'touched': len(touched), 'full_seconds': round(full_seconds, 3), 'results': results},
+                         ensure_ascii=False, indent=2))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+def run_pipeline(args):
+    """对比每个线程完整转换一个文件与分阶段流水线，可模拟网络盘的读写延迟"""
+    work_dir = tempfile.mkdtemp(prefix='toass-bench-')
+    original_read, original_write = converter.read_source, converter.write_output
+
+    # 模拟慢速存储：在读取和写入时加入固定延迟（两种方式共用同一组函数）
+    def slow_read(path):
+        time.sleep(args.read_latency)
+        return original_read(path)
+
+    def slow_write(path, content):
+        time.sleep(args.write_latency)
+        original_write(path, content)
+
+    converter.read_source = pipeline.read_source = slow_read
+    converter.write_output = pipeline.write_output = slow_write
+    try:
+        print(f"生成语料: {args.files} 个文件，每个 {args.events} 条字幕 ...", file=sys.stderr)
+        paths = make_scaling_corpus(os.path.join(work_dir, 'in'), args.files, args.events)
+        out_dir = os.path.join(work_dir, 'out')
+        os.makedirs(out_dir)
+        jobs = [(p, os.path.join(out_dir, os.path.basename(p)[:-4] + '.ass')) for p in paths]
+        plan = converter.as_plan(default_options())
+
+        # 原来的方式：线程池中每个任务依次读取、解析、生成、写入一个文件
+        from concurrent.futures import ThreadPoolExecutor
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as executor:
+            list(executor.map(lambda job: converter.convert_with_plan(job[0], job[1], plan), jobs))
+        per_file_seconds = time.perf_counter() - start
+
+        stage_stats = {}
+        start = time.perf_counter()
+        failed = sum(1 for r in run_jobs(jobs, plan, stage_stats) if not r['ok'])
+        pipeline_seconds = time.perf_counter() - start
+
+        print(f"每文件一个任务（{args.threads} 线程）: {per_file_seconds:.2f}s", file=sys.stderr)
+        print(f"分阶段流水线: {pipeline_seconds:.2f}s  {pipeline.format_stage_stats(stage_stats)}", file=sys.stderr)
+        print(json.dumps({
+            'benchmark': 'pipeline',
+            'files': args.files,
+            'read_latency': args.read_latency,
+            'write_latency': args.write_latency,
+            'per_file': {'threads': args.threads, 'seconds': round(per_file_seconds, 3),
+                         'files_per_sec': round(len(jobs) / per_file_seconds, 1)},
+            'pipeline': {'seconds': round(pipeline_seconds, 3), 'files_per_sec': round(len(jobs) / pipeline_seconds, 1),
+                         'failed': failed, 'stages': pipeline.summarize_stage_stats(stage_stats)},
+        }, ensure_ascii=False, indent=2))
+    finally:
+        converter.read_source = pipeline.read_source = original_read
+        converter.write_output = pipeline.write_output = original_write
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+# 基准套件的语料规模：名称、每种格式的文件数、每个文件的字幕条数范围
+SUITE_SIZE_CLASSES = (
+    ('tiny', 40, (1, 30)),
+    ('episode', 10, (300, 700)),
+    ('feature', 2, (1500, 2500)),
+    ('huge', 1, (40000, 40000)),
+)
+SUITE_FORMATS = ('srt', 'vtt', 'ass')
+# 基准套件计时的转换步骤（与 convert_with_plan 相同）：
+# read 读取，parse 加载并设置样式，china 繁体转换，render 插入字幕并生成 ASS，write 保存，delete 删除原文件
+SUITE_STAGES = ('read', 'parse', 'china', 'render', 'write', 'delete')
+SUITE_INSERT_CONFIGS = [
+    {'name': '片头', 'start_time': '00:00:00.000', 'end_time': '00:00:05.000',
+     'ass_statement': '{\\an8\\fad(200,200)}本字幕由字幕組製作'},
+    {'name': '水印', 'start_time': '00:00:00.000', 'end_time': '00:20:00.000',
+     'ass_statement': '{\\an9\\alpha&H80&\\fs20}僅供學習交流'},
+]
+SUITE_ASS_HEADER = (
+    "[Script Info]\nScriptType: v4.00+\nPlayResX: 1920\nPlayResY: 1080\n\n"
+    "[V4+ Styles]\n"
+    "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, "
+    "Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, "
+    "MarginL, MarginR, MarginV, Encoding\n"
+    "Style: Default,微軟正黑體,60,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,1,2,10,10,30,1\n"
+    "Style: Sign,方正粗圓_GBK,48,&H0000FFFF,&H000000FF,&H00000000,&H00000000,-1,0,0,0,100,100,0,0,1,3,0,8,10,10,30,1\n"
+    "\n[Events]\n"
+    "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+)
+
+
+def suite_options():
+    """基准套件的转换选项：插入两条自定义字幕，用离线引擎做繁体中国化（不访问网络）"""
+    return dict(default_options(), insert_options=[config['name'] for config in SUITE_INSERT_CONFIGS],
+                subtitle_configs=SUITE_INSERT_CONFIGS, convert_to_china=True, china_engine='local')
+
+
+def make_suite_text(rng, words, fmt, pathological):
+    """生成一条字幕文本：繁体词条为主，夹杂英文、换行和格式标签；pathological 为超长的逐字特效"""
+    if pathological:
+        return ''.join('{\\k%d\\t(0,%d,\\fscx120\\blur%d)}%s' % (rng.randint(5, 40), rng.randint(100, 900),
+                                                                rng.randint(0, 5), rng.choice(words))
+                       for _ in range(rng.randint(8, 16)))
+    text = rng.choice(words) + rng.choice('，、 ') + rng.choice(words)
+    roll = rng.random()
+    if roll < 0.2:
+        text += ('\\N' if fmt == 'ass' else '\n') + rng.choice(words)
+    elif roll < 0.3:
+        text += ' ' + rng.choice(('OK', 'Hello world', 'No way!', 'HTTP 404'))
+    roll = rng.random()
+    if roll < 0.15:
+        text = '{\\an8}' + text
+    elif roll < 0.25:
+        text = ('{\\i1}%s{\\i0}' if fmt == 'ass' else '<i>%s</i>') % text
+    elif roll < 0.3 and fmt == 'ass':
+        text = '{\\pos(%d,%d)\\fad(150,150)\\c&H%06X&}%s' % (rng.randint(0, 1920), rng.randint(0, 1080),
+                                                             rng.randint(0, 0xFFFFFF), text)
+    return text
+
+
+def format_ass_time(ms):
+    """毫秒转 ASS 时间格式"""
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:d}:{m:02d}:{s:02d}.{ms // 10:02d}"
+
+
+def write_suite_file(path, fmt, events, rng, words, pathological=False):
+    """写入一个指定格式的字幕文件；pathological 时事件大量重叠、文本超长"""
+    lines = [SUITE_ASS_HEADER] if fmt == 'ass' else ['WEBVTT\n\n'] if fmt == 'vtt' else []
+    t = 0
+    for i in range(1, events + 1):
+        if pathological:
+            start = t + rng.randint(0, 300)
+            end = start + rng.randint(2000, 8000)
+        else:
+            start = t + rng.randint(100, 2000)
+            end = start + rng.randint(800, 4000)
+        t = start if pathological else end
+        text = make_suite_text(rng, words, fmt, pathological)
+        if fmt == 'ass':
+            style = 'Sign' if text.startswith('{\\an8}') else 'Default'
+            lines.append(f"Dialogue: 0,{format_ass_time(start)},{format_ass_time(end)},{style},,0,0,0,,{text}\n")
+        elif fmt == 'vtt':
+            lines.append(f"{format_srt_time(start).replace(',', '.')} --> {format_srt_time(end).replace(',', '.')}\n"
+                         f"{text}\n\n")
+        else:
+            lines.append(f"{i}\n{format_srt_time(start)} --> {format_srt_time(end)}\n{text}\n\n")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(lines))
+
+
+def make_suite_corpus(directory, seed=0, scale=1.0, classes=None):
+    """生成基准套件的语料：每个规模一个子目录，SRT / VTT / ASS 各若干个文件
+
+    同一 seed 和 scale 生成的文件逐字节相同。返回 {规模名称: 子目录}。
+    """
+    words = list(zhlocal.load_dictionary('TSPhrases.txt'))
+    words.sort()
+    corpus = {}
+    for index, (name, files, (low, high)) in enumerate(SUITE_SIZE_CLASSES):
+        if classes and name not in classes:
+            continue
+        rng = random.Random(seed * 1000 + index)
+        class_dir = os.path.join(directory, name)
+        os.makedirs(class_dir, exist_ok=True)
+        count = files if name == 'huge' else max(1, round(files * scale))
+        for fmt in SUITE_FORMATS:
+            for i in range(count):
+                write_suite_file(os.path.join(class_dir, f"{name}_{i:04d}.{fmt}"), fmt, rng.randint(low, high),
+                                 rng, words, pathological=(name == 'huge'))
+        corpus[name] = class_dir
+    return corpus
+
+
+def measure_suite_class(paths, out_dir):
+    """在当前进程中分步转换一组文件并计时，再用流水线整批转换一次，返回统计字典"""
+    plan = converter.as_plan(suite_options())
+    delete_plan = plan._replace(delete_original=True)
+    # 预热：导入依赖、加载繁简词典，不计入统计
+    converter.convert_with_plan(paths[0], os.path.join(out_dir, 'warmup.ass'), plan)
+
+    stages = dict.fromkeys(SUITE_STAGES, 0.0)
+    events = 0
+    size = 0
+    for path in paths:
+        dst = os.path.join(out_dir, os.path.basename(path) + '.ass')
+        removable = path + '.copy'
+        shutil.copyfile(path, removable)
+        size += os.path.getsize(path)
+
+        start = time.perf_counter()
+        text = converter.read_source(path)
+        read_done = time.perf_counter()
+        doc = converter.parse_source(path, text, plan)
+        parse_done = time.perf_counter()
+        events += converter.document_lines(doc)
+        converter.transform_document(doc, plan)
+        china_done = time.perf_counter()
+        content = converter.render_document(doc, plan)
+        render_done = time.perf_counter()
+        converter.write_output(dst, content)
+        write_done = time.perf_counter()
+        converter.finish_source(removable, dst, delete_plan)
+        delete_done = time.perf_counter()
+
+        for stage, begin, end in (('read', start, read_done), ('parse', read_done, parse_done),
+                                  ('china', parse_done, china_done), ('render', china_done, render_done),
+                                  ('write', render_done, write_done), ('delete', write_done, delete_done)):
+            stages[stage] += end - begin
+    staged_seconds = sum(stages.values())
+
+    jobs = [(path, os.path.join(out_dir, os.path.basename(path) + '.batch.ass')) for path in paths]
+    stage_stats = {}
+    start = time.perf_counter()
+    failed = sum(1 for result in run_jobs(jobs, plan, stage_stats) if not result['ok'])
+    batch_seconds = time.perf_counter() - start
+
+    def throughput(seconds):
+        return {'seconds': round(seconds, 3), 'files_per_sec': round(len(paths) / seconds, 1),
+                'events_per_sec': round(events / seconds, 1)}
+
+    return {
+        'files': len(paths),
+        'events': events,
+        'size_mb': round(size / (1024 * 1024), 2),
+        'stages': {stage: {'seconds': round(seconds, 4), 'ms_per_file': round(seconds / len(paths) * 1000, 3),
+                           'share': round(seconds / staged_seconds, 3)}
+                   for stage, seconds in stages.items()},
+        'staged': throughput(staged_seconds),
+        'batch': dict(throughput(batch_seconds), failed=failed,
+                      stages=pipeline.summarize_stage_stats(stage_stats)),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_suite_class(args):
+    """在独立进程中测量一个规模的语料（供 suite 调用，峰值内存互不影响）"""
+    paths = sorted(os.path.join(args.directory, name) for name in os.listdir(args.directory)
+                   if name.endswith(tuple('.' + fmt for fmt in SUITE_FORMATS)))
+    print(json.dumps(measure_suite_class(paths, args.output)))
+    return 0
+
+
+def run_suite(args):
+    """基准套件：生成可复现的语料，按规模测量各转换步骤的耗时、整批吞吐量和峰值内存"""
+    import subprocess
+    import platform
+
+    work_dir = tempfile.mkdtemp(prefix='toass-bench-')
+    try:
+        corpus_dir = args.corpus_dir or os.path.join(work_dir, 'corpus')
+        print(f"生成语料（seed {args.seed}，规模 ×{args.scale}）...", file=sys.stderr)
+        corpus = make_suite_corpus(corpus_dir, args.seed, args.scale, args.classes)
+
+        results = {}
+        for name, class_dir in corpus.items():
+            out_dir = os.path.join(work_dir, 'out', name)
+            os.makedirs(out_dir)
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '_suite-class', class_dir, out_dir],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[name] = json.loads(output)
+            stages = results[name]['stages']
+            print(f"{name:>8}: {results[name]['files']} 个文件 {results[name]['events']} 条  "
+                  f"整批 {results[name]['batch']['files_per_sec']} 文件/秒 "
+                  f"{results[name]['batch']['events_per_sec']} 条/秒  峰值内存 {results[name]['peak_rss_mb']} MB  "
+                  + ' '.join(f"{stage} {stages[stage]['share']:.0%}" for stage in SUITE_STAGES), file=sys.stderr)
+
+        report = {
+            'benchmark': 'suite',
+            'seed': args.seed,
+            'scale': args.scale,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'stages': list(SUITE_STAGES),
+            'classes': results,
+        }
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        print(text)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0 if all(result['batch']['failed'] == 0 for result in results.values()) else 1
+
+
+def startup_once(work_dir):
+    """以基准模式启动一次 toAss.py，返回启动报告；interactive_ms 为从创建进程到主窗口可操作的毫秒数
+
+    子进程在 work_dir 中运行（使用默认设置），启动完成后输出 JSON 报告并退出。
+    """
+    import subprocess
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'toAss.py')
+    env = dict(os.environ, TOASS_STARTUP_BENCHMARK='1')
+    start = time.time()
+    output = subprocess.run([sys.executable, script], cwd=work_dir, env=env, check=True,
+                            capture_output=True, text=True, encoding='utf-8', timeout=120).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+    report['interactive_ms'] = round((report.pop('interactive_at') - start) * 1000, 1)
+    return report
+
+
+def run_startup(args):
+    """图形界面的冷启动时间：从启动 toAss.py 到主窗口进入事件循环，取多次的中位数
+
+    中位数超过 --max-ms，或启动时导入了应当按需加载的转换依赖时返回 1。
+    """
+    import statistics
+
+    work_dir = tempfile.mkdtemp(prefix='toass-bench-')
+    runs = []
+    try:
+        for i in range(args.runs):
+            report = startup_once(work_dir)
+            runs.append(report)
+            print(f"第 {i + 1} 次: 可交互 {report['interactive_ms']:.0f} ms（进程内 {report['total']:.0f} ms）",
+                  file=sys.stderr)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    median_ms = statistics.median(run['interactive_ms'] for run in runs)
+    stages = [key for key in runs[0] if key not in ('interactive_ms', 'total', 'lazy_modules_loaded')]
+    lazy_loaded = sorted({name for run in runs for name in run['lazy_modules_loaded']})
+    print(json.dumps({
+        'benchmark': 'startup',
+        'runs': args.runs,
+        'interactive_ms': {'median': median_ms, 'min': min(run['interactive_ms'] for run in runs),
+                           'max': max(run['interactive_ms'] for run in runs)},
+        'stages_ms': {stage: statistics.median(run[stage] for run in runs) for stage in stages},
+        'lazy_modules_loaded': lazy_loaded,
+    }, ensure_ascii=False, indent=2))
+
+    failed = False
+    if lazy_loaded:
+        print(f"启动时导入了应按需加载的模块: {', '.join(lazy_loaded)}", file=sys.stderr)
+        failed = True
+    if args.max_ms and median_ms > args.max_ms:
+        print(f"启动时间 {median_ms:.0f} ms 超过上限 {args.max_ms:.0f} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description='字幕转换性能基准测试')
+    subparsers = parser.add_subparsers(dest='command')
+
+    scaling = subparsers.add_parser('scaling', help='进程池引擎的多核扩展性测试')
+    scaling.add_argument('--files', type=int, default=10000, help='语料文件数量（默认 10000）')
+    scaling.add_argument('--events', type=int, default=50, help='每个文件的字幕条数（默认 50）')
+    scaling.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help='最大进程数（默认CPU核心数）')
+    scaling.set_defaults(func=run_scaling)
+
+    fast = subparsers.add_parser('fastpath', help='快速路径与 pysubs2 的一致性和速度对比')
+    fast.add_argument('--files', type=int, default=200, help='随机语料文件数量（默认 200）')
+    fast.add_argument('--repeat', type=int, default=3, help='重复次数（默认 3）')
+    fast.add_argument('--min-speedup', type=float, default=5.0, help='要求的最低加速比，未达到时返回非零（默认 5）')
+    fast.set_defaults(func=run_fastpath)
+
+    streaming = subparsers.add_parser('streaming', help='流式转换与整体读入的峰值内存对比')
+    streaming.add_argument('--size-mb', type=int, default=200, help='生成的 SRT 文件大小（默认 200 MB）')
+    streaming.set_defaults(func=run_streaming)
+
+    zh = subparsers.add_parser('zhconvert', help='离线繁体中国化的速度测试，可选与在线结果对比')
+    zh.add_argument('--size-mb', type=int, default=8, help='生成的测试文本大小（默认 8 MB）')
+    zh.add_argument('--corpus', default=None, help='使用指定的 UTF-8 文本文件作为语料（每行一条字幕）')
+    zh.add_argument('--repeat', type=int, default=3, help='重复次数（默认 3）')
+    zh.add_argument('--compare-online', action='store_true', help='同时调用繁化姬 API 对比转换结果')
+    zh.add_argument('--compare-lines', type=int, default=2000, help='在线对比的行数（默认 2000）')
+    zh.add_argument('--capture', default=None, metavar='PATH',
+                    help='把语料（--corpus）的在线转换结果逐行写入 PATH，不做速度测试')
+    zh.add_argument('--url', default=None, help='在线转换的 API 地址（默认繁化姬）')
+    zh.add_argument('--proxy', default=None, help='在线转换使用的代理（默认 http://127.0.0.1:7890，空字符串为直连）')
+    zh.set_defaults(func=run_zhconvert)
+
+    client = subparsers.add_parser('client', help='用本地模拟服务测试在线转换客户端')
+    client.add_argument('--requests', type=int, default=200, help='请求数（默认 200）')
+    client.add_argument('--lines', type=int, default=50, help='每个请求的行数（默认 50）')
+    client.add_argument('--threads', type=int, default=8, help='并发线程数（默认 8）')
+    client.add_argument('--latency', type=float, default=0.01, help='模拟服务的延迟（秒，默认 0.01）')
+    client.add_argument('--error-rate', type=float, default=0.0, help='模拟服务返回 503 的概率')
+    client.add_argument('--throttle-rate', type=float, default=0.0, help='模拟服务返回 429 的概率')
+    client.add_argument('--retries', type=int, default=3, help='客户端重试次数（默认 3）')
+    client.add_argument('--rate', type=float, default=0, help='客户端限速（每秒请求数，默认不限速）')
+    client.add_argument('--gzip', action='store_true', help='gzip 压缩请求体')
+    client.set_defaults(func=run_client)
+
+    chunking = subparsers.add_parser('chunking', help='超长文本整体发送与分块并发发送的对比')
+    chunking.add_argument('--lines', type=int, default=20000, help='文本行数（默认 20000）')
+    chunking.add_argument('--chunk-chars', type=int, default=20000, help='每个分块的最大字符数（默认 20000）')
+    chunking.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8], help='并发数（默认 1 4 8）')
+    chunking.add_argument('--latency', type=float, default=0.05, help='模拟服务的固定延迟（秒，默认 0.05）')
+    chunking.add_argument('--latency-per-kchar', type=float, default=0.002,
+                          help='模拟服务每千字节增加的延迟（秒，默认 0.002）')
+    chunking.set_defaults(func=run_chunking)
+
+    payload = subparsers.add_parser('payload', help='只发送可见文字时繁体转换数据量的变化')
+    payload.add_argument('--events', type=int, default=5000, help='生成的特效字幕事件数（默认 5000）')
+    payload.add_argument('--ass', default=None, help='使用指定的 ASS 文件代替生成的语料')
+    payload.set_defaults(func=run_payload)
+
+    restyle = subparsers.add_parser('restyle', help='ASS 转 ASS 只改文件头与完整解析的速度对比')
+    restyle.add_argument('--events', type=int, default=50000, help='特效字幕事件数（默认 50000）')
+    restyle.add_argument('--repeat', type=int, default=3, help='重复次数（默认 3）')
+    restyle.set_defaults(func=run_restyle)
+
+    incremental = subparsers.add_parser('incremental', help='增量转换在没有变化时的检查速度')
+    incremental.add_argument('--files', type=int, default=100000, help='语料文件数量（默认 100000）')
+    incremental.add_argument('--events', type=int, default=5, help='每个文件的字幕条数（默认 5）')
+    incremental.add_argument('--touched', type=int, default=1000, help='只更新修改时间的文件数（默认 1000）')
+    incremental.add_argument('-j', '--workers', type=int, default=0, help='全量转换的进程数（默认CPU核心数）')
+    incremental.set_defaults(func=run_incremental)
+
+    pipe = subparsers.add_parser('pipeline', help='每文件一个任务与分阶段流水线的吞吐量对比')
+    pipe.add_argument('--files', type=int, default=2000, help='语料文件数量（默认 2000）')
+    pipe.add_argument('--events', type=int, default=50, help='每个文件的字幕条数（默认 50）')
+    pipe.add_argument('--threads', type=int, default=os.cpu_count() or 1,
+                      help='每文件一个任务时的线程数（默认CPU核心数，与原来的界面线程池相同）')
+    pipe.add_argument('--read-latency', type=float, default=0.005, help='模拟每次读取的延迟（秒，默认 0.005）')
+    pipe.add_argument('--write-latency', type=float, default=0.0, help='模拟每次写入的延迟（秒）')
+    pipe.set_defaults(func=run_pipeline)
+
+    startup = subparsers.add_parser('startup', help='图形界面冷启动时间，可作为回归检查')
+    startup.add_argument('--runs', type=int, default=5, help='启动次数（默认 5）')
+    startup.add_argument('--max-ms', type=float, default=0,
+                         help='可交互时间中位数的上限（毫秒），超过时返回 1（默认不检查）')
+    startup.set_defaults(func=run_startup)
+
+    suite = subparsers.add_parser('suite', help='按规模分组的可复现语料上的分步耗时、吞吐量和峰值内存')
+    suite.add_argument('--seed', type=int, default=0, help='语料的随机种子（默认 0）')
+    suite.add_argument('--scale', type=float, default=1.0, help='tiny / episode / feature 文件数的倍数（默认 1.0）')
+    suite.add_argument('--classes', nargs='+', choices=[name for name, _, _ in SUITE_SIZE_CLASSES], default=None,
+                       help='只测量指定的规模（默认全部）')
+    suite.add_argument('--corpus-dir', default=None, help='在指定目录生成并保留语料（默认使用临时目录）')
+    suite.add_argument('--output', default=None, help='同时把 JSON 结果写入文件')
+    suite.set_defaults(func=run_suite)
+
+    suite_class = subparsers.add_parser('_suite-class', help=argparse.SUPPRESS)
+    suite_class.add_argument('directory')
+    suite_class.add_argument('output')
+    suite_class.set_defaults(func=run_suite_class)
+
+    convert_one = subparsers.add_parser('_convert-one', help=argparse.SUPPRESS)
+    convert_one.add_argument('input')
+    convert_one.add_argument('output')
+    convert_one.add_argument('--stream', dest='stream', action='store_true', default=None)
+    convert_one.add_argument('--no-stream', dest='stream', action='store_false')
+    convert_one.set_defaults(func=run_convert_one)
+
+    return parser
+
+
+def main(argv=None):
+    """主函数"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -84,7 +84,7 @@ def build_executable():
         cmd = "pyinstaller build.spec"
     else:
         # 基本构建命令
-        cmd = 'pyinstaller --onefile --windowed --name "SRT转ASS字幕转换器" toAss.py'
+        cmd = 'pyinstaller --onefile --windowed --name "SRT转ASS字幕转换器" --add-data "zhdict:zhdict" toAss.py'
         
         # 添加图标（如果存在）
         if os.path.exists('icon.ico'):
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行批量转换工具
+不加载 PyQt5 / qfluentwidgets，适合在渲染农场等无界面环境中使用
+
+用法:
+  python cli.py convert 输入文件/通配符/目录... -o 输出目录 -j 进程数 --profile 样式配置.json [--incremental]
+                        [--timings] [--timings-json 耗时统计.json] [--trace 时间线.json]
+  python cli.py submit 输入文件/通配符/目录... [-o 输出目录] [--wait]
+  python cli.py cache [--clear]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+import instance
+import tracing
+from converter import (CONFIG_FILE, SETTINGS_FILE, SUPPORTED_EXTENSIONS,
+                       DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE,
+                       DEFAULT_SUBTITLE_COLOR, DEFAULT_OUTLINE_COLOR,
+                       CHINA_ENGINES, DEFAULT_CHINA_ENGINE, output_path_for,
+                       find_output_collisions, format_output_collisions, compile_plan, get_translation_cache)
+from engine import ProcessPoolEngine, run_jobs
+from manifest import IncrementalTracker
+from pipeline import format_stage_stats, summarize_stage_stats
+from batch import BatchProgress, format_duration
+from timings import format_summary
+
+
+def load_json(path):
+    """读取JSON文件，不存在时返回空字典"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_profile(profile_path=None):
+    """加载样式配置
+
+    未指定配置文件时与图形界面一致，读取当前目录下的 sub.json 和 settings.json；
+    指定时读取该文件，字段与上述两个文件相同。
+    """
+    if profile_path:
+        if not os.path.exists(profile_path):
+            raise FileNotFoundError(f"样式配置不存在: {profile_path}")
+        profile = load_json(profile_path)
+    else:
+        profile = {}
+        profile.update(load_json(CONFIG_FILE))
+        profile.update(load_json(SETTINGS_FILE))
+
+    return {
+        'subtitle_configs': profile.get('subtitle_configs', []),
+        'subtitle_color': profile.get('subtitle_color', DEFAULT_SUBTITLE_COLOR),
+        'outline_color': profile.get('outline_color', DEFAULT_OUTLINE_COLOR),
+        'font_family': profile.get('font_family', DEFAULT_FONT_FAMILY),
+        'font_size': profile.get('font_size', DEFAULT_FONT_SIZE),
+        'insert_options': profile.get('insert_options', []),
+        'output_directory': profile.get('output_directory', ''),
+        'china_engine': profile.get('china_engine', DEFAULT_CHINA_ENGINE),
+        'online_options': profile.get('online_options', {}),
+    }
+
+
+def expand_inputs(inputs):
+    """展开输入参数中的文件、通配符和目录，去重并保持顺序
+
+    返回 (文件, 源根目录) 列表：目录参数中找到的文件的源根目录为该目录，用于在输出目录中保留子目录结构；
+    其他文件为 None。
+    """
+    files = []
+    seen = set()
+
+    def add(path, source_root=None):
+        if path.lower().endswith(SUPPORTED_EXTENSIONS) and path not in seen:
+            seen.add(path)
+            files.append((path, source_root))
+
+    for item in inputs:
+        if os.path.isdir(item):
+            source_root = os.path.abspath(item)
+            for root, dirs, names in os.walk(item):
+                dirs.sort()
+                for name in sorted(names):
+                    add(os.path.join(root, name), source_root)
+        elif os.path.isfile(item):
+            add(item)
+        else:
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path):
+                    add(path)
+
+    return files
+
+
+def run_convert(args):
+    """执行 convert 子命令"""
+    batch_start = time.perf_counter()
+    try:
+        profile = load_profile(args.profile)
+    except Exception as e:
+        print(f"加载样式配置失败: {e}", file=sys.stderr)
+        return 2
+
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("没有找到要转换的字幕文件", file=sys.stderr)
+        return 2
+
+    output_directory = args.output or profile['output_directory']
+    # 目录参数中的文件在输出目录下保留相对该目录的子目录，不同子目录中的同名文件不会互相覆盖
+    jobs = [(f, output_path_for(f, output_directory, root)) for f, root in files]
+    collisions = find_output_collisions(jobs)
+    if collisions:
+        print(f"有 {len(collisions)} 个输出文件对应多个输入文件，转换后会互相覆盖:\n"
+              f"{format_output_collisions(collisions)}", file=sys.stderr)
+        return 2
+    for directory in sorted({os.path.dirname(dst) for _, dst in jobs}):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    options = {
+        'insert_options': args.insert if args.insert is not None else profile['insert_options'],
+        'subtitle_configs': profile['subtitle_configs'],
+        'subtitle_color': profile['subtitle_color'],
+        'outline_color': profile['outline_color'],
+        'delete_original': args.delete_original,
+        'convert_to_china': args.china,
+        'font_family': args.font or profile['font_family'],
+        'font_size': args.font_size or profile['font_size'],
+        'streaming': True if args.stream else None,
+        'china_engine': args.china_engine or profile['china_engine'],
+        'online_options': dict(profile['online_options']),
+    }
+    if args.max_payload:
+        options['online_options']['max_payload'] = args.max_payload
+    if args.url:
+        options['online_options']['url'] = args.url
+    if args.proxy is not None:
+        options['online_options']['proxy'] = args.proxy
+    if args.rate is not None:
+        options['online_options']['rate'] = args.rate
+
+    # 整批共用一个转换计划，插入配置有误时在开始前报错
+    try:
+        plan = compile_plan(**options)
+    except Exception as e:
+        print(f"转换设置有误: {e}", file=sys.stderr)
+        return 2
+
+    tracker = None
+    skipped = []
+    if args.incremental:
+        # 输入、设置和输出都没有变化的文件直接跳过
+        tracker = IncrementalTracker(options)
+        jobs, skipped = tracker.filter(jobs)
+        if not args.quiet and skipped:
+            print(f"跳过未变化的文件 {len(skipped)} 个")
+
+    workers = max(1, min(args.jobs or os.cpu_count() or 1, len(jobs)))
+    engine = None
+    stage_stats = {}
+    if args.trace:
+        # 从读取配置、展开输入开始记录
+        tracing.start()
+        tracing.add_span('prepare', 'batch', batch_start, args={'files': len(jobs), 'skipped': len(skipped)})
+    if not jobs:
+        results = []
+    elif workers == 1:
+        # 单个进程时直接在当前进程转换，省去启动进程池的开销
+        results = run_jobs(jobs, plan, stage_stats)
+    else:
+        engine = ProcessPoolEngine(workers)
+        results = engine.run(jobs, plan, stage_stats=stage_stats)
+
+    progress = BatchProgress(len(jobs))
+    try:
+        for result in results:
+            progress.add_result(result)
+            if result['ok']:
+                if tracker:
+                    tracker.record(result['output'])
+                if not args.quiet:
+                    print(result['message'])
+            else:
+                print(f"转换失败: {result['path']}: {result['message']}", file=sys.stderr)
+    finally:
+        if engine:
+            engine.close()
+        if tracker:
+            tracker.save()
+
+    snapshot = progress.snapshot()
+    if not args.quiet:
+        print(f"完成: 成功 {snapshot['ok']} 个，失败 {snapshot['failed']} 个，跳过 {len(skipped)} 个")
+        if jobs:
+            print(f"用时 {format_duration(snapshot['elapsed'])}，{snapshot['files_per_sec']:.1f} 文件/秒，"
+                  f"{snapshot['lines_per_sec']:.0f} 行/秒")
+        if stage_stats:
+            print(f"阶段利用率: {format_stage_stats(stage_stats)}")
+    if args.timings:
+        print(format_summary(progress.timings.summary()))
+    if args.trace:
+        tracing.add_span('batch', 'batch', batch_start, args={'ok': snapshot['ok'], 'failed': snapshot['failed']})
+        try:
+            tracing.export(args.trace, *tracing.stop(), {'workers': workers})
+        except OSError as e:
+            print(f"写入时间线失败: {e}", file=sys.stderr)
+    if args.timings_json:
+        try:
+            progress.timings.export(args.timings_json, {'workers': workers,
+                                                        'stage_utilization': summarize_stage_stats(stage_stats)})
+        except OSError as e:
+            print(f"写入耗时统计失败: {e}", file=sys.stderr)
+    return 1 if snapshot['failed'] else 0
+
+
+def run_submit(args):
+    """执行 submit 子命令：把一批文件交给常驻托盘的图形界面转换（使用界面当前的设置）"""
+    files = [os.path.abspath(f) for f, _ in expand_inputs(args.inputs)]
+    if not files:
+        print("没有找到要转换的字幕文件", file=sys.stderr)
+        return 2
+
+    request = {'command': 'convert', 'files': files, 'wait': args.wait}
+    if args.output:
+        request['output_directory'] = os.path.abspath(args.output)
+    try:
+        reply = instance.send_request(request, None if args.wait else instance.CONNECT_TIMEOUT)
+    except (OSError, ValueError) as e:
+        print(f"与图形界面通信失败: {e}", file=sys.stderr)
+        return 2
+    if reply is None:
+        print("图形界面没有在运行，可以改用 convert 子命令直接转换", file=sys.stderr)
+        return 2
+    if not reply.get('ok'):
+        print(f"图形界面拒绝了任务: {reply.get('error')}", file=sys.stderr)
+        return 2
+
+    if not args.wait:
+        print(f"已提交 {len(files)} 个文件，排队位置 {reply['position']}")
+        return 0
+
+    result = reply['result']
+    if result['errors']:
+        print(result['errors'], file=sys.stderr)
+    print(f"完成: 成功 {result['converted']} 个，失败 {result['failed']} 个，取消 {result['cancelled']} 个，"
+          f"用时 {format_duration(result['elapsed'])}")
+    return 1 if result['failed'] or result['cancelled'] else 0
+
+
+def run_cache(args):
+    """执行 cache 子命令：显示或清空在线繁体转换缓存"""
+    cache = get_translation_cache()
+    if args.clear:
+        cache.clear()
+        print(f"已清空缓存: {cache.path}")
+        return 0
+
+    stats = cache.stats()
+    print(f"缓存文件: {stats['path']}")
+    print(f"缓存条目: {stats['entries']} / {stats['max_entries']}")
+    print(f"累计命中: {stats['hits']}，未命中: {stats['misses']}，命中率: {stats['hit_rate']:.1%}")
+    return 0
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog='toass', description='SRT/VTT/ASS 转 ASS 字幕批量转换工具')
+    subparsers = parser.add_subparsers(dest='command')
+
+    convert = subparsers.add_parser('convert', help='批量转换字幕文件')
+    convert.add_argument('inputs', nargs='+', help='输入文件、通配符或目录（目录会递归扫描）')
+    convert.add_argument('-o', '--output', default='', help='输出目录（默认使用原文件目录）')
+    convert.add_argument('-j', '--jobs', type=int, default=0, help='并行进程数（默认等于CPU核心数）')
+    convert.add_argument('-p', '--profile', default=None,
+                         help='样式配置JSON文件（默认读取当前目录的 sub.json 和 settings.json）')
+    convert.add_argument('--insert', action='append', default=None, metavar='NAME',
+                         help='插入指定名称的字幕配置，可重复使用')
+    convert.add_argument('--font', default=None, help='覆盖字幕字体')
+    convert.add_argument('--font-size', type=int, default=None, help='覆盖字幕字号')
+    convert.add_argument('--china', action='store_true', help='繁体中国化')
+    convert.add_argument('--china-engine', choices=CHINA_ENGINES, default=None,
+                         help='繁体中国化引擎：local 使用内置离线词典（默认），online 调用繁化姬 API')
+    convert.add_argument('--max-payload', type=int, default=None,
+                         help='在线转换时合并多个文件的文本，单个请求的最大字符数（默认 100000）')
+    convert.add_argument('--url', default=None, help='在线转换的 API 地址（默认繁化姬）')
+    convert.add_argument('--proxy', default=None,
+                         help='在线转换使用的代理（默认 http://127.0.0.1:7890，空字符串为直连）')
+    convert.add_argument('--rate', type=float, default=None, help='在线转换每秒最多请求数，0 为不限速（默认 2）')
+    convert.add_argument('--delete-original', action='store_true', help='转换后删除原文件')
+    convert.add_argument('--stream', action='store_true',
+                         help='对所有 SRT/VTT 使用流式转换（默认只对超过 16MB 的文件使用）')
+    convert.add_argument('--incremental', action='store_true',
+                         help='增量转换：跳过输入和设置都没有变化的文件（清单保存在输出目录的 .toass-manifest.json）')
+    convert.add_argument('--timings', action='store_true',
+                         help='结束后输出各步骤（读取、解析、繁体转换、生成、写入）耗时的 p50 / p95 / p99')
+    convert.add_argument('--timings-json', default=None, metavar='PATH',
+                         help='把耗时统计和逐个文件的记录导出为 JSON 文件')
+    convert.add_argument('--trace', default=None, metavar='PATH',
+                         help='把每个文件和步骤的开始/结束时间导出为 Chrome trace JSON（用 chrome://tracing 或 Perfetto 打开）')
+    convert.add_argument('-q', '--quiet', action='store_true', help='只输出错误信息')
+    convert.set_defaults(func=run_convert)
+
+    submit = subparsers.add_parser('submit', help='把文件交给常驻托盘的图形界面转换（使用界面当前的设置）')
+    submit.add_argument('inputs', nargs='+', help='输入文件、通配符或目录（目录会递归扫描）')
+    submit.add_argument('-o', '--output', default='', help='输出目录（默认使用界面中设置的输出目录）')
+    submit.add_argument('--wait', action='store_true', help='等待转换结束并输出结果，有失败或取消时返回 1')
+    submit.set_defaults(func=run_submit)
+
+    cache = subparsers.add_parser('cache', help='查看在线繁体转换缓存的统计信息')
+    cache.add_argument('--clear', action='store_true', help='清空缓存')
+    cache.set_defaults(func=run_cache)
+
+    return parser
+
+
+def main(argv=None):
+    """主函数"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
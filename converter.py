@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字幕转换核心逻辑
+不依赖 PyQt5 / qfluentwidgets，图形界面和命令行共用同一套转换流程
+pysubs2 和依赖它的 fastpath 在第一次转换时才导入，只读取设置的图形界面启动时不必加载
+"""
+
+import os
+import json
+import time
+import functools
+import collections
+
+import asstext
+import restyle
+import zhlocal
+import zhcache
+import zhdispatch
+import zhclient
+import tracing
+from batch import ConversionCancelled
+
+CONFIG_FILE = 'sub.json'
+SETTINGS_FILE = 'settings.json'
+
+SUPPORTED_EXTENSIONS = ('.srt', '.vtt', '.ass')
+NO_INSERT_OPTION = '不插入字幕'
+
+DEFAULT_FONT_FAMILY = '方正粗圆_GBK'
+DEFAULT_FONT_SIZE = 70
+DEFAULT_SUBTITLE_COLOR = 'H00FFFFFF'
+DEFAULT_OUTLINE_COLOR = 'H00000000'
+
+ZHCONVERT_URL = zhclient.DEFAULT_URL
+
+# 繁化姬转换参数，同时作为在线转换缓存键的一部分
+ZHCONVERT_OPTIONS = {
+    'converter': 'China',
+    'modules': '{"ChineseVariant":"1"}',
+    'jpTextConversionStrategy': 'none',
+    'jpStyleConversionStrategy': False,
+}
+
+# 在线转换参数的默认值，convert_file 的 online_options 可以覆盖其中任意项
+ONLINE_DEFAULTS = {
+    # 合并多个文件的文本时单个请求的最大字符数
+    'max_payload': zhdispatch.DEFAULT_MAX_PAYLOAD,
+    # 同时发送的请求数：超长文本切成多块后并发发送
+    'concurrency': zhdispatch.DEFAULT_CONCURRENCY,
+    'url': ZHCONVERT_URL,
+    # 代理地址，null 使用系统代理设置，空字符串为直连
+    'proxy': 'http://127.0.0.1:7890',
+    'timeout': 30,
+    # 是否 gzip 压缩请求体（需要服务端支持 Content-Encoding: gzip）
+    'gzip': False,
+    # 令牌桶限速：每秒请求数（0 为不限速）和突发容量，进程池的所有进程共用
+    'rate': 2.0,
+    'burst': 4,
+    # 网络错误、429 和 5xx 的重试次数与指数退避的初始间隔（秒）
+    'retries': 3,
+    'backoff': 0.5,
+    # 两次重试之间的最长等待（秒），服务端要求的 Retry-After 也不超过该值
+    'max_backoff': zhclient.DEFAULT_MAX_BACKOFF,
+    # 连接池大小
+    'pool_size': 8,
+    # 转换服务的版本标识：服务端词典更新后改成新的值，缓存和增量转换的结果随之失效
+    'service_version': '',
+}
+# 在线转换时同时进行的任务数：任务大部分时间在等待网络，并发越多可合并的请求越多
+ONLINE_CONCURRENCY = 32
+
+# 繁体中国化引擎：local 使用内置离线词典，online 调用繁化姬 API
+CHINA_ENGINES = ('local', 'online')
+DEFAULT_CHINA_ENGINE = 'local'
+
+# 输出格式版本：生成的 ASS 内容有变化时加一，让增量转换重新生成已有输出
+# （2：只改样式的 ASS 输入保留原有的事件行和其他段落，不再由 pysubs2 重新生成；
+#   3：只改样式的 ASS 输入缺少 ScriptType 时补全为 v4.00+）
+OUTPUT_VERSION = 3
+
+# 超过该大小的 SRT / VTT 自动使用流式转换，内存占用与文件大小无关
+STREAMING_THRESHOLD = 16 * 1024 * 1024
+# 流式转换时每批处理（和繁体转换）的字幕条数与文本字符数上限
+STREAM_CHUNK_CUES = 2000
+STREAM_CHUNK_CHARS = 256 * 1024
+
+
+def convert_to_china_text(text, online_options=None, abandoned=None):
+    """繁体中文转换（在线）；abandoned 返回 True 时不再重试"""
+    settings = online_settings(online_options)
+    try:
+        return get_online_client(settings_key(settings)).convert(text, ZHCONVERT_OPTIONS, abandoned)
+    except Exception as e:
+        raise Exception(f"Conversion Error: {str(e)}")
+
+
+def china_engine_version(engine=DEFAULT_CHINA_ENGINE, online_options=None):
+    """繁体中国化引擎的版本标识：离线为词典哈希，在线为转换参数、接口地址和服务版本"""
+    if engine == 'online':
+        settings = online_settings(online_options)
+        version = {'options': ZHCONVERT_OPTIONS, 'url': settings['url']}
+        # 未设置服务版本时不写入，已有的增量转换清单保持有效
+        if settings['service_version']:
+            version['service_version'] = settings['service_version']
+        return json.dumps(version, sort_keys=True)
+    return 'local:' + zhlocal.dictionary_version()
+
+
+def output_path_for(file_path, output_directory, source_root=None):
+    """计算输出文件路径，未设置输出目录时使用原文件目录
+
+    设置了输出目录且给出 source_root 时，按文件相对 source_root 的子目录在输出目录下保持同样的结构。
+    """
+    filename = os.path.splitext(os.path.basename(file_path))[0] + '.ass'
+    if output_directory and source_root:
+        relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(file_path)), source_root)
+        if relative_dir != os.curdir and not relative_dir.startswith(os.pardir):
+            return os.path.join(output_directory, relative_dir, filename)
+    return os.path.join(output_directory or os.path.dirname(file_path), filename)
+
+
+def find_output_collisions(jobs):
+    """找出输出到同一个文件的任务，返回 [(输出文件, [输入文件...]), ...]
+
+    例如不同子目录中的同名文件输出到同一个输出目录时，后转换的会覆盖先转换的。
+    """
+    sources = {}
+    for src, dst in jobs:
+        sources.setdefault(os.path.normcase(os.path.abspath(dst)), (dst, []))[1].append(src)
+    return [(dst, srcs) for dst, srcs in sources.values() if len(srcs) > 1]
+
+
+def format_output_collisions(collisions, limit=5):
+    """把 find_output_collisions 的结果格式化为提示文字，最多列出 limit 个输出文件"""
+    lines = [f"{dst} ← {'、'.join(srcs)}" for dst, srcs in collisions[:limit]]
+    if len(collisions) > limit:
+        lines.append(f"……另有 {len(collisions) - limit} 个输出文件")
+    return '\n'.join(lines)
+
+
+SCRIPT_INFO = {
+    'Title': 'Default Aegisub file',
+    'ScriptType': 'v4.00+',
+    'WrapStyle': '0',
+    'ScaledBorderAndShadow': 'yes',
+    'YCbCr Matrix': 'TV.601',
+    'PlayResX': '1920',
+    'PlayResY': '1080'
+}
+
+
+def make_default_style(font_family, font_size, subtitle_color, outline_color):
+    """创建 Default 样式，颜色为带 & 前缀的 ASS 颜色字符串"""
+    import pysubs2
+    return pysubs2.SSAStyle(
+        fontname=font_family,
+        fontsize=font_size,
+        primarycolor=subtitle_color,
+        outlinecolor=outline_color,
+        shadow=1.0
+    )
+
+
+def parse_config_time(value):
+    """解析插入配置中的 HH:mm:ss.zzz 时间，返回毫秒"""
+    import pysubs2
+    return pysubs2.make_time(
+        int(value[:2]),
+        int(value[3:5]),
+        int(value[6:8]),
+        int(value[9:12])
+    )
+
+
+def insert_events(insert_options, subtitle_configs):
+    """返回需要插入的自定义字幕 [(开始毫秒, 结束毫秒, ASS语句), ...]"""
+    events = []
+    for insert_option in insert_options:
+        if insert_option != NO_INSERT_OPTION:
+            config = next((c for c in subtitle_configs if c['name'] == insert_option), None)
+            if config:
+                events.append((
+                    parse_config_time(config['start_time']),
+                    parse_config_time(config['end_time']),
+                    config['ass_statement']
+                ))
+    return events
+
+
+def get_translation_cache(online_options=None):
+    """当前进程共用的在线转换缓存
+
+    缓存保存在用户缓存目录（zhcache.default_cache_path）；行的键包含转换参数、接口地址和服务版本，
+    换用其他服务或服务更新后不会读到之前的结果。统计和清空针对整个缓存文件。
+    """
+    return _translation_cache(china_engine_version('online', online_options))
+
+
+@functools.lru_cache(maxsize=None)
+def _translation_cache(settings_key):
+    return zhcache.TranslationCache(settings_key=settings_key)
+
+
+def online_settings(online_options=None):
+    """合并在线转换参数和默认值"""
+    settings = dict(ONLINE_DEFAULTS)
+    settings.update(online_options or {})
+    return settings
+
+
+def settings_key(settings):
+    """把在线转换参数转成可哈希的键，相同参数共用客户端和调度器"""
+    return tuple(sorted(settings.items()))
+
+
+@functools.lru_cache(maxsize=None)
+def get_online_client(key):
+    """当前进程共用的在线转换客户端（连接池在各线程间复用）"""
+    settings = dict(key)
+    return zhclient.ZhConvertClient(
+        url=settings['url'],
+        proxy=settings['proxy'],
+        timeout=settings['timeout'],
+        gzip_body=settings['gzip'],
+        rate=settings['rate'],
+        burst=settings['burst'],
+        retries=settings['retries'],
+        backoff=settings['backoff'],
+        pool_size=settings['pool_size'],
+        max_backoff=settings['max_backoff']
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_dispatcher(key):
+    """当前进程共用的请求合并调度器"""
+    settings = dict(key)
+    convert = functools.partial(convert_to_china_text, online_options=settings)
+    return zhdispatch.ConversionDispatcher(convert, settings['max_payload'], settings['concurrency'])
+
+
+def convert_texts_online(texts, online_options=None, token=None, stats=None):
+    """在线繁体转换一组文本，只发送缓存中没有的行
+
+    缓存未命中的行交给调度器，与同一进程中其他任务的文本合并、分块发送；
+    结果与原文逐行对应，无法对应时抛出 zhdispatch.MisalignmentError。
+    token 为 batch.CancelToken，取消时不再等待结果，抛出 ConversionCancelled。
+    stats 为字典时累加发送的字符数和请求耗时（见 add_metric）。
+    """
+    settings = online_settings(online_options)
+    cache = get_translation_cache(settings)
+    found = cache.get_many(texts)
+    misses = [text for text in dict.fromkeys(texts) if text not in found]
+    if misses:
+        converted = get_dispatcher(settings_key(settings)).convert(misses, token, stats)
+        cache.put_many(zip(misses, converted))
+        found.update(zip(misses, converted))
+    return [found[text] for text in texts]
+
+
+def convert_texts_to_china(texts, engine=DEFAULT_CHINA_ENGINE, online_options=None, token=None, stats=None):
+    """繁体转换一组字幕文本，返回与输入逐条对应的列表
+
+    只转换可见文字，覆盖标签、转义符和绘图命令原样保留。
+    stats 为字典时累加交给转换引擎的字符数（在线转换只计缓存未命中、实际发送的部分）和请求耗时。
+    """
+    runs, templates = asstext.extract_runs(texts)
+    if engine == 'online':
+        converted = convert_texts_online(runs, online_options, token, stats)
+    else:
+        text = '\n'.join(runs)
+        add_metric(stats, 'payload_chars', len(text))
+        converted = zhlocal.convert_to_china_text(text).split('\n')
+    if len(converted) != len(runs):
+        raise ValueError(f'繁体转换结果数量不一致：{len(runs)} 段文字，返回 {len(converted)} 段')
+    return asstext.splice_runs(templates, converted)
+
+
+# 一批文件共用的转换计划：在批次开始时编译一次，各文件只读取或复制其中的内容
+ConversionPlan = collections.namedtuple('ConversionPlan', [
+    'subtitle_color', 'outline_color',  # 带 & 前缀的 ASS 颜色
+    'font_family', 'font_size',
+    'script_info',       # SCRIPT_INFO 的 (键, 值) 元组
+    'style',             # Default 样式模板，使用时复制
+    'header',            # SRT / VTT 输出的文件头（[Script Info] 到 [Events] 的 Format 行）
+    'inserts',           # 插入的自定义字幕 ((开始毫秒, 结束毫秒, ASS语句), ...)
+    'insert_events',     # 同上的 SSAEvent 原型，使用时复制
+    'inserts_in_range',  # 插入字幕的时间是否都在 ASS 可表示的范围内
+    'inserts_text',      # 快速路径使用的插入字幕 Dialogue 行
+    'delete_original', 'convert_to_china', 'china_engine', 'online_options',
+    'fast_path', 'streaming',
+])
+
+
+def compile_plan(insert_options, subtitle_configs, subtitle_color, outline_color, delete_original,
+                 convert_to_china, font_family, font_size, fast_path=True, streaming=None,
+                 china_engine=DEFAULT_CHINA_ENGINE, online_options=None):
+    """把一批文件的转换设置编译成 ConversionPlan，参数与 convert_file 相同
+
+    插入配置的查找和时间解析、样式和文件头的生成都只做一次；配置有误时在这里抛出异常，而不是每个文件各失败一次。
+    """
+    import pysubs2
+    import fastpath
+
+    subtitle_color = f'&{subtitle_color}'
+    outline_color = f'&{outline_color}'
+    style = make_default_style(font_family, font_size, subtitle_color, outline_color)
+    inserts = tuple(insert_events(insert_options, subtitle_configs))
+    try:
+        fastpath.check_times(inserts)
+        inserts_in_range = True
+    except fastpath.FastPathUnsupported:
+        inserts_in_range = False
+
+    return ConversionPlan(
+        subtitle_color=subtitle_color,
+        outline_color=outline_color,
+        font_family=font_family,
+        font_size=font_size,
+        script_info=tuple(SCRIPT_INFO.items()),
+        style=style,
+        header=fastpath.render_header(SCRIPT_INFO, style),
+        inserts=inserts,
+        insert_events=tuple(pysubs2.SSAEvent(start=start, end=end, text=text) for start, end, text in inserts),
+        inserts_in_range=inserts_in_range,
+        inserts_text=''.join(fastpath.render_events(fastpath.clamp_times(inserts))),
+        delete_original=delete_original,
+        convert_to_china=convert_to_china,
+        china_engine=china_engine,
+        online_options=online_options,
+        fast_path=fast_path,
+        streaming=streaming,
+    )
+
+
+def as_plan(options):
+    """options 为 convert_file 的其余参数（字典）时编译成 ConversionPlan，已经是 ConversionPlan 时原样返回"""
+    if isinstance(options, ConversionPlan):
+        return options
+    return compile_plan(**options)
+
+
+def convert_file(srt_file, ass_file, insert_options, subtitle_configs,
+                 subtitle_color, outline_color, delete_original, convert_to_china,
+                 font_family, font_size, fast_path=True, streaming=None,
+                 china_engine=DEFAULT_CHINA_ENGINE, online_options=None):
+    """转换单个字幕文件，返回结果信息；失败时抛出异常
+
+    SRT / VTT 输入默认走快速路径，输入内容需要时自动改用 pysubs2。
+    streaming 为 None 时按文件大小自动决定是否流式转换，True / False 为强制开关。
+    china_engine 选择繁体中国化引擎，见 CHINA_ENGINES；online_options 为在线转换参数，见 ONLINE_DEFAULTS。
+    批量转换时先用 compile_plan 编译一次，再对每个文件调用 convert_with_plan。
+    """
+    plan = compile_plan(insert_options, subtitle_configs, subtitle_color, outline_color, delete_original,
+                        convert_to_china, font_family, font_size, fast_path, streaming, china_engine, online_options)
+    return convert_with_plan(srt_file, ass_file, plan)
+
+
+def convert_with_plan(srt_file, ass_file, plan, stats=None, token=None):
+    """按编译好的转换计划转换单个字幕文件，返回结果信息；失败时抛出异常
+
+    依次执行 read_source → parse_source → transform_document → render_document → write_output，
+    批量转换时 pipeline.ConversionPipeline 把这几步分到不同的线程池中执行。
+    不需要修改事件的 ASS 输入只改文件头，事件原样复制（见 restyle）；超大的 SRT / VTT 流式转换。
+    stats 为字典时写入 lines（输入的字幕条数）、stages（各步骤的耗时，秒，键见 timings.STAGE_NAMES）
+    和 bytes_read、bytes_written、payload_chars、http_requests、http_seconds；失败时保留已完成步骤的记录。
+    stats 中的 path（输入文件）用于在时间线中标注步骤，见 tracing。
+    token 为 batch.CancelToken 时在各步之间检查，取消时抛出 ConversionCancelled，不写出输出文件。
+    """
+    import fastpath
+
+    if stats is None:
+        stats = {}
+    fast_path = plan.fast_path
+    lines = 0
+    start = time.perf_counter()
+    if needs_restyle(srt_file, plan):
+        try:
+            lines = restyle.restyle_file(srt_file, ass_file, plan.subtitle_color, plan.outline_color, token)
+            fast_path = None
+            start = add_stage_time(stats, 'restyle', start)
+        except restyle.RestyleUnsupported:
+            pass
+    elif needs_streaming(srt_file, plan):
+        try:
+            lines = convert_plain_stream(srt_file, ass_file, plan, token, stats)
+            fast_path = None
+            start = add_stage_time(stats, 'stream', start)
+        except fastpath.FastPathUnsupported:
+            # 快速路径不支持时整体读入，交给 pysubs2
+            fast_path = False
+
+    if fast_path is None:
+        stats['bytes_read'] = os.path.getsize(srt_file)
+    else:
+        text = read_source(srt_file)
+        stats['bytes_read'] = os.path.getsize(srt_file)
+        start = add_stage_time(stats, 'read', start)
+        if token:
+            token.check()
+        doc = parse_source(srt_file, text, plan, fast_path)
+        lines = document_lines(doc)
+        start = add_stage_time(stats, 'parse', start)
+        if plan.convert_to_china:
+            transform_document(doc, plan, token, stats)
+            start = add_stage_time(stats, 'china', start)
+        content = render_document(doc, plan)
+        start = add_stage_time(stats, 'render', start)
+        if token:
+            token.check()
+        write_output(ass_file, content)
+        start = add_stage_time(stats, 'write', start)
+    stats['bytes_written'] = os.path.getsize(ass_file)
+
+    stats['lines'] = lines
+    message = finish_source(srt_file, ass_file, plan)
+    if plan.delete_original:
+        add_stage_time(stats, 'delete', start)
+    return message
+
+
+def add_stage_time(stats, stage, start):
+    """把从 start（time.perf_counter() 的值）到现在的耗时累加到 stats['stages'][stage]，返回现在的时间
+
+    记录时间线时同时记为一个步骤跨度（stats 中有 path 时标注文件名）。
+    """
+    now = time.perf_counter()
+    stages = stats.setdefault('stages', {})
+    stages[stage] = stages.get(stage, 0.0) + now - start
+    if tracing.active():
+        tracing.add_span(stage, 'stage', start, now, {'file': stats['path']} if 'path' in stats else None)
+    return now
+
+
+def add_metric(stats, key, value):
+    """stats 为字典时把 value 累加到 stats[key]"""
+    if stats is not None:
+        stats[key] = stats.get(key, 0) + value
+
+
+def needs_restyle(srt_file, plan):
+    """是否使用只改样式的 ASS 路径：ASS 输入且事件不需要任何修改（不插入字幕、不做繁体转换）"""
+    return plan.fast_path and srt_file.endswith('.ass') and not plan.inserts and not plan.convert_to_china
+
+
+def needs_streaming(srt_file, plan):
+    """是否使用流式转换（只适用于快速路径支持的 SRT / VTT）"""
+    import fastpath
+    if not plan.fast_path or not fastpath.ENABLED or srt_file.endswith('.ass'):
+        return False
+    if plan.streaming is None:
+        return os.path.getsize(srt_file) >= STREAMING_THRESHOLD
+    return plan.streaming
+
+
+def read_source(srt_file):
+    """读取输入文件（I/O）"""
+    with open(srt_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_source(srt_file, text, plan, fast_path=True):
+    """解析输入文本，返回待转换的文档
+
+    文档为字典：kind 为 'cues' 时 cues 为快速路径的 [(开始毫秒, 结束毫秒, 文本), ...]，
+    为 'subs' 时 subs 为已设置好样式的 pysubs2.SSAFile。
+    """
+    import fastpath
+    if fast_path and fastpath.ENABLED and not srt_file.endswith('.ass'):
+        try:
+            cues = fastpath.parse_cues(text, fastpath.detect_format(srt_file, text))
+            # 在繁体转换之前确认时间可以表示，避免回退时重复请求
+            fastpath.check_times(cues)
+            if not plan.inserts_in_range:
+                raise fastpath.FastPathUnsupported('timestamp out of range')
+            return {'kind': 'cues', 'cues': cues}
+        except fastpath.FastPathUnsupported:
+            pass
+    return {'kind': 'subs', 'subs': parse_with_pysubs2(srt_file, text, plan)}
+
+
+def document_lines(doc):
+    """文档中的字幕条数（不含插入的自定义字幕）"""
+    if doc['kind'] == 'cues':
+        return len(doc['cues'])
+    return len(doc['subs'].events)
+
+
+def document_texts(doc):
+    """文档中需要繁体转换的文本列表"""
+    if doc['kind'] == 'cues':
+        return [cue[2] for cue in doc['cues']]
+    return [event.text for event in doc['subs'].events]
+
+
+def transform_document(doc, plan, token=None, stats=None):
+    """繁体转换（离线为 CPU 计算，在线为网络请求）；stats 见 convert_texts_to_china"""
+    if plan.convert_to_china:
+        if token:
+            token.check()
+        apply_texts(doc, convert_texts_to_china(document_texts(doc), plan.china_engine, plan.online_options,
+                                                token, stats))
+
+
+def apply_texts(doc, texts):
+    """把转换后的文本写回文档"""
+    if doc['kind'] == 'cues':
+        cues = doc['cues']
+        for i, text in enumerate(texts[:len(cues)]):
+            cues[i] = (cues[i][0], cues[i][1], text)
+    else:
+        for event, text in zip(doc['subs'].events, texts):
+            event.text = text
+
+
+def render_document(doc, plan):
+    """生成输出的 ASS 文本（插入自定义字幕）"""
+    import fastpath
+    if doc['kind'] == 'cues':
+        lines = [plan.header]
+        lines.extend(fastpath.render_events(doc['cues']))
+        lines.append(plan.inserts_text)
+        return ''.join(lines)
+
+    subs = doc['subs']
+    subs.events.extend(event.copy() for event in plan.insert_events)
+    return subs.to_string('ass')
+
+
+def write_output(ass_file, content):
+    """保存输出文件（I/O）"""
+    with open(ass_file, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def finish_source(srt_file, ass_file, plan):
+    """按设置删除原文件，返回结果信息"""
+    # 删除原文件（输出覆盖了原文件时不能删除）
+    if plan.delete_original and os.path.abspath(srt_file) != os.path.abspath(ass_file):
+        os.remove(srt_file)
+
+    return f"已保存到: {ass_file}"
+
+
+def iter_chunks(cues):
+    """把字幕流切成有限大小的批次"""
+    chunk = []
+    chars = 0
+    for cue in cues:
+        chunk.append(cue)
+        chars += len(cue[2])
+        if len(chunk) >= STREAM_CHUNK_CUES or chars >= STREAM_CHUNK_CHARS:
+            yield chunk
+            chunk = []
+            chars = 0
+    if chunk:
+        yield chunk
+
+
+def convert_plain_stream(srt_file, ass_file, plan, token=None, stats=None):
+    """流式快速路径：边读边写，繁体转换按批进行，适合数百MB的超大文件；返回字幕条数
+
+    先写入临时文件，完成后再替换为输出文件；每批之前检查 token，取消或出错时删除临时文件，
+    不会留下写了一半的输出。stats 见 convert_texts_to_china。
+    """
+    import fastpath
+    tmp_file = ass_file + '.tmp'
+    with open(srt_file, 'r', encoding='utf-8') as src:
+        # 格式识别只需要文件开头，与 pysubs2 一样取前 10000 个字符
+        fmt = fastpath.detect_format(srt_file, src.read(10000))
+        src.seek(0)
+
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as dst:
+                dst.write(plan.header)
+
+                lines = 0
+                for chunk in iter_chunks(fastpath.clamp_times(fastpath.iter_cues(src, fmt))):
+                    if token:
+                        token.check()
+                    lines += len(chunk)
+                    # 繁体转换
+                    if plan.convert_to_china:
+                        converted_texts = convert_texts_to_china([cue[2] for cue in chunk], plan.china_engine,
+                                                                 plan.online_options, token, stats)
+                        for i, text in enumerate(converted_texts[:len(chunk)]):
+                            chunk[i] = (chunk[i][0], chunk[i][1], text)
+                    dst.writelines(fastpath.render_events(chunk))
+
+                # 插入自定义字幕
+                dst.write(plan.inserts_text)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+    os.replace(tmp_file, ass_file)
+    return lines
+
+
+def parse_with_pysubs2(srt_file, text, plan):
+    """完整路径：通过 pysubs2 解析并设置样式"""
+    import pysubs2
+    # 加载字幕文件
+    if srt_file.endswith('.srt') or srt_file.endswith('.ass'):
+        subs = pysubs2.SSAFile.from_string(text)
+    elif srt_file.endswith('.vtt'):
+        subs = pysubs2.SSAFile.from_string(text, format_='vtt')
+    else:
+        raise ValueError('Unsupported file format')
+
+    # 设置样式信息
+    if not srt_file.endswith('.ass'):
+        # 对于非ASS文件，设置默认样式信息
+        subs.info = dict(plan.script_info)
+
+        # 设置默认字幕样式
+        subs.styles['Default'] = plan.style.copy()
+    else:
+        # 对于ASS文件，保留原有信息但更新分辨率
+        if 'PlayResX' not in subs.info or not subs.info['PlayResX']:
+            subs.info['PlayResX'] = '1920'
+        if 'PlayResY' not in subs.info or not subs.info['PlayResY']:
+            subs.info['PlayResY'] = '1080'
+
+        # 更新或创建Default样式
+        if 'Default' in subs.styles:
+            # 保留原有样式，只更新颜色
+            default_style = subs.styles['Default']
+            default_style.primarycolor = plan.subtitle_color
+            default_style.outlinecolor = plan.outline_color
+        else:
+            # 创建新的Default样式
+            subs.styles['Default'] = plan.style.copy()
+
+    return subs
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量转换引擎
+进程池后端：常驻的工作进程只导入一次 pysubs2，按块接收任务，
+只向主进程返回很小的结果记录，从而绕过 GIL 使用全部 CPU 核心；
+每个进程内的一块任务再由 pipeline.ConversionPipeline 分阶段执行，读写等待与解析互相重叠。
+取消时主进程增加共享的取消代数，各工作进程中的监视线程发现后取消本块的流水线，排队中的块直接返回取消的结果。
+主进程正在记录时间线时，工作进程同样记录，随每块的结果交回（见 tracing）。
+以 spawn / forkserver 方式启动的工作进程以 poolmain 为主模块，不会重新执行图形界面的 toAss.py、加载 PyQt5。
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+import importlib.util
+import multiprocessing
+
+import zhclient
+import tracing
+from batch import CancelToken, ConversionCancelled
+from converter import as_plan, convert_with_plan
+from pipeline import ConversionPipeline, cancelled_result, make_result, merge_stage_stats
+
+# 图形界面分段提交一个大批次：每段给每个进程一块任务（块大小即该值），同时执行两段。
+# 暂停只在段之间生效，段小则暂停后每个进程最多再转换两块；16 个文件一块时通信和启动流水线的开销仍可忽略
+SEGMENT_PER_WORKER = 16
+# 工作进程检查取消的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.05
+# spawn / forkserver 启动的工作进程执行的主模块
+WORKER_MAIN_MODULE = 'poolmain'
+
+# 工作进程中共享的取消代数（由 _init_worker 设置）
+_cancel_state = None
+
+
+def run_job(src, dst, plan, token=None):
+    """按转换计划执行单个转换任务并返回结果记录，不抛出异常"""
+    start = time.perf_counter()
+    stats = {'path': src}
+    try:
+        message = convert_with_plan(src, dst, plan, stats, token)
+        end = time.perf_counter()
+        tracing.add_job(src, start, end, True)
+        return make_result(src, dst, True, message, end - start, stats['lines'], stats=stats)
+    except ConversionCancelled:
+        end = time.perf_counter()
+        tracing.add_job(src, start, end, False, cancelled=True)
+        return cancelled_result(src, dst, end - start)
+    except Exception as e:
+        end = time.perf_counter()
+        tracing.add_job(src, start, end, False)
+        return make_result(src, dst, False, str(e), end - start, stats=stats)
+
+
+def run_jobs(jobs, options, stage_stats=None, token=None):
+    """在当前进程中执行一组任务，按完成顺序产出结果记录
+
+    options 为 convert_file 的其余参数或编译好的 ConversionPlan，整批只编译一次。
+    多个任务通过 ConversionPipeline 分阶段执行，读写、在线转换和解析互不占用线程；
+    stage_stats 为字典时累加各阶段的统计。token 取消后其余任务产出取消的结果记录。
+    """
+    plan = as_plan(options)
+    if len(jobs) <= 1:
+        for src, dst in jobs:
+            yield run_job(src, dst, plan, token)
+        return
+
+    results = queue.Queue()
+    pipeline = ConversionPipeline(plan, results.put, token=token)
+
+    def feed():
+        for job in jobs:
+            pipeline.submit(job)
+        pipeline.close(wait=False)
+
+    feeder = threading.Thread(target=feed, name='pipeline-feeder', daemon=True)
+    feeder.start()
+    for _ in range(len(jobs)):
+        yield results.get()
+    pipeline.join()
+    if stage_stats is not None:
+        merge_stage_stats(stage_stats, pipeline.stage_stats())
+
+
+def _init_worker(limiter_state, cancel_state):
+    """工作进程初始化：预先导入转换依赖，后续任务无需重复加载；所有进程共用在线转换的令牌桶和取消代数"""
+    global _cancel_state
+    import pysubs2  # noqa: F401
+    import fastpath  # noqa: F401
+    zhclient.install_shared_limiter(limiter_state)
+    _cancel_state = cancel_state
+    # fork 出的进程会继承主进程的记录状态，是否记录由每块任务决定
+    tracing.stop()
+
+
+def _watch_cancel(generation, token, stop):
+    """取消代数变化时取消本块的任务"""
+    while True:
+        if _cancel_state.value != generation:
+            token.cancel()
+            return
+        if stop.wait(CANCEL_POLL_INTERVAL):
+            return
+
+
+def _run_chunk(chunk):
+    """在工作进程中执行一块任务，转换计划每块只传递一次；同时返回各阶段的统计和时间线记录"""
+    plan, jobs, generation, trace = chunk
+    stage_stats = {}
+    if _cancel_state.value != generation:
+        # 排队期间已经取消，不必启动流水线
+        return [cancelled_result(src, dst) for src, dst in jobs], stage_stats, None
+    if trace:
+        tracing.start()
+    token = CancelToken()
+    stop = threading.Event()
+    watcher = threading.Thread(target=_watch_cancel, args=(generation, token, stop), name='cancel-watcher',
+                               daemon=True)
+    watcher.start()
+    try:
+        with tracing.span('chunk', 'batch', {'files': len(jobs)}):
+            results = list(run_jobs(jobs, plan, stage_stats, token))
+    finally:
+        stop.set()
+        spans = tracing.stop() if trace else None
+    return results, stage_stats, spans
+
+
+# 正在运行的进程池数和替换前主模块的 __spec__（见 _use_worker_main）
+_worker_main_users = 0
+_saved_main_spec = None
+_worker_main_lock = threading.Lock()
+
+
+def _use_worker_main():
+    """在进程池运行期间把主进程的主模块声明为 WORKER_MAIN_MODULE，返回是否做了替换
+
+    spawn / forkserver 按主模块的 __spec__ 决定工作进程重新执行哪个模块，没有 __spec__ 时（直接运行脚本）执行脚本文件。
+    进程池在工作进程意外退出后会补充新的进程，所以替换一直保持到最后一个进程池关闭（_release_worker_main）。
+    fork 启动的进程直接继承主进程，不需要；打包后的程序由 freeze_support 处理，也不修改。
+    """
+    global _worker_main_users, _saved_main_spec
+    main = sys.modules.get('__main__')
+    if (main is None or getattr(sys, 'frozen', False)
+            or multiprocessing.get_start_method() == 'fork'):
+        return False
+    with _worker_main_lock:
+        if _worker_main_users == 0:
+            _saved_main_spec = getattr(main, '__spec__', None)
+            main.__spec__ = importlib.util.find_spec(WORKER_MAIN_MODULE)
+        _worker_main_users += 1
+    return True
+
+
+def _release_worker_main():
+    """一个进程池关闭，最后一个关闭时恢复主模块的 __spec__"""
+    global _worker_main_users, _saved_main_spec
+    with _worker_main_lock:
+        _worker_main_users -= 1
+        if _worker_main_users == 0:
+            sys.modules['__main__'].__spec__ = _saved_main_spec
+            _saved_main_spec = None
+
+
+def split_chunks(jobs, chunksize):
+    """把任务列表按固定大小切块"""
+    for i in range(0, len(jobs), chunksize):
+        yield jobs[i:i + chunksize]
+
+
+class ProcessPoolEngine:
+    """常驻进程池转换引擎
+
+    进程在第一次运行时启动，多个批次之间保持常驻，调用 close() 后退出。
+    """
+
+    def __init__(self, workers=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._pool = None
+        self._worker_main = False
+        self._cancel_state = multiprocessing.Value('i', 0)
+
+    def start(self):
+        """启动工作进程"""
+        if self._pool is None:
+            limiter_state = multiprocessing.Array('d', 2)
+            self._worker_main = _use_worker_main()
+            try:
+                self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                                  initargs=(limiter_state, self._cancel_state))
+            except BaseException:
+                self._release()
+                raise
+
+    def cancel(self):
+        """取消当前正在运行的所有批次：执行中的块尽快结束，排队中的块直接返回取消的结果"""
+        with self._cancel_state.get_lock():
+            self._cancel_state.value += 1
+
+    def close(self):
+        """关闭工作进程"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            self._release()
+
+    def _release(self):
+        if self._worker_main:
+            self._worker_main = False
+            _release_worker_main()
+
+    def chunksize_for(self, job_count):
+        """根据任务数量计算块大小：足够大以摊薄通信开销，又足够小以均衡负载"""
+        return max(1, min(64, job_count // (self.workers * 4)))
+
+    def run(self, jobs, options, chunksize=None, stage_stats=None, token=None):
+        """转换一批任务，按完成顺序逐个产出结果记录
+
+        jobs 为 (输入文件, 输出文件) 列表，options 为 convert_file 的其余参数或编译好的 ConversionPlan。
+        stage_stats 为字典时累加各工作进程中流水线各阶段的统计。
+        token 为 batch.CancelToken，取消时调用 cancel()，其余任务产出取消的结果记录。
+        当前进程正在记录时间线时，工作进程中的记录合并到当前进程。
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+        # 在主进程中编译一次，配置有误时直接抛出，不必等每个工作进程各失败一次
+        plan = as_plan(options)
+        if token and token.cancelled:
+            for src, dst in jobs:
+                yield cancelled_result(src, dst)
+            return
+        self.start()
+        generation = self._cancel_state.value
+        unregister = token.register(self.cancel) if token else None
+        try:
+            chunksize = chunksize or self.chunksize_for(len(jobs))
+            trace = tracing.active()
+            chunks = ((plan, chunk, generation, trace) for chunk in split_chunks(jobs, chunksize))
+            for results, chunk_stats, spans in self._pool.imap_unordered(_run_chunk, chunks):
+                if stage_stats is not None:
+                    merge_stage_stats(stage_stats, chunk_stats)
+                if spans:
+                    tracing.extend(*spans)
+                yield from results
+        finally:
+            if unregister:
+                unregister()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
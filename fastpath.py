@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SRT / VTT 直接转 ASS 的快速路径
+单次扫描解析时间轴和文本，直接生成 Dialogue 行，不构建 pysubs2 的 SSAEvent 对象。
+
+解析规则逐条对应 pysubs2 1.8 的 SubRip / WebVTT 读取器，输出与 pysubs2 完全一致；
+遇到快速路径无法保证一致的输入时抛出 FastPathUnsupported，由调用方改用 pysubs2。
+"""
+
+import io
+import re
+import warnings
+import pysubs2
+from pysubs2.formats import FORMAT_IDENTIFIER_TO_FORMAT_CLASS
+
+# 与 pysubs2 输出逐字节一致的前提是解析和序列化规则相同，只对验证过的版本启用
+SUPPORTED_PYSUBS2_VERSIONS = ('1.8.',)
+ENABLED = pysubs2.VERSION.startswith(SUPPORTED_PYSUBS2_VERSIONS)
+
+SRT_TIMESTAMP = re.compile(r"(\d{1,2}):(\d{1,2}):(\d{1,2})[.,](\d{1,3})")
+VTT_TIMESTAMP = re.compile(r"(\d{0,4}:)?(\d{2}):(\d{2})\.(\d{2,3})")
+# 只有"时间戳 --> 时间戳"的常规时间轴行。整行匹配时 findall 在这一行恰好找到这两个时间戳，
+# 因此可以用一次 split 把全文切成 [前言, 两端时间戳的分组..., 字幕文本, ...]
+SRT_TIMING_LINE = re.compile(r"^" + SRT_TIMESTAMP.pattern + " --> " + SRT_TIMESTAMP.pattern + r"\r?(?:\n|\Z)",
+                             re.MULTILINE)
+VTT_TIMING_LINE = re.compile(r"^" + VTT_TIMESTAMP.pattern + " --> " + VTT_TIMESTAMP.pattern + r"\r?(?:\n|\Z)",
+                             re.MULTILINE)
+
+# ASS 时间戳上限 9:59:59.99，超出时 pysubs2 会截断并给出警告
+MAX_ASS_TIME = 10 * 3600000 - 10
+
+_BLANK_LINE = re.compile(r"\s*$")
+_NUMBER_LINE = re.compile(r"\s*\d+\s*$")
+_NEXT_NUMBER = re.compile(r"\n+ *\d+ *$")
+_HTML_TAGS = [
+    (re.compile(r"< *i *>"), r"{\\i1}"),
+    (re.compile(r"< */ *i *>"), r"{\\i0}"),
+    (re.compile(r"< *s *>"), r"{\\s1}"),
+    (re.compile(r"< */ *s *>"), r"{\\s0}"),
+    (re.compile(r"< *u *>"), r"{\\u1}"),
+    (re.compile(r"< */ *u *>"), r"{\\u0}"),
+    (re.compile(r"< *b *>"), r"{\\b1}"),
+    (re.compile(r"< */ *b *>"), r"{\\b0}"),
+]
+_OTHER_HTML_TAG = re.compile(r"< */? *[a-zA-Z][^>]*>")
+
+
+# TMP 行以"时:分:秒:"开头；以冒号开头的模式可以按字面量快速跳过，比从数字开始匹配快数倍
+_TMP_CANDIDATE = re.compile(r":\d{2}:\d{2}:")
+
+# 各格式识别函数的必要条件：文本中没有对应特征时该格式不可能被识别，可以跳过较慢的正则扫描
+_GUESS_PREFILTERS = {
+    'ass': lambda text: 'V4' in text or 'v4' in text,
+    'ssa': lambda text: 'V4' in text or 'v4' in text,
+    'microdvd': lambda text: '{' in text,
+    'mpl2': lambda text: '[' in text,
+    'tmp': lambda text: _TMP_CANDIDATE.search(text) is not None,
+}
+
+
+class FastPathUnsupported(Exception):
+    """输入需要 pysubs2 完整处理"""
+
+
+def guess_formats(fragment):
+    """返回 pysubs2 对该片段识别出的全部格式（结果与 autodetect_format 使用的集合相同）"""
+    formats = set()
+    for name, impl in FORMAT_IDENTIFIER_TO_FORMAT_CLASS.items():
+        prefilter = _GUESS_PREFILTERS.get(name)
+        if prefilter is not None and not prefilter(fragment):
+            continue
+        guess = impl.guess_format(fragment)
+        if guess is not None:
+            formats.add(guess)
+    return formats
+
+
+def detect_format(path, text):
+    """确定快速路径使用的格式：'srt' 或 'vtt'
+
+    与 converter 的加载方式一致：.vtt 强制按 WebVTT 解析，.srt 按内容自动识别，
+    识别结果不是 SRT（例如内容其实是 ASS）时不走快速路径。
+    """
+    if path.endswith('.vtt'):
+        return 'vtt'
+    if path.endswith('.srt') and guess_formats(text[:10000]) == {'srt'}:
+        return 'srt'
+    raise FastPathUnsupported(path)
+
+
+_FRACTION_SCALE = {1: 100, 2: 10, 3: 1}
+
+
+def _srt_time(groups):
+    h, m, s, frac = groups
+    return ((int(h) * 60 + int(m)) * 60 + int(s)) * 1000 + int(frac) * _FRACTION_SCALE[len(frac)]
+
+
+def _vtt_time(groups):
+    h, m, s, ms = groups
+    return (int(h.strip(':')) if h else 0) * 3600000 + int(m) * 60000 + int(s) * 1000 + int(ms)
+
+
+def _digit_table(widths, scale):
+    """数字字符串到 int(字符串) * scale 的查找表，查表比逐个调用 int() 快"""
+    return {f'{value:0{width}d}': value * scale for width in widths for value in range(10 ** width)}
+
+
+# 常规时间轴各字段的查找表：时、分、秒为 1~2 位；SRT 的小数部分按位数折算为毫秒，WebVTT 为 2~3 位毫秒
+_HOURS = _digit_table((1, 2), 3600000)
+_MINUTES = _digit_table((1, 2), 60000)
+_SECONDS = _digit_table((1, 2), 1000)
+_SRT_FRACTIONS = {key: value * _FRACTION_SCALE[len(key)] for key, value in _digit_table((1, 2, 3), 1).items()}
+_VTT_HOURS = {key + ':': value for key, value in _HOURS.items()}
+# 没有小时部分时分组为 None
+_VTT_HOURS[None] = 0
+_VTT_FRACTIONS = _digit_table((2, 3), 1)
+
+
+def _split_times(parts, hours, fractions):
+    """从 split 的结果中取出每条字幕的开始和结束毫秒；有查找表之外的值时返回 None"""
+    try:
+        return [(hours[h1] + _MINUTES[m1] + _SECONDS[s1] + fractions[f1],
+                 hours[h2] + _MINUTES[m2] + _SECONDS[s2] + fractions[f2])
+                for h1, m1, s1, f1, h2, m2, s2, f2 in zip(parts[1::9], parts[2::9], parts[3::9], parts[4::9],
+                                                          parts[5::9], parts[6::9], parts[7::9], parts[8::9])]
+    except KeyError:
+        return None
+
+
+def _prepare_text(lines):
+    """把时间轴后的文本行整理成 ASS 文本（规则同 pysubs2 SubripFormat）"""
+    if (len(lines) >= 2
+            and not lines[0].strip()
+            and all(_BLANK_LINE.match(line) for line in lines[1:-1])
+            and _NUMBER_LINE.match(lines[-1])):
+        return ""
+
+    return _clean_text("".join(lines).strip())
+
+
+def _prepare_block(block):
+    """与 _prepare_text 相同，参数为各行连接成的字符串"""
+    if block[:1].isspace():
+        newline = block.find("\n")
+        if newline != -1 and not block[:newline].strip():
+            # 第一行为空时可能是"只有下一条序号"的空字幕，按行判断
+            return _prepare_text(io.StringIO(block).readlines())
+    return _clean_text(block.strip())
+
+
+def _clean_text(s):
+    if s[-1:].isdecimal():
+        # 去掉下一条字幕的序号：与 _NEXT_NUMBER.sub("", s) 相同，最后一行只有空格和数字时连同之前的换行一起去掉
+        head, newline, tail = s.rpartition("\n")
+        if newline and tail.lstrip(" ").isdecimal():
+            s = head.rstrip("\n")
+    if '<' in s:
+        for pattern, repl in _HTML_TAGS:
+            s = pattern.sub(repl, s)
+        s = _OTHER_HTML_TAG.sub("", s)
+    return s.replace("\n", "\\N")
+
+
+def _timestamp_parser(fmt):
+    if fmt == 'vtt':
+        return VTT_TIMESTAMP, _vtt_time
+    return SRT_TIMESTAMP, _srt_time
+
+
+def _has_timing_line(block, timestamp):
+    """文本中是否有恰好包含两个时间戳的行（即非常规格式的时间轴行）"""
+    findall = timestamp.findall
+    return any(len(findall(line)) == 2 for line in block.split("\n") if ':' in line)
+
+
+def parse_cues(text, fmt):
+    """解析 SRT / VTT 文本，返回 [(开始毫秒, 结束毫秒, 文本), ...]
+
+    常规文件用一次正则 split 切分；时间轴行带有其他内容（例如 WebVTT 的位置设置）时逐行解析。
+    """
+    if fmt == 'vtt':
+        timing_line, hours, fractions = VTT_TIMING_LINE, _VTT_HOURS, _VTT_FRACTIONS
+    else:
+        timing_line, hours, fractions = SRT_TIMING_LINE, _HOURS, _SRT_FRACTIONS
+    parts = timing_line.split(text)
+    timestamp = _timestamp_parser(fmt)[0]
+    blocks = parts[::9]
+    if not any(':' in block and _has_timing_line(block, timestamp) for block in blocks):
+        times = _split_times(parts, hours, fractions)
+        if times is not None:
+            return [(start, end, _prepare_block(block)) for (start, end), block in zip(times, blocks[1:])]
+    return _parse_cues_by_line(text, fmt)
+
+
+def _parse_cues_by_line(text, fmt):
+    """逐行查找时间轴的通用解析（规则同 pysubs2）"""
+    timestamp, to_ms = _timestamp_parser(fmt)
+
+    # 与 pysubs2 逐行读取的切分方式相同：只按 \n 分行，行尾保留换行符
+    lines = io.StringIO(text).readlines()
+
+    # 时间轴行：恰好包含两个时间戳的行（时间戳必然包含冒号，其余行跳过正则）
+    marks = []
+    findall = timestamp.findall
+    for i in [i for i, line in enumerate(lines) if ':' in line]:
+        stamps = findall(lines[i])
+        if len(stamps) == 2:
+            marks.append((i, to_ms(stamps[0]), to_ms(stamps[1])))
+
+    cues = []
+    for k, (i, start, end) in enumerate(marks):
+        stop = marks[k + 1][0] if k + 1 < len(marks) else len(lines)
+        cues.append((start, end, _prepare_text(lines[i + 1:stop])))
+    return cues
+
+
+def iter_cues(lines, fmt):
+    """逐行解析 SRT / VTT，每读完一条字幕就产出 (开始毫秒, 结束毫秒, 文本)
+
+    规则与 parse_cues 相同，但不需要一次读入整个文件，内存占用只取决于单条字幕的长度。
+    lines 可以是以文本模式打开的文件对象。
+    """
+    timestamp, to_ms = _timestamp_parser(fmt)
+    findall = timestamp.findall
+    times = None
+    block = []
+    for line in lines:
+        if ':' in line:
+            stamps = findall(line)
+            if len(stamps) == 2:
+                if times is not None:
+                    yield times[0], times[1], _prepare_text(block)
+                times = (to_ms(stamps[0]), to_ms(stamps[1]))
+                block = []
+                continue
+        if times is not None:
+            block.append(line)
+    if times is not None:
+        yield times[0], times[1], _prepare_text(block)
+
+
+def clamp_times(cues):
+    """把超出 ASS 范围的时间截断到上限（与 pysubs2 保存时的处理相同）"""
+    for start, end, text in cues:
+        if start > MAX_ASS_TIME or end > MAX_ASS_TIME:
+            warnings.warn("Overflow in SubStation timestamp, clamping to MAX_REPRESENTABLE_TIME", RuntimeWarning)
+            start, end = min(start, MAX_ASS_TIME), min(end, MAX_ASS_TIME)
+        yield start, end, text
+
+
+def check_times(cues):
+    """超出 ASS 时间范围时由 pysubs2 处理截断"""
+    for start, end, _ in cues:
+        if start > MAX_ASS_TIME or end > MAX_ASS_TIME or start < 0 or end < 0:
+            raise FastPathUnsupported('timestamp out of range')
+
+
+def ass_timestamp(ms):
+    """毫秒转 ASS 时间格式 H:MM:SS.cc（四舍五入规则同 pysubs2 / Aegisub）"""
+    cs = (ms + 5) // 10
+    return '%d:%02d:%02d.%02d' % (cs // 360000, cs // 6000 % 60, cs // 100 % 60, cs % 100)
+
+
+def render_events(cues):
+    """生成使用 Default 样式、其余字段为默认值的 Dialogue 行（时间格式同 ass_timestamp）"""
+    lines = []
+    append = lines.append
+    for start, end, text in cues:
+        a = (start + 5) // 10
+        b = (end + 5) // 10
+        append('Dialogue: 0,%d:%02d:%02d.%02d,%d:%02d:%02d.%02d,Default,,0,0,0,,%s\n'
+               % (a // 360000, a // 6000 % 60, a // 100 % 60, a % 100,
+                  b // 360000, b // 6000 % 60, b // 100 % 60, b % 100, text))
+    return lines
+
+
+def render_header(info, default_style):
+    """用 pysubs2 渲染不含事件的 ASS 文件头，保证与完整路径一致"""
+    subs = pysubs2.SSAFile()
+    subs.info = dict(info)
+    subs.styles['Default'] = default_style
+    return subs.to_string('ass')
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单实例通信
+图形界面常驻托盘时在本地套接字上监听（Windows 为命名管道），再次启动程序时把文件交给已经在运行的实例后立即退出；
+脚本也可以通过同一通道向常驻实例提交批量转换任务（见 cli.py submit）。
+这里只使用标准库，再次启动的进程不必加载 PyQt5。
+
+每个请求和回复都是一行 UTF-8 编码的 JSON 对象：
+  {"command": "show"}                                  显示主窗口
+  {"command": "open", "files": [...]}                  把文件和文件夹加入文件列表并显示主窗口
+  {"command": "convert", "files": [...], "output_directory": "...", "wait": false}
+                                                       按界面当前的设置转换一批文件，多个任务依次排队；
+                                                       wait 为 true 时转换结束后才回复结果
+  {"command": "status"}                                当前进度和排队中的任务数
+回复中 ok 表示请求是否被接受，为 false 时 error 为原因。
+
+转换请求按界面的设置执行（包括转换后删除原文件），所以只接受当前用户的连接：
+套接字文件放在只有当前用户可以访问的目录中（见 runtime_dir），服务端还会检查连接进程的用户（见 peer_uid）。
+"""
+
+import os
+import sys
+import json
+import stat
+import socket
+import struct
+import tempfile
+import time
+
+# 连接和等待普通请求回复的超时（秒）
+CONNECT_TIMEOUT = 2.0
+# Windows 上所有管道实例都忙时的重试间隔（秒）
+PIPE_BUSY_RETRY = 0.05
+
+
+def _private_dir(path, uid):
+    """path 是否为属于 uid、其他用户无法访问的目录（不跟随符号链接）"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == uid and not st.st_mode & 0o077
+
+
+def runtime_dir():
+    """存放套接字文件的目录（非 Windows），只有当前用户可以访问，其他用户无法抢先创建或连接套接字
+
+    优先使用 XDG_RUNTIME_DIR（由登录会话为每个用户创建，权限 0700），否则使用临时目录中的 toass-<uid> 目录（权限 0700）。
+    该目录已被其他用户创建或权限过宽时抛出 PermissionError。
+    """
+    uid = os.getuid()
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime and _private_dir(runtime, uid):
+        return runtime
+    path = os.path.join(tempfile.gettempdir(), f'toass-{uid}')
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    if not _private_dir(path, uid):
+        raise PermissionError(f'{path} 不属于当前用户或其他用户可以访问，不使用单实例通信')
+    return path
+
+
+def server_name():
+    """本地服务的名称，每个用户一个
+
+    Windows 为命名管道名（QLocalServer 自动加上 \\\\.\\pipe\\ 前缀）；
+    其他系统为 runtime_dir() 中的套接字文件的完整路径，QLocalServer 和标准库 socket 使用同一路径。
+    """
+    if sys.platform == 'win32':
+        user = os.environ.get('USERNAME', 'user')
+        return f'toass-{user}'
+    return os.path.join(runtime_dir(), 'toass.sock')
+
+
+def peer_uid(fd):
+    """本地套接字 fd 的对端进程的用户 ID；Windows 或无法取得时返回 None"""
+    if sys.platform == 'win32':
+        return None
+    sock = socket.socket(fileno=os.dup(fd))
+    try:
+        if hasattr(socket, 'SO_PEERCRED'):
+            # Linux：struct ucred (pid, uid, gid)
+            creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+            return struct.unpack('3i', creds)[1]
+        # macOS / BSD：getsockopt(SOL_LOCAL, LOCAL_PEERCRED) 返回 struct xucred，版本号之后是用户 ID
+        creds = sock.getsockopt(0, 1, 76)
+        return struct.unpack_from('2I', creds)[1]
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+def encode_message(message):
+    """把请求或回复编码为一行 JSON"""
+    return json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def decode_message(line):
+    """解析一行 JSON 请求或回复，不是 JSON 对象时抛出 ValueError"""
+    message = json.loads(line.decode('utf-8'))
+    if not isinstance(message, dict):
+        raise ValueError('消息必须是 JSON 对象')
+    return message
+
+
+def _connect(timeout):
+    """连接正在运行的实例，返回可读写的文件对象；没有实例在运行时返回 None"""
+    name = server_name()
+    if sys.platform == 'win32':
+        path = r'\\.\pipe' + '\\' + name
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while True:
+            try:
+                return open(path, 'r+b', buffering=0)
+            except FileNotFoundError:
+                return None
+            except OSError:
+                # 所有管道实例都在忙（ERROR_PIPE_BUSY），稍后重试
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(PIPE_BUSY_RETRY)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(name)
+    except (FileNotFoundError, ConnectionRefusedError):
+        # 没有实例在运行，或上次异常退出留下的套接字文件
+        sock.close()
+        return None
+    except OSError:
+        sock.close()
+        raise
+    sock.settimeout(timeout)
+    channel = sock.makefile('rwb')
+    sock.close()  # makefile 持有套接字的引用，关闭文件对象时才真正关闭
+    return channel
+
+
+def send_request(request, timeout=CONNECT_TIMEOUT):
+    """把请求发给正在运行的实例并返回回复；没有实例在运行时返回 None
+
+    timeout 为等待回复的秒数，None 为一直等待（例如等待转换结束）。实例没有回复时抛出 ConnectionError。
+    """
+    channel = _connect(timeout)
+    if channel is None:
+        return None
+    with channel:
+        channel.write(encode_message(request))
+        channel.flush()
+        line = channel.readline()
+    if not line:
+        raise ConnectionError('正在运行的实例没有回复')
+    return decode_message(line)
+
+
+def file_arguments(args):
+    """命令行参数中存在的文件和文件夹（绝对路径），忽略 Qt 的选项及其参数"""
+    return [os.path.abspath(arg) for arg in args if not arg.startswith('-') and os.path.exists(arg)]
+
+
+def forward_to_running(args):
+    """再次启动程序时调用：已有实例在运行时把参数中的文件交给它（没有文件时让它显示主窗口），返回 True
+
+    没有实例在运行或通信失败时返回 False，由调用方正常启动。
+    """
+    files = file_arguments(args)
+    request = {'command': 'open', 'files': files} if files else {'command': 'show'}
+    try:
+        reply = send_request(request)
+    except (OSError, ValueError):
+        return False
+    return reply is not None
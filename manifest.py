@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量转换清单
+在每个输出目录中保存 .toass-manifest.json，记录每个输出文件对应的输入文件内容哈希和转换设置哈希。
+再次转换时，输入、设置和输出都没有变化的文件直接跳过：
+先比较文件大小和修改时间，只有二者变化时才重新计算输入文件的哈希。
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+from converter import OUTPUT_VERSION, china_engine_version, insert_events
+
+MANIFEST_FILE = '.toass-manifest.json'
+MANIFEST_VERSION = 1
+
+
+def file_digest(path):
+    """计算文件内容的 SHA-1"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_fingerprint(options):
+    """影响输出内容的转换设置的哈希（options 与 convert_file 的参数相同）"""
+    convert_to_china = bool(options.get('convert_to_china'))
+    engine = options.get('china_engine')
+    settings = {
+        'output_version': OUTPUT_VERSION,
+        'font_family': options.get('font_family'),
+        'font_size': options.get('font_size'),
+        'subtitle_color': options.get('subtitle_color'),
+        'outline_color': options.get('outline_color'),
+        # 记录插入字幕的实际内容，配置被修改时同样需要重新生成
+        'inserts': insert_events(options.get('insert_options', []), options.get('subtitle_configs', [])),
+        'convert_to_china': convert_to_china,
+        'china_engine': china_engine_version(engine, options.get('online_options')) if convert_to_china else None,
+    }
+    data = json.dumps(settings, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+class OutputManifest:
+    """一个输出目录的转换清单，键为输出文件名"""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, MANIFEST_FILE)
+        self.entries = {}
+        self._dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.entries = data.get('files', {})
+        except (OSError, ValueError):
+            # 清单不存在或已损坏时全部重新转换
+            pass
+
+    def check(self, src, dst, settings_hash):
+        """检查输出是否为最新
+
+        返回 (是否最新, 输入文件指纹)；需要转换时指纹用于转换成功后写入清单，输入文件无法读取时为 None。
+        """
+        try:
+            src_stat = os.stat(src)
+        except OSError:
+            # 输入文件无法读取时照常交给转换，由转换结果报告失败
+            return False, None
+        name = os.path.basename(dst)
+        entry = self.entries.get(name)
+        if entry and entry['settings'] == settings_hash and entry['input'] == os.path.abspath(src):
+            try:
+                dst_stat = os.stat(dst)
+                output_unchanged = (dst_stat.st_size == entry['output_size']
+                                    and dst_stat.st_mtime_ns == entry['output_mtime_ns'])
+            except OSError:
+                output_unchanged = False
+
+            if output_unchanged:
+                if src_stat.st_size == entry['size'] and src_stat.st_mtime_ns == entry['mtime_ns']:
+                    return True, None
+                # 修改时间变了但内容可能没变（例如重新复制），比较哈希
+                digest = file_digest(src)
+                if digest == entry['sha1']:
+                    entry['size'] = src_stat.st_size
+                    entry['mtime_ns'] = src_stat.st_mtime_ns
+                    self._dirty = True
+                    return True, None
+            else:
+                digest = file_digest(src)
+        else:
+            digest = file_digest(src)
+
+        return False, {
+            'input': os.path.abspath(src),
+            'size': src_stat.st_size,
+            'mtime_ns': src_stat.st_mtime_ns,
+            'sha1': digest,
+            'settings': settings_hash,
+        }
+
+    def record(self, dst, fingerprint):
+        """记录转换成功的输出文件"""
+        dst_stat = os.stat(dst)
+        entry = dict(fingerprint)
+        entry['output_size'] = dst_stat.st_size
+        entry['output_mtime_ns'] = dst_stat.st_mtime_ns
+        self.entries[os.path.basename(dst)] = entry
+        self._dirty = True
+
+    def save(self):
+        """写入清单（先写临时文件再替换，避免中途退出留下损坏的清单）"""
+        if not self._dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.entries}, f, ensure_ascii=False,
+                      separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+class IncrementalTracker:
+    """一批任务的增量转换状态：按输出目录管理清单，记录转换成功的文件"""
+
+    def __init__(self, options):
+        self.settings_hash = settings_fingerprint(options)
+        self._manifests = {}
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+
+    def _manifest_for(self, dst):
+        directory = os.path.dirname(os.path.abspath(dst))
+        manifest = self._manifests.get(directory)
+        if manifest is None:
+            manifest = self._manifests[directory] = OutputManifest(directory)
+        return manifest
+
+    def filter(self, jobs):
+        """把任务分成需要转换和可以跳过的两组"""
+        pending = []
+        skipped = []
+        for src, dst in jobs:
+            current, fingerprint = self._manifest_for(dst).check(src, dst, self.settings_hash)
+            if current:
+                skipped.append((src, dst))
+            else:
+                self._fingerprints[dst] = fingerprint
+                pending.append((src, dst))
+        return pending, skipped
+
+    def record(self, dst):
+        """记录转换成功的输出文件（可在多个线程中调用）"""
+        with self._lock:
+            fingerprint = self._fingerprints.pop(dst, None)
+            if fingerprint is not None:
+                self._manifest_for(dst).record(dst, fingerprint)
+
+    def save(self):
+        """写入所有清单"""
+        with self._lock:
+            for manifest in self._manifests.values():
+                manifest.save()
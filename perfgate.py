@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能回归检查
+对解析、生成 ASS、整批转换、图形界面冷启动和文件列表添加这几条热路径各测量若干次，
+与仓库中提交的基线（perf_baselines.json）比较，明显变慢时以非零状态退出，并列出各场景的对比。
+
+判定方法：当前中位数比基线中位数慢超过该场景的容差，并且单侧 Mann-Whitney U 检验认为当前样本整体大于
+基线样本（p < 0.05）时判为回归；只满足其中一条视为噪声。判为回归的场景会再测量一轮，
+两轮的样本合并后仍然回归才算失败，偶发的系统抖动不会让检查失败。
+不同机器的速度不同：每次测量之后运行一段固定的纯 Python 校准负载，基线和当前各自所有校准耗时的中位数之比
+作为两台机器（或同一台机器两个时刻）的速度比，当前耗时按此折算后再与基线比较。
+
+用法:
+  python perfgate.py check [--runs 7] [--scenarios parse batch ...] [--json 结果.json]
+  python perfgate.py record [--runs 7] [--scenarios ...]    # 在当前机器上重新记录基线
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import tempfile
+import platform
+import statistics
+
+import benchmark
+import converter
+from engine import run_jobs
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perf_baselines.json')
+BASELINE_VERSION = 1
+DEFAULT_RUNS = 7
+# U 检验的显著性水平
+ALPHA = 0.05
+# 文件列表场景添加的路径数
+FILE_LIST_PATHS = 100000
+
+
+class ScenarioUnavailable(Exception):
+    """当前环境无法运行该场景（例如没有安装 PyQt5）"""
+
+
+def calibrate():
+    """固定的纯 Python 负载（字符串、字典、排序）的耗时（秒），作为当前机器速度的参照
+
+    与各场景一样取一次完整运行的耗时（不取多次中的最短），持续时间与场景的单次测量相近，
+    受 CPU 频率和虚拟机调度波动的影响也相近。
+    """
+    start = time.perf_counter()
+    table = {}
+    for i in range(150000):
+        key = f'{i % 977}:{i}'
+        table[key[:6]] = table.get(key[:6], 0) + len(key)
+    sorted(table.items(), key=lambda item: (item[1], item[0]))
+    return time.perf_counter() - start
+
+
+def use_offscreen_without_display():
+    """没有显示器时（例如 CI）让 Qt 使用 offscreen 平台，子进程同样生效"""
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+def setup_parse(work_dir, corpus):
+    """解析：剧集规模的 SRT / VTT（快速路径）和 ASS（pysubs2）"""
+    plan = converter.as_plan(benchmark.default_options())
+    paths = corpus_paths(corpus['episode'])
+    texts = [(path, converter.read_source(path)) for path in paths]
+
+    def sample():
+        start = time.perf_counter()
+        for path, text in texts:
+            converter.parse_source(path, text, plan)
+        return time.perf_counter() - start
+    return sample
+
+
+def setup_serialize(work_dir, corpus):
+    """生成 ASS：把解析好的剧集规模文档生成 ASS 文本"""
+    plan = converter.as_plan(benchmark.default_options())
+    docs = [converter.parse_source(path, converter.read_source(path), plan) for path in corpus_paths(corpus['episode'])]
+
+    def sample():
+        start = time.perf_counter()
+        for doc in docs:
+            converter.render_document(doc, plan)
+        return time.perf_counter() - start
+    return sample
+
+
+def setup_batch(work_dir, corpus):
+    """整批转换：小文件和剧集规模的语料，插入字幕并做离线繁体转换，经分阶段流水线写出"""
+    plan = converter.as_plan(benchmark.suite_options())
+    out_dir = os.path.join(work_dir, 'batch')
+    os.makedirs(out_dir)
+    paths = corpus_paths(corpus['tiny']) + corpus_paths(corpus['episode'])
+    jobs = [(path, os.path.join(out_dir, os.path.basename(path) + '.ass')) for path in paths]
+    # 预热：加载繁简词典
+    converter.convert_with_plan(paths[0], jobs[0][1], plan)
+
+    def sample():
+        start = time.perf_counter()
+        failed = [result['path'] for result in run_jobs(jobs, plan) if not result['ok']]
+        elapsed = time.perf_counter() - start
+        if failed:
+            raise RuntimeError(f'整批转换失败: {failed[0]}')
+        return elapsed
+    return sample
+
+
+def setup_startup(work_dir, corpus):
+    """冷启动：从启动 toAss.py 到主窗口可操作"""
+    try:
+        import PyQt5  # noqa: F401
+    except ImportError:
+        raise ScenarioUnavailable('未安装 PyQt5')
+    use_offscreen_without_display()
+    startup_dir = os.path.join(work_dir, 'startup')
+    os.makedirs(startup_dir)
+
+    def sample():
+        return benchmark.startup_once(startup_dir)['interactive_ms'] / 1000
+    return sample
+
+
+def setup_file_list(work_dir, corpus):
+    """文件列表：向主界面使用的列表模型和视图加入 10 万个文件（含重复），再删除分散的一成"""
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError:
+        raise ScenarioUnavailable('未安装 PyQt5')
+    use_offscreen_without_display()
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    import toAss
+
+    paths = [os.path.join(work_dir, 'library', f'season_{i // 1000:03d}', f'episode_{i:06d}.srt')
+             for i in range(FILE_LIST_PATHS)]
+
+    def sample():
+        view = toAss.DragDropListView()
+        model = toAss.FileListModel(view)
+        view.setModel(model)
+        view.show()
+        start = time.perf_counter()
+        model.add_paths(paths[:len(paths) // 2])
+        app.processEvents()
+        model.add_paths(paths)
+        app.processEvents()
+        model.remove_rows(range(0, len(paths), 10))
+        app.processEvents()
+        elapsed = time.perf_counter() - start
+        view.close()
+        return elapsed
+    return sample
+
+
+# 场景：名称、容差（相对基线中位数的变慢比例）、准备函数（返回测量一次的函数，结果为秒）
+SCENARIOS = (
+    ('parse', 0.25, setup_parse),
+    ('serialize', 0.25, setup_serialize),
+    ('batch', 0.25, setup_batch),
+    ('startup', 0.35, setup_startup),
+    ('file_list', 0.25, setup_file_list),
+)
+SCENARIO_NAMES = tuple(name for name, _, _ in SCENARIOS)
+
+
+def corpus_paths(directory):
+    """语料目录中的字幕文件（按名称排序）"""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory))
+
+
+def measure(names, runs):
+    """生成语料并测量指定的场景
+
+    返回 {场景: {'samples': 耗时列表, 'calibration': 每次测量之后的校准耗时列表}}；
+    无法运行的场景为 {'skipped': 原因}。
+    """
+    work_dir = tempfile.mkdtemp(prefix='toass-gate-')
+    try:
+        corpus = benchmark.make_suite_corpus(os.path.join(work_dir, 'corpus'), seed=0, scale=0.5,
+                                             classes=('tiny', 'episode'))
+        results = {}
+        for name, _, setup in SCENARIOS:
+            if name not in names:
+                continue
+            try:
+                sample = setup(work_dir, corpus)
+            except ScenarioUnavailable as e:
+                results[name] = {'skipped': str(e)}
+                print(f"{name:>10}: 跳过（{e}）", file=sys.stderr)
+                continue
+            sample()  # 预热，不计入样本
+            samples = []
+            calibration = []
+            for _ in range(runs):
+                samples.append(sample())
+                calibration.append(calibrate())
+            results[name] = {'samples': samples, 'calibration': calibration}
+            print(f"{name:>10}: 中位数 {format_seconds(statistics.median(samples))}", file=sys.stderr)
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def mann_whitney_greater(baseline, current):
+    """单侧 Mann-Whitney U 检验（正态近似，含并列修正）：current 整体大于 baseline 的 p 值"""
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+
+    n1, n2 = len(baseline), len(current)
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 1 - statistics.NormalDist().cdf(z)
+
+
+def speed_ratio(baselines, measurements):
+    """当前机器与基线机器的速度比（所有场景的校准耗时中位数之比，大于 1 表示当前机器较慢）"""
+    baseline = [value for scenario in baselines['scenarios'].values() for value in scenario['calibration']]
+    current = [value for measurement in measurements.values() for value in measurement.get('calibration', ())]
+    if not baseline or not current:
+        return 1.0
+    return statistics.median(current) / statistics.median(baseline)
+
+
+def compare(name, baseline, current, ratio):
+    """比较一个场景的基线和当前测量，返回对比记录；ratio 为 speed_ratio 的结果"""
+    scaled = [value / ratio for value in current['samples']]
+    change = statistics.median(scaled) / statistics.median(baseline['samples']) - 1
+    tolerance = baseline['tolerance']
+    p_slower = mann_whitney_greater(baseline['samples'], scaled)
+    p_faster = mann_whitney_greater(scaled, baseline['samples'])
+    if change > tolerance and p_slower < ALPHA:
+        verdict = 'regressed'
+    elif change < -tolerance and p_faster < ALPHA:
+        verdict = 'improved'
+    else:
+        verdict = 'ok'
+    return {
+        'name': name,
+        'baseline_median': statistics.median(baseline['samples']),
+        'current_median': statistics.median(current['samples']),
+        'change': change,
+        'tolerance': tolerance,
+        'p_value': p_slower,
+        'verdict': verdict,
+    }
+
+
+def format_seconds(seconds):
+    """把秒数格式化为便于阅读的毫秒或秒"""
+    return f"{seconds * 1000:.1f} ms" if seconds < 10 else f"{seconds:.2f} s"
+
+
+VERDICT_NAMES = {'regressed': '变慢 ✗', 'improved': '变快', 'ok': '正常'}
+
+
+def format_report(rows, skipped, ratio):
+    """生成对比表格：基线和当前为实测耗时的中位数，变化为按速度比折算后的变化"""
+    lines = [f"校准负载: 当前机器的耗时为基线机器的 {ratio:.2f} 倍，变化已按此折算", '',
+             f"{'场景':<10}{'基线':>12}{'当前':>12}{'变化':>9}{'容差':>7}{'p':>7}  结论"]
+    for row in rows:
+        lines.append(f"{row['name']:<12}{format_seconds(row['baseline_median']):>12}"
+                     f"{format_seconds(row['current_median']):>12}{row['change']:>+9.1%}"
+                     f"{row['tolerance']:>7.0%}{row['p_value']:>7.3f}  {VERDICT_NAMES[row['verdict']]}")
+    for name, reason in skipped.items():
+        lines.append(f"{name:<12}{'':>47}  跳过（{reason}）")
+    return '\n'.join(lines)
+
+
+def load_baselines(path):
+    """读取基线文件，不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        baselines = json.load(f)
+    if baselines.get('version') != BASELINE_VERSION:
+        raise ValueError(f'基线文件版本不符: {baselines.get("version")}')
+    return baselines
+
+
+def run_record(args):
+    """在当前机器上测量并写入基线；只测量部分场景时保留其余场景的基线"""
+    names = args.scenarios or SCENARIO_NAMES
+    baselines = (load_baselines(args.baseline) if args.scenarios else None) or {
+        'version': BASELINE_VERSION, 'scenarios': {}}
+    baselines.update(python=platform.python_version(), platform=platform.platform(), runs=args.runs)
+
+    tolerances = {name: tolerance for name, tolerance, _ in SCENARIOS}
+    for name, measurement in measure(names, args.runs).items():
+        if 'skipped' in measurement:
+            continue
+        baselines['scenarios'][name] = {
+            'tolerance': tolerances[name],
+            'samples': [round(value, 6) for value in measurement['samples']],
+            'calibration': [round(value, 6) for value in measurement['calibration']],
+        }
+    with open(args.baseline, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"已写入基线: {args.baseline}")
+    return 0
+
+
+def run_check(args):
+    """测量并与基线比较，有场景回归时返回 1"""
+    baselines = load_baselines(args.baseline)
+    if baselines is None:
+        print(f"找不到基线文件 {args.baseline}，请先运行 python perfgate.py record", file=sys.stderr)
+        return 2
+    names = [name for name in (args.scenarios or SCENARIO_NAMES) if name in baselines['scenarios']]
+
+    rows = []
+    skipped = {}
+    measurements = measure(names, args.runs)
+    ratio = speed_ratio(baselines, measurements)
+    for name, measurement in measurements.items():
+        if 'skipped' in measurement:
+            skipped[name] = measurement['skipped']
+            continue
+        rows.append(compare(name, baselines['scenarios'][name], measurement, ratio))
+
+    suspects = [row['name'] for row in rows if row['verdict'] == 'regressed']
+    if suspects:
+        # 复测一轮，合并两轮的样本后重新判定
+        print(f"复测: {', '.join(suspects)}", file=sys.stderr)
+        for name, measurement in measure(suspects, args.runs).items():
+            for key in ('samples', 'calibration'):
+                measurements[name][key].extend(measurement[key])
+        ratio = speed_ratio(baselines, measurements)
+        rows = [compare(row['name'], baselines['scenarios'][row['name']], measurements[row['name']], ratio)
+                for row in rows]
+
+    print(format_report(rows, skipped, ratio))
+    regressed = [row['name'] for row in rows if row['verdict'] == 'regressed']
+    if regressed:
+        print(f"\n性能回归: {', '.join(regressed)}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'speed_ratio': ratio, 'results': rows, 'skipped': skipped}, f, ensure_ascii=False, indent=2)
+    return 1 if regressed else 0
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description='性能回归检查')
+    subparsers = parser.add_subparsers(dest='command')
+
+    for command, func, help_text in (('check', run_check, '测量并与基线比较，回归时返回 1'),
+                                     ('record', run_record, '在当前机器上重新记录基线')):
+        sub = subparsers.add_parser(command, help=help_text)
+        sub.add_argument('--runs', type=int, default=DEFAULT_RUNS, help=f'每个场景的测量次数（默认 {DEFAULT_RUNS}）')
+        sub.add_argument('--scenarios', nargs='+', choices=SCENARIO_NAMES, default=None,
+                         help='只测量指定的场景（默认全部）')
+        sub.add_argument('--baseline', default=BASELINE_FILE, help='基线文件（默认 perf_baselines.json）')
+        if command == 'check':
+            sub.add_argument('--json', default=None, help='同时把对比结果写入 JSON 文件')
+        sub.set_defaults(func=func)
+    return parser
+
+
+def main(argv=None):
+    """主函数"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分阶段转换流水线
+把单个文件的转换拆成 读取 → 解析 → 在线转换 → 生成 → 写入 几个阶段，阶段之间用有界队列连接：
+读取、在线转换、写入（和删除原文件）主要在等待 I/O，各自使用独立的线程池；
+解析（含离线繁体转换）和生成 ASS 文本是 CPU 计算，各用一个线程（受 GIL 限制，多核由进程池负责）。
+慢速网络盘的读取或繁化姬的等待不会再占住解析线程，下游处理不过来时上游在队列上等待，内存占用有上限。
+
+每个阶段记录处理的文件数、忙碌时间和等待下游的时间，用于调整各阶段的线程数；
+每个文件在各步骤的耗时和读写字节数记入它的结果记录（见 timings），记录时间线时每个文件和步骤记为跨度（见 tracing）。
+传入 batch.CancelToken 时，每个阶段在处理前检查，取消后队列中的文件直接以"已取消"结束，不再读写。
+"""
+
+import os
+import time
+import queue
+import threading
+
+from converter import (ONLINE_CONCURRENCY, as_plan, needs_restyle, needs_streaming, convert_with_plan, read_source,
+                       parse_source, document_lines, transform_document, render_document, write_output,
+                       finish_source, add_stage_time)
+import tracing
+from batch import ConversionCancelled
+from timings import STAGE_NAMES, job_metrics
+
+# 各阶段默认线程数
+DEFAULT_READ_THREADS = 4
+DEFAULT_CPU_THREADS = 1
+DEFAULT_REMOTE_THREADS = ONLINE_CONCURRENCY
+DEFAULT_WRITE_THREADS = 4
+# 阶段之间的队列长度
+DEFAULT_QUEUE_SIZE = 64
+
+_STOP = object()
+_stats_lock = threading.Lock()
+
+
+def make_result(path, output, ok, message, elapsed, lines=0, cancelled=False, stats=None):
+    """构造结果记录（只包含路径、状态、耗时、字幕条数和各步骤的统计，便于跨进程传递）
+
+    stats 为 convert_with_plan 写入的统计字典，其中的步骤耗时记为 stages，字节数和请求数记为 metrics。
+    """
+    return {
+        'path': path,
+        'output': output,
+        'ok': ok,
+        'message': message,
+        'elapsed': elapsed,
+        'lines': lines,
+        'cancelled': cancelled,
+        'stages': dict(stats.get('stages', ())) if stats else {},
+        'metrics': job_metrics(stats) if stats else {},
+    }
+
+
+def cancelled_result(path, output, elapsed=0.0):
+    """被取消的任务的结果记录"""
+    return make_result(path, output, False, str(ConversionCancelled()), elapsed, cancelled=True)
+
+
+def merge_stage_stats(target, stats):
+    """把一次运行的阶段统计累加到 target（可在多个线程中调用）"""
+    with _stats_lock:
+        for name, values in stats.items():
+            total = target.setdefault(name, {'threads': 0, 'items': 0, 'busy': 0.0, 'blocked': 0.0,
+                                             'capacity': 0.0})
+            total['threads'] = max(total['threads'], values['threads'])
+            for key in ('items', 'busy', 'blocked', 'capacity'):
+                total[key] += values[key]
+
+
+def summarize_stage_stats(stats):
+    """计算各阶段的利用率：忙碌时间 / (线程数 × 运行时间)，blocked 为等待下游队列的时间占比"""
+    summary = {}
+    for name, values in stats.items():
+        capacity = values['capacity'] or 1e-9
+        summary[name] = {
+            'threads': values['threads'],
+            'items': values['items'],
+            'busy_seconds': round(values['busy'], 3),
+            'utilization': round(values['busy'] / capacity, 3),
+            'blocked': round(values['blocked'] / capacity, 3),
+        }
+    return summary
+
+
+def format_stage_stats(stats):
+    """一行文字的阶段利用率，例如 读取×4 12% | 解析×1 85% | ..."""
+    parts = []
+    for name, values in summarize_stage_stats(stats).items():
+        parts.append(f"{STAGE_NAMES.get(name, name)}×{values['threads']} {values['utilization']:.0%}")
+    return ' | '.join(parts)
+
+
+class _Stage:
+    """流水线的一个阶段：若干线程从输入队列取任务，处理后放入下一阶段的队列"""
+
+    def __init__(self, pipeline, name, func, threads, queue_size):
+        self.pipeline = pipeline
+        self.name = name
+        self.func = func
+        self.threads = threads
+        self.queue = queue.Queue(queue_size)
+        self.next = None
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self._alive = threads
+        self._lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._loop, name=f'pipeline-{name}', daemon=True)
+                         for _ in range(threads)]
+
+    def start(self):
+        for worker in self._workers:
+            worker.start()
+
+    def join(self):
+        for worker in self._workers:
+            worker.join()
+
+    def _loop(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            start = time.perf_counter()
+            try:
+                if self.pipeline.token:
+                    self.pipeline.token.check()
+                forward = self.func(item)
+            except ConversionCancelled:
+                self.pipeline._emit_cancelled(item)
+                forward = False
+            except Exception as e:
+                self.pipeline._emit(item, False, str(e))
+                forward = False
+            busy = time.perf_counter() - start
+            if forward and self.next is not None:
+                self.next.queue.put(item)
+                blocked = time.perf_counter() - start - busy
+            else:
+                blocked = 0.0
+            with self._lock:
+                self.items += 1
+                self.busy += busy
+                self.blocked += blocked
+
+        # 最后一个退出的线程通知下一阶段：本阶段的任务都已交出
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last and self.next is not None:
+            for _ in range(self.next.threads):
+                self.next.queue.put(_STOP)
+
+
+class ConversionPipeline:
+    """分阶段转换一批文件
+
+    options 为 convert_file 的其余参数或编译好的 ConversionPlan；on_result 在工作线程中以结果记录调用。
+    submit() 在第一个队列满时等待；全部提交后调用 close()。
+    token 为 batch.CancelToken，取消后每个提交的文件仍然产出一条结果记录（cancelled 为 True）。
+    """
+
+    def __init__(self, options, on_result, read_threads=DEFAULT_READ_THREADS, cpu_threads=DEFAULT_CPU_THREADS,
+                 remote_threads=DEFAULT_REMOTE_THREADS, write_threads=DEFAULT_WRITE_THREADS,
+                 queue_size=DEFAULT_QUEUE_SIZE, token=None):
+        self.plan = as_plan(options)
+        self.on_result = on_result
+        self.token = token
+        self.queue_size = queue_size
+        self.online = bool(self.plan.convert_to_china) and self.plan.china_engine == 'online'
+
+        stages = [
+            _Stage(self, 'read', self._read, read_threads, queue_size),
+            _Stage(self, 'parse', self._parse, cpu_threads, queue_size),
+        ]
+        if self.online:
+            stages.append(_Stage(self, 'china', self._remote, remote_threads, queue_size))
+        stages.append(_Stage(self, 'render', self._render, cpu_threads, queue_size))
+        stages.append(_Stage(self, 'write', self._write, write_threads, queue_size))
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next = next_stage
+        self.stages = stages
+
+        self._start = time.perf_counter()
+        self._end = None
+        for stage in stages:
+            stage.start()
+
+    def submit(self, job):
+        """提交一个 (输入文件, 输出文件) 任务；已取消时直接产出取消的结果，不进入队列"""
+        src, dst = job
+        if self.token and self.token.cancelled:
+            self.on_result(cancelled_result(src, dst))
+            return
+        self.stages[0].queue.put({'src': src, 'dst': dst, 'start': time.perf_counter(), 'stats': {'path': src}})
+
+    def close(self, wait=True):
+        """不再提交新任务；wait 为 True 时等待所有任务完成"""
+        for _ in range(self.stages[0].threads):
+            self.stages[0].queue.put(_STOP)
+        if wait:
+            self.join()
+
+    def join(self):
+        """等待所有阶段结束"""
+        for stage in self.stages:
+            stage.join()
+        if self._end is None:
+            self._end = time.perf_counter()
+
+    def stage_stats(self):
+        """各阶段的累计统计（可用 merge_stage_stats 合并多次运行）"""
+        wall = (self._end or time.perf_counter()) - self._start
+        stats = {}
+        for stage in self.stages:
+            with stage._lock:
+                stats[stage.name] = {
+                    'threads': stage.threads,
+                    'items': stage.items,
+                    'busy': stage.busy,
+                    'blocked': stage.blocked,
+                    'capacity': stage.threads * wall,
+                }
+        return stats
+
+    def _emit(self, item, ok, message):
+        end = time.perf_counter()
+        tracing.add_job(item['src'], item['start'], end, ok)
+        self.on_result(make_result(item['src'], item['dst'], ok, message, end - item['start'],
+                                   item.get('lines', 0), stats=item['stats']))
+
+    def _emit_cancelled(self, item):
+        end = time.perf_counter()
+        tracing.add_job(item['src'], item['start'], end, False, cancelled=True)
+        self.on_result(cancelled_result(item['src'], item['dst'], end - item['start']))
+
+    def _read(self, item):
+        if needs_streaming(item['src'], self.plan) or needs_restyle(item['src'], self.plan):
+            # 超大文件边读边写、只改样式的 ASS 直接复制事件，整个转换在读取线程中完成，不进入后面的队列
+            message = convert_with_plan(item['src'], item['dst'], self.plan, item['stats'], self.token)
+            item['lines'] = item['stats']['lines']
+            self._emit(item, True, message)
+            return False
+        start = time.perf_counter()
+        item['text'] = read_source(item['src'])
+        item['stats']['bytes_read'] = os.path.getsize(item['src'])
+        add_stage_time(item['stats'], 'read', start)
+        return True
+
+    def _parse(self, item):
+        stats = item['stats']
+        start = time.perf_counter()
+        item['doc'] = parse_source(item['src'], item.pop('text'), self.plan)
+        item['lines'] = document_lines(item['doc'])
+        start = add_stage_time(stats, 'parse', start)
+        if self.plan.convert_to_china and not self.online:
+            # 离线繁体转换是 CPU 计算，和解析在同一阶段完成
+            transform_document(item['doc'], self.plan, stats=stats)
+            add_stage_time(stats, 'china', start)
+        return True
+
+    def _remote(self, item):
+        start = time.perf_counter()
+        transform_document(item['doc'], self.plan, self.token, item['stats'])
+        add_stage_time(item['stats'], 'china', start)
+        return True
+
+    def _render(self, item):
+        start = time.perf_counter()
+        item['content'] = render_document(item.pop('doc'), self.plan)
+        add_stage_time(item['stats'], 'render', start)
+        return True
+
+    def _write(self, item):
+        stats = item['stats']
+        start = time.perf_counter()
+        write_output(item['dst'], item.pop('content'))
+        stats['bytes_written'] = os.path.getsize(item['dst'])
+        start = add_stage_time(stats, 'write', start)
+        message = finish_source(item['src'], item['dst'], self.plan)
+        if self.plan.delete_original:
+            add_stage_time(stats, 'delete', start)
+        self._emit(item, True, message)
+        return False
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程池工作进程的主模块
+以 spawn / forkserver 方式启动的工作进程会先以 __mp_main__ 的名义重新执行主进程的主模块；
+图形界面的主模块是 toAss.py，重新执行会在每个工作进程中加载 PyQt5 和整个界面。
+engine.ProcessPoolEngine 启动工作进程时改为执行本模块：这里什么也不导入，转换依赖由 engine 的初始化函数加载。
+"""
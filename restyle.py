@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASS 转 ASS 的只改样式路径
+ASS 输入在不插入字幕、不做繁体转换时，只需要补全 [Script Info] 的 ScriptType 和分辨率、替换 Default 样式的颜色，事件一条也不变。
+这里只解析 [Events] 之前的文件头；[Events] 及之后的内容从内存映射的输入文件原样写入输出，
+不构建 SSAEvent 对象，特效字幕有数万行时也只是一次顺序复制。
+文件头不是可以安全修改的 ASS 结构时抛出 RestyleUnsupported，由调用方改用 pysubs2 完整处理。
+"""
+
+import os
+import re
+import mmap
+import codecs
+
+# 缺少或为空时补全的分辨率（与完整路径相同）
+DEFAULT_PLAY_RES = (('PlayResX', '1920'), ('PlayResY', '1080'))
+# 缺少时补全的脚本类型（pysubs2 保存 ASS 时总是写入这一行）
+SCRIPT_TYPE = ('ScriptType', 'v4.00+')
+# [V4+ Styles] 没有 Format 行时按标准字段顺序查找颜色
+STANDARD_STYLE_FORMAT = ('Name', 'Fontname', 'Fontsize', 'PrimaryColour', 'SecondaryColour', 'OutlineColour')
+
+_SECTION_HEADING = re.compile(r'^\[(.+)\]$')
+_EVENTS_HEADING = re.compile(rb'^[ \t]*\[Events\][ \t]*\r?$', re.MULTILINE)
+_EVENT_PREFIXES = (b'\nDialogue:', b'\nComment:')
+
+
+class RestyleUnsupported(Exception):
+    """输入需要 pysubs2 完整处理"""
+
+
+def _restyle_style_line(line, fields, primary_color, outline_color):
+    """替换 Default 样式行的主颜色和边框颜色；不是 Default 样式时返回 None"""
+    body = line.rstrip('\r\n')
+    prefix, _, rest = body.partition(':')
+    values = rest.split(',')
+    if values[0].lstrip() != 'Default':
+        return None
+    try:
+        primary_index = fields.index('PrimaryColour')
+        outline_index = fields.index('OutlineColour')
+    except ValueError:
+        raise RestyleUnsupported('style format without colours')
+    if len(values) <= max(primary_index, outline_index):
+        raise RestyleUnsupported('truncated Default style')
+    values[primary_index] = primary_color
+    values[outline_index] = outline_color
+    return prefix + ':' + ','.join(values) + line[len(body):]
+
+
+def restyle_header(header, primary_color, outline_color):
+    """修改 [Events] 之前的文件头：补全 ScriptType 和分辨率，替换 Default 样式的颜色，其余行原样保留
+
+    颜色为 ASS 颜色字符串（如 &H00FFFFFF），与 ConversionPlan 的 subtitle_color / outline_color 相同。
+    """
+    lines = header.splitlines(keepends=True)
+    newline = '\r\n' if '\r\n' in header else '\n'
+    sections = set()
+    section = None
+    info_end = None
+    info_keys = {}
+    fields = list(STANDARD_STYLE_FORMAT)
+    default_found = False
+
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        heading = _SECTION_HEADING.match(stripped)
+        if heading:
+            section = heading.group(1).lower()
+            sections.add(section)
+            if section == 'script info':
+                info_end = i + 1
+            continue
+        if section == 'script info':
+            if stripped and not stripped.startswith(';'):
+                info_end = i + 1
+                key, sep, value = stripped.partition(':')
+                if sep:
+                    info_keys[key] = (i, value.strip())
+        elif section == 'v4+ styles':
+            if stripped.startswith('Format:'):
+                fields = [field.strip() for field in stripped[len('Format:'):].split(',')]
+            elif stripped.startswith('Style:'):
+                restyled = _restyle_style_line(line, fields, primary_color, outline_color)
+                if restyled is not None:
+                    lines[i] = restyled
+                    default_found = True
+
+    if 'script info' not in sections or 'v4+ styles' not in sections:
+        # SSA、或扩展名为 .ass 的其他格式，交给 pysubs2 识别和转换
+        raise RestyleUnsupported('not an ASS header')
+    if not default_found:
+        # 需要新建 Default 样式，按完整路径处理
+        raise RestyleUnsupported('no Default style')
+
+    missing = []
+    for key, value in DEFAULT_PLAY_RES:
+        if key not in info_keys:
+            missing.append(f'{key}: {value}{newline}')
+        elif not info_keys[key][1]:
+            lines[info_keys[key][0]] = f'{key}: {value}{newline}'
+    key, value = SCRIPT_TYPE
+    if key not in info_keys:
+        missing.append(f'{key}: {value}{newline}')
+    lines[info_end:info_end] = missing
+    return ''.join(lines)
+
+
+def count_events(data, start):
+    """统计 start 之后的 Dialogue / Comment 行数"""
+    count = 0
+    for prefix in _EVENT_PREFIXES:
+        position = data.find(prefix, start)
+        while position != -1:
+            count += 1
+            position = data.find(prefix, position + len(prefix))
+    return count
+
+
+def restyle_file(src, dst, primary_color, outline_color, token=None):
+    """只改样式地转换一个 ASS 文件，返回事件数
+
+    输出与输入是同一个文件时先写入临时文件再替换。token 为 batch.CancelToken 时在写入前检查。
+    """
+    with open(src, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise RestyleUnsupported('empty file')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            heading = _EVENTS_HEADING.search(data)
+            if heading is None:
+                raise RestyleUnsupported('no [Events] section')
+            events_start = heading.start()
+            # 与完整路径相同，输出不带 BOM
+            header_start = len(codecs.BOM_UTF8) if data[:3] == codecs.BOM_UTF8 else 0
+            header = restyle_header(data[header_start:events_start].decode('utf-8'), primary_color, outline_color)
+            events = count_events(data, events_start)
+            if token:
+                token.check()
+
+            in_place = os.path.exists(dst) and os.path.samefile(src, dst)
+            target = dst + '.tmp' if in_place else dst
+            try:
+                with open(target, 'wb') as out, memoryview(data) as view:
+                    out.write(header.encode('utf-8'))
+                    with view[events_start:] as body:
+                        out.write(body)
+            except BaseException:
+                if os.path.exists(target):
+                    os.remove(target)
+                raise
+    if in_place:
+        os.replace(target, dst)
+    return events
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字幕文件目录扫描
+用 os.scandir 递归查找字幕文件：目录项的类型直接来自目录列表（Windows 和常见的 Linux 文件系统、SMB / NFS 都是如此），
+按扩展名过滤，不再对每个文件单独 stat，网络盘上的大型片库也只需要每个目录一次列表请求。
+DirectoryScanner 在后台线程中扫描，找到的文件分批取出，界面线程按固定频率取出加入文件列表。
+"""
+
+import os
+import threading
+
+from converter import SUPPORTED_EXTENSIONS
+
+
+def iter_subtitle_files(directory, extensions=SUPPORTED_EXTENSIONS, stop=None):
+    """递归产出目录中的字幕文件路径（每个目录中按名称排序，先文件后子目录）
+
+    不跟随指向目录的符号链接；无法读取的目录跳过。stop 为 threading.Event 时，设置后在下一个目录前停止。
+    """
+    pending = [directory]
+    while pending:
+        if stop is not None and stop.is_set():
+            return
+        current = pending.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+            except OSError:
+                continue
+            if entry.name.lower().endswith(extensions):
+                yield entry.path
+        # 倒序入栈，按名称顺序依次展开子目录
+        pending.extend(reversed(subdirs))
+
+
+def source_root(directory):
+    """目录扫描结果的源根目录：保留被添加的文件夹本身的名称，按源目录结构输出时作为第一层目录"""
+    return os.path.dirname(os.path.abspath(directory))
+
+
+class DirectoryScanner:
+    """在后台线程中扫描一组目录（线程安全）
+
+    take() 取出目前找到的文件，按源根目录分组为 [(源根目录, [路径, ...]), ...]；
+    finished 为 True 时扫描已结束且结果已全部取出。
+    """
+
+    # 每找到这么多文件交出一批，界面不会一次收到全部结果
+    BATCH_SIZE = 2000
+
+    def __init__(self, directories):
+        self.directories = list(directories)
+        self.found = 0
+        self._pending = []
+        self._done = False
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='directory-scanner', daemon=True)
+        self._thread.start()
+
+    @property
+    def finished(self):
+        with self._lock:
+            return self._done and not self._pending
+
+    def cancel(self):
+        """停止扫描（已找到的文件仍可取出）"""
+        self._stop.set()
+
+    def take(self):
+        """取出目前找到的文件"""
+        with self._lock:
+            groups, self._pending = self._pending, []
+        return groups
+
+    def _publish(self, root, batch):
+        with self._lock:
+            self._pending.append((root, batch))
+            self.found += len(batch)
+
+    def _run(self):
+        try:
+            for directory in self.directories:
+                root = source_root(directory)
+                batch = []
+                for path in iter_subtitle_files(directory, stop=self._stop):
+                    batch.append(path)
+                    if len(batch) >= self.BATCH_SIZE:
+                        self._publish(root, batch)
+                        batch = []
+                if batch:
+                    self._publish(root, batch)
+                if self._stop.is_set():
+                    break
+        finally:
+            with self._lock:
+                self._done = True
@@ -172,6 +172,31 @@ Categories=AudioVideo;
         except Exception as e:
             print(f"创建Linux桌面文件失败: {e}")
 
+def create_cli_launcher():
+    """创建 toass 命令（调用本目录的 cli.py），用于服务器或渲染农场上的批量转换"""
+    cli_path = os.path.join(os.getcwd(), "cli.py")
+
+    if platform.system() == "Windows":
+        # 放在 Python 的 Scripts 目录，与 pip 安装的命令在同一个 PATH 目录中
+        bin_dir = os.path.join(os.path.dirname(sys.executable), "Scripts")
+        launcher_path = os.path.join(bin_dir, "toass.cmd")
+        launcher_content = f'@echo off\r\n"{sys.executable}" "{cli_path}" %*\r\n'
+    else:
+        bin_dir = os.path.expanduser("~/.local/bin")
+        launcher_path = os.path.join(bin_dir, "toass")
+        launcher_content = f'#!/bin/sh\nexec "{sys.executable}" "{cli_path}" "$@"\n'
+
+    try:
+        os.makedirs(bin_dir, exist_ok=True)
+        with open(launcher_path, 'w') as f:
+            f.write(launcher_content)
+        os.chmod(launcher_path, 0o755)
+        print(f"toass 命令已创建: {launcher_path}")
+        if bin_dir not in os.environ.get("PATH", "").split(os.pathsep):
+            print(f"请把 {bin_dir} 加入 PATH 后使用 toass convert ...")
+    except Exception as e:
+        print(f"创建 toass 命令失败: {e}")
+
 def main():
     """主函数"""
     print("=" * 50)
@@ -193,11 +218,17 @@ def main():
     create_shortcut = input("\n是否创建桌面快捷方式? (y/N): ").lower().strip()
     if create_shortcut in ['y', 'yes']:
         create_desktop_shortcut()
+
+    # 询问是否创建命令行工具
+    create_launcher = input("是否创建 toass 命令行工具? (y/N): ").lower().strip()
+    if create_launcher in ['y', 'yes']:
+        create_cli_launcher()
     
     print("\n" + "=" * 50)
     print("设置完成！")
     print("\n可用命令:")
     print("  python toAss.py          # 运行程序")
+    print("  python cli.py convert    # 命令行批量转换（创建 toass 命令后为 toass convert）")
     print("  python build.py          # 构建可执行文件")
     print("  python version.py        # 版本管理")
     print("=" * 50)
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""pytest 配置：项目模块都在仓库根目录，测试从 tests/ 目录导入它们"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""取消标记的测试"""
+
+import threading
+
+import pytest
+
+from batch import CancelToken, ConversionCancelled
+
+
+def test_cancel_and_check():
+    token = CancelToken()
+    assert not token.cancelled
+    token.check()
+    token.cancel()
+    token.cancel()
+    assert token.cancelled
+    with pytest.raises(ConversionCancelled):
+        token.check()
+
+
+def test_wait_returns_on_cancel():
+    token = CancelToken()
+    assert token.wait(0) is False
+    threading.Timer(0.05, token.cancel).start()
+    assert token.wait(5) is True
+
+
+def test_register_called_once_and_unregister():
+    token = CancelToken()
+    calls = []
+    token.register(lambda: calls.append('a'))
+    unregister = token.register(lambda: calls.append('b'))
+    unregister()
+    token.cancel()
+    token.cancel()
+    assert calls == ['a']
+
+
+def test_register_after_cancel_calls_immediately():
+    token = CancelToken()
+    token.cancel()
+    calls = []
+    unregister = token.register(lambda: calls.append(1))
+    assert calls == [1]
+    unregister()
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""命令行批量转换的测试：不同子目录中的同名文件不会输出到同一个文件"""
+
+import pytest
+
+import cli
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\n第一句\n\n"
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    # 不读取运行目录下的 sub.json / settings.json
+    monkeypatch.chdir(tmp_path)
+    for season in ('a', 'b'):
+        (tmp_path / 'lib' / season).mkdir(parents=True)
+        (tmp_path / 'lib' / season / 'ep1.srt').write_text(SRT, encoding='utf-8')
+    return tmp_path
+
+
+def test_directory_input_keeps_subdirectories(library):
+    out = library / 'out'
+    assert cli.main(['convert', str(library / 'lib'), '-o', str(out), '-j', '1', '-q']) == 0
+    assert sorted(p.relative_to(out).as_posix() for p in out.rglob('*.ass')) == ['a/ep1.ass', 'b/ep1.ass']
+
+
+def test_colliding_outputs_are_refused(library, capsys):
+    out = library / 'out'
+    assert cli.main(['convert', str(library / 'lib' / '*' / '*.srt'), '-o', str(out), '-j', '1', '-q']) == 2
+    assert 'ep1.ass' in capsys.readouterr().err
+    assert not out.exists()
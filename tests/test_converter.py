@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""converter 的流式转换测试：取消或出错时不留下写了一半的输出"""
+
+import pytest
+
+import converter
+from batch import CancelToken, ConversionCancelled
+from converter import (compile_plan, convert_plain_stream, DEFAULT_SUBTITLE_COLOR, DEFAULT_OUTLINE_COLOR,
+                       DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE)
+
+SRT = ''.join(f"{i}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\n第{i}句\n\n" for i in range(1, 21))
+
+
+def make_plan(convert_to_china=False):
+    return compile_plan([], [], DEFAULT_SUBTITLE_COLOR, DEFAULT_OUTLINE_COLOR, False, convert_to_china,
+                        DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE, streaming=True)
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    # 每批 5 条，保证转换过程中有多次取消检查
+    monkeypatch.setattr(converter, 'STREAM_CHUNK_CUES', 5)
+    path = tmp_path / 'in.srt'
+    path.write_text(SRT, encoding='utf-8')
+    return path
+
+
+def test_stream_writes_output(source, tmp_path):
+    dst = tmp_path / 'out.ass'
+    assert convert_plain_stream(str(source), str(dst), make_plan()) == 20
+    assert dst.read_text(encoding='utf-8').count('Dialogue:') == 20
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['in.srt', 'out.ass']
+
+
+class CancelAfter(CancelToken):
+    """第 n 次检查时取消"""
+
+    def __init__(self, n):
+        super().__init__()
+        self.remaining = n
+
+    def check(self):
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.cancel()
+        super().check()
+
+
+def test_stream_cancelled_leaves_no_output(source, tmp_path):
+    dst = tmp_path / 'out.ass'
+    with pytest.raises(ConversionCancelled):
+        convert_plain_stream(str(source), str(dst), make_plan(), token=CancelAfter(3))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['in.srt']
+
+
+def test_stream_error_keeps_previous_output(source, tmp_path, monkeypatch):
+    calls = []
+
+    def failing_convert(texts, *args):
+        calls.append(texts)
+        if len(calls) == 2:
+            raise RuntimeError('service down')
+        return texts
+
+    monkeypatch.setattr(converter, 'convert_texts_to_china', failing_convert)
+    dst = tmp_path / 'out.ass'
+    dst.write_text('old', encoding='utf-8')
+    with pytest.raises(RuntimeError):
+        convert_plain_stream(str(source), str(dst), make_plan(convert_to_china=True))
+    assert dst.read_text(encoding='utf-8') == 'old'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['in.srt', 'out.ass']
+
+
+def test_stream_in_place(source):
+    assert convert_plain_stream(str(source), str(source), make_plan()) == 20
+    assert source.read_text(encoding='utf-8').count('Dialogue:') == 20
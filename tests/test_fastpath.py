@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""快速路径与 pysubs2 路径的一致性测试
+
+tests/golden/fastpath/ 中的期望输出 (*.ass) 由 pysubs2 路径生成；快速路径、pysubs2 路径和流式转换
+都必须与之逐字节一致。样例与 benchmark.py 的 GOLDEN_SAMPLES 相同，修改样例后需重新生成期望输出。
+"""
+
+import os
+import random
+
+import pytest
+
+import fastpath
+from converter import (convert_file, DEFAULT_SUBTITLE_COLOR, DEFAULT_OUTLINE_COLOR,
+                       DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE)
+
+# overflow.srt / vtt_hours.vtt 的超长时间按 pysubs2 的方式截断并给出警告
+pytestmark = pytest.mark.filterwarnings('ignore:Overflow in SubStation timestamp:RuntimeWarning')
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'fastpath')
+GOLDEN_INPUTS = sorted(name for name in os.listdir(GOLDEN_DIR) if not name.endswith('.ass'))
+
+OPTIONS = {
+    'insert_options': [],
+    'subtitle_configs': [],
+    'subtitle_color': DEFAULT_SUBTITLE_COLOR,
+    'outline_color': DEFAULT_OUTLINE_COLOR,
+    'delete_original': False,
+    'convert_to_china': False,
+    'font_family': DEFAULT_FONT_FAMILY,
+    'font_size': DEFAULT_FONT_SIZE,
+}
+
+
+def convert_golden(name, tmp_path, **kwargs):
+    dst = tmp_path / (name + '.ass')
+    convert_file(os.path.join(GOLDEN_DIR, name), str(dst), **dict(OPTIONS, **kwargs))
+    with open(os.path.join(GOLDEN_DIR, name + '.ass'), 'rb') as f:
+        expected = f.read()
+    return dst.read_bytes(), expected
+
+
+@pytest.mark.parametrize('name', GOLDEN_INPUTS)
+def test_fast_path_matches_golden(name, tmp_path):
+    actual, expected = convert_golden(name, tmp_path, fast_path=True, streaming=False)
+    assert actual == expected
+
+
+@pytest.mark.parametrize('name', GOLDEN_INPUTS)
+def test_pysubs2_path_matches_golden(name, tmp_path):
+    pytest.importorskip('pysubs2')
+    actual, expected = convert_golden(name, tmp_path, fast_path=False, streaming=False)
+    assert actual == expected
+
+
+@pytest.mark.parametrize('name', GOLDEN_INPUTS)
+def test_streaming_matches_golden(name, tmp_path):
+    actual, expected = convert_golden(name, tmp_path, fast_path=True, streaming=True)
+    assert actual == expected
+
+
+def random_subtitle(rng, vtt):
+    """随机生成带各种边界情况的字幕文本：非标准时间轴、空行、纯数字行、文本中的时间戳等"""
+    def timestamp():
+        h, m, s, ms = rng.randint(0, 12), rng.randint(0, 59), rng.randint(0, 59), rng.randint(0, 999)
+        if vtt:
+            return rng.choice([f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}", f"{m:02d}:{s:02d}.{ms:03d}",
+                               f"{h}:{m:02d}:{s:02d}.{ms // 10:02d}", f"{h:03d}:{m:02d}:{s:02d}.{ms:03d}"])
+        return rng.choice([f"{h:02d}:{m:02d}:{s:02d},{ms:03d}", f"{h}:{m}:{s},{ms // 100}",
+                           f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}", f"{h:02d}:{m:02d}:{s:02d},{ms:04d}"])
+
+    texts = ['text', '<i>it</i>', '12', '  7 ', '', ' ', 'a: b', '字幕', '<b>x', 'end 3',
+             '00:00:01,000 00:00:02,000', '1:2:3,4 x 5:6:7,8']
+    newline = rng.choice(['\n', '\r\n'])
+    out = ['WEBVTT' + newline * 2] if vtt else []
+    for i in range(rng.randint(0, 10)):
+        if rng.random() < 0.8:
+            out.append(f"{i + 1}{newline}")
+        arrow = rng.choice([' --> '] * 8 + ['-->', ' -> '])
+        tail = rng.choice([''] * 8 + [' align:start', ' X1:1'])
+        out.append(f"{timestamp()}{arrow}{timestamp()}{tail}{newline}")
+        out.extend(rng.choice(texts) + newline for _ in range(rng.randint(0, 3)))
+        out.append(newline * rng.choice([0, 1, 1, 1, 2]))
+    return ''.join(out)
+
+
+def test_split_parser_matches_line_parser():
+    """按时间轴行整体切分的解析结果必须与逐行解析一致（包括出错时的异常类型）"""
+    rng = random.Random(0)
+    for _ in range(3000):
+        fmt = rng.choice(['srt', 'vtt'])
+        text = random_subtitle(rng, fmt == 'vtt')
+        results = []
+        for parse in (fastpath.parse_cues, fastpath._parse_cues_by_line):
+            try:
+                results.append(parse(text, fmt))
+            except Exception as e:
+                results.append(type(e))
+        assert results[0] == results[1], text
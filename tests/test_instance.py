@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""单实例通信的测试：套接字只放在当前用户独占的目录中，服务端能识别连接进程的用户"""
+
+import os
+import sys
+import socket
+import tempfile
+
+import pytest
+
+import instance
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='Windows 使用命名管道')
+
+
+@pytest.fixture
+def temp_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    return tmp_path
+
+
+def test_uses_private_xdg_runtime_dir(temp_dir, monkeypatch):
+    runtime = temp_dir / 'run'
+    runtime.mkdir(mode=0o700)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(runtime))
+    assert instance.server_name() == os.path.join(str(runtime), 'toass.sock')
+
+
+def test_falls_back_to_private_temp_dir(temp_dir, monkeypatch):
+    shared = temp_dir / 'shared'
+    shared.mkdir()
+    shared.chmod(0o777)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(shared))
+    path = instance.runtime_dir()
+    assert path == os.path.join(str(temp_dir), f'toass-{os.getuid()}')
+    assert os.stat(path).st_mode & 0o777 == 0o700
+
+
+def test_refuses_existing_shared_dir(temp_dir):
+    (temp_dir / f'toass-{os.getuid()}').mkdir(mode=0o755)
+    os.chmod(temp_dir / f'toass-{os.getuid()}', 0o755)
+    with pytest.raises(PermissionError):
+        instance.server_name()
+    # 无法安全通信时按没有实例在运行处理
+    assert instance.forward_to_running([]) is False
+
+
+def test_peer_uid():
+    left, right = socket.socketpair()
+    try:
+        assert instance.peer_uid(left.fileno()) == os.getuid()
+    finally:
+        left.close()
+        right.close()
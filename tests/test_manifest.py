@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""增量转换清单的测试：没有变化时跳过，输入、输出或设置变化时重新转换"""
+
+import os
+
+import pytest
+
+from converter import convert_file, DEFAULT_SUBTITLE_COLOR, DEFAULT_OUTLINE_COLOR, DEFAULT_FONT_FAMILY, \
+    DEFAULT_FONT_SIZE
+from manifest import IncrementalTracker, MANIFEST_FILE
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\n第一句\n\n"
+
+
+def make_options(**changes):
+    options = {
+        'insert_options': [],
+        'subtitle_configs': [],
+        'subtitle_color': DEFAULT_SUBTITLE_COLOR,
+        'outline_color': DEFAULT_OUTLINE_COLOR,
+        'delete_original': False,
+        'convert_to_china': False,
+        'font_family': DEFAULT_FONT_FAMILY,
+        'font_size': DEFAULT_FONT_SIZE,
+    }
+    options.update(changes)
+    return options
+
+
+def convert_all(jobs, options):
+    """按清单转换一批任务，返回 (转换的任务, 跳过的任务)"""
+    tracker = IncrementalTracker(options)
+    pending, skipped = tracker.filter(jobs)
+    for src, dst in pending:
+        convert_file(src, dst, **options)
+        tracker.record(dst)
+    tracker.save()
+    return pending, skipped
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    jobs = []
+    for name in ('a', 'b'):
+        src = tmp_path / f'{name}.srt'
+        src.write_text(SRT, encoding='utf-8')
+        jobs.append((str(src), str(tmp_path / f'{name}.ass')))
+    return jobs
+
+
+def test_unchanged_files_are_skipped(jobs, tmp_path):
+    options = make_options()
+    assert convert_all(jobs, options) == (jobs, [])
+    assert (tmp_path / MANIFEST_FILE).exists()
+    assert convert_all(jobs, options) == ([], jobs)
+
+
+def test_touched_input_with_same_content_is_skipped(jobs):
+    options = make_options()
+    convert_all(jobs, options)
+    src = jobs[0][0]
+    stat = os.stat(src)
+    os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert convert_all(jobs, options) == ([], jobs)
+
+
+def test_changed_input_is_converted(jobs):
+    options = make_options()
+    convert_all(jobs, options)
+    with open(jobs[0][0], 'a', encoding='utf-8') as f:
+        f.write("2\n00:00:03,000 --> 00:00:04,000\n第二句\n\n")
+    assert convert_all(jobs, options) == ([jobs[0]], [jobs[1]])
+
+
+def test_changed_or_missing_output_is_converted(jobs):
+    options = make_options()
+    convert_all(jobs, options)
+    with open(jobs[0][1], 'a', encoding='utf-8') as f:
+        f.write('\n')
+    os.remove(jobs[1][1])
+    assert convert_all(jobs, options) == (jobs, [])
+
+
+@pytest.mark.parametrize('changes', [
+    {'subtitle_color': 'H0000FFFF'},
+    {'font_size': DEFAULT_FONT_SIZE + 1},
+    {'convert_to_china': True},
+])
+def test_settings_change_invalidates(jobs, changes):
+    convert_all(jobs, make_options())
+    assert convert_all(jobs, make_options(**changes)) == (jobs, [])
+
+
+def test_corrupt_manifest_converts_again(jobs, tmp_path):
+    options = make_options()
+    convert_all(jobs, options)
+    (tmp_path / MANIFEST_FILE).write_text('{', encoding='utf-8')
+    assert convert_all(jobs, options) == (jobs, [])
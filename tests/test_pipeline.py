@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""分阶段流水线和进程池的测试：取消时每个提交的任务恰好产出一条结果且不留下输出，工作进程不加载图形界面"""
+
+import os
+import sys
+import time
+import subprocess
+import multiprocessing
+
+import pytest
+
+import engine
+import pipeline
+from batch import CancelToken
+from converter import (compile_plan, parse_source, DEFAULT_SUBTITLE_COLOR, DEFAULT_OUTLINE_COLOR,
+                       DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE)
+from engine import CANCEL_POLL_INTERVAL, ProcessPoolEngine, run_jobs
+
+JOB_COUNT = 60
+
+
+def make_plan():
+    return compile_plan([], [], DEFAULT_SUBTITLE_COLOR, DEFAULT_OUTLINE_COLOR, False, False,
+                        DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE)
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    src_dir = tmp_path / 'in'
+    dst_dir = tmp_path / 'out'
+    src_dir.mkdir()
+    dst_dir.mkdir()
+    jobs = []
+    for n in range(JOB_COUNT):
+        src = src_dir / f'{n}.srt'
+        src.write_text(''.join(f"{i}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\n第{i}句\n\n" for i in range(1, 30)),
+                       encoding='utf-8')
+        jobs.append((str(src), str(dst_dir / f'{n}.ass')))
+    return jobs
+
+
+def check_results(jobs, results):
+    """每个任务一条结果；成功的有输出，取消的没有输出，也没有临时文件"""
+    assert sorted(result['path'] for result in results) == sorted(src for src, _ in jobs)
+    for result in results:
+        if result['cancelled']:
+            assert not result['ok']
+            assert not os.path.exists(result['output'])
+        else:
+            assert result['ok'], result['message']
+            assert os.path.exists(result['output'])
+    out_dir = os.path.dirname(jobs[0][1])
+    assert not [name for name in os.listdir(out_dir) if name.endswith('.tmp')]
+
+
+def test_pipeline_cancel_midway(jobs, monkeypatch):
+    token = CancelToken()
+    cancel_at = jobs[10][0]
+    parsed = []
+
+    def parse_then_cancel(src, text, plan):
+        # 解析阶段只有一个线程：取消之后不再有文件进入解析
+        parsed.append(src)
+        if src == cancel_at:
+            token.cancel()
+        return parse_source(src, text, plan)
+
+    monkeypatch.setattr(pipeline, 'parse_source', parse_then_cancel)
+    results = list(run_jobs(jobs, make_plan(), token=token))
+    check_results(jobs, results)
+    by_path = {result['path']: result for result in results}
+    # 取消时正在解析的文件在进入下一阶段前停止，没有解析的文件全部取消
+    assert by_path[cancel_at]['cancelled']
+    assert cancel_at == parsed[-1]
+    for src, _ in jobs:
+        if src not in parsed:
+            assert by_path[src]['cancelled']
+    assert len(parsed) < len(jobs)
+
+
+def test_pipeline_cancelled_before_start(jobs):
+    token = CancelToken()
+    token.cancel()
+    results = list(run_jobs(jobs, make_plan(), token=token))
+    check_results(jobs, results)
+    assert all(result['cancelled'] for result in results)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='工作进程需要继承替换的解析函数')
+def test_process_pool_cancel_midway(jobs, monkeypatch):
+    first_chunk = {src for src, _ in jobs[:4]}
+
+    def parse_after_cancel(src, text, plan):
+        # 在工作进程中执行：第一块以外的文件等到主进程取消、监视线程取消本块之后才继续
+        if src not in first_chunk:
+            while engine._cancel_state.value == 0:
+                time.sleep(0.01)
+            time.sleep(CANCEL_POLL_INTERVAL * 10)
+        return parse_source(src, text, plan)
+
+    monkeypatch.setattr(pipeline, 'parse_source', parse_after_cancel)
+    token = CancelToken()
+    results = []
+    with ProcessPoolEngine(workers=2) as pool:
+        for result in pool.run(jobs, make_plan(), chunksize=4, token=token):
+            results.append(result)
+            token.cancel()
+        check_results(jobs, results)
+        by_path = {result['path']: result for result in results}
+        assert all(by_path[src]['ok'] for src in first_chunk)
+        assert all(by_path[src]['cancelled'] for src, _ in jobs[4:])
+
+        # 取消只影响当时正在运行的批次，进程池可以继续转换下一批
+        monkeypatch.undo()
+        results = list(pool.run(jobs[:8], make_plan(), chunksize=4, token=CancelToken()))
+        assert len(results) == 8
+        assert all(result['ok'] for result in results)
+
+SPAWN_SCRIPT = """
+import sys
+sys.path.insert(0, %r)
+import gui_sentinel  # 代替 toAss.py 在模块顶层导入的 PyQt5
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.set_start_method('spawn')
+    from engine import ProcessPoolEngine
+    import os
+    import time
+    check = ("'gui_sentinel' in __import__('sys').modules",)
+    with ProcessPoolEngine(workers=1) as engine:
+        print(engine._pool.apply(eval, check))
+        # 工作进程意外退出后进程池补充的新进程同样不加载
+        worker = engine._pool._pool[0]
+        engine._pool.apply_async(os._exit, (1,))
+        while worker in engine._pool._pool:
+            time.sleep(0.05)
+        print(engine._pool.apply(eval, check))
+        # 退出的进程上的任务不会完成，close() 会一直等待它
+        engine._pool.terminate()
+    print(__spec__)
+"""
+
+
+def test_spawn_workers_do_not_import_gui(tmp_path):
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    (tmp_path / 'gui_sentinel.py').write_text('', encoding='utf-8')
+    script = tmp_path / 'gui.py'
+    script.write_text(SPAWN_SCRIPT % repo, encoding='utf-8')
+    output = subprocess.run([sys.executable, str(script)], cwd=str(tmp_path), capture_output=True, text=True,
+                            timeout=60, check=True).stdout
+    # 进程池关闭后恢复主模块的 __spec__
+    assert output.split() == ['False', 'False', 'None']
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""只改样式的 ASS 路径与 pysubs2 完整路径的对比测试"""
+
+import pysubs2
+import pytest
+
+import restyle
+from converter import compile_plan, convert_file, convert_with_plan, DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE
+
+HEADER = """[Script Info]
+; 注释行
+Title: test
+ScriptType: v4.00+
+PlayResX: 1280
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, \
+Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, \
+MarginV, Encoding
+Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,2,2,10,10,10,1
+Style: Sign,Arial,30,&H0000FFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,2,8,10,10,10,1
+
+"""
+
+EVENTS = r"""[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,第一句
+Dialogue: 1,0:00:03.00,0:00:04.50,Sign,,0,0,0,,{\pos(10,10)}招牌\N第二行
+Comment: 0,0:00:05.00,0:00:06.00,Default,,0,0,0,,注释
+"""
+
+
+def make_plan(fast_path):
+    return compile_plan([], [], 'H0000FF00', 'H00FF0000', False, False, DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE,
+                        fast_path=fast_path)
+
+
+def load_both(tmp_path, content, newline='\n'):
+    """分别用只改样式的路径和 pysubs2 完整路径转换，返回两个结果"""
+    src = tmp_path / 'in.ass'
+    src.write_bytes(content.replace('\n', newline).encode('utf-8'))
+    outputs = []
+    for fast_path in (True, False):
+        dst = tmp_path / f'{fast_path}.ass'
+        convert_file(str(src), str(dst), [], [], 'H0000FF00', 'H00FF0000', False, False, DEFAULT_FONT_FAMILY,
+                     DEFAULT_FONT_SIZE, fast_path=fast_path)
+        outputs.append(pysubs2.load(str(dst)))
+    # 只改样式的路径保留原有的注释行，pysubs2 不保留
+    assert '; 注释行' in (tmp_path / 'True.ass').read_text(encoding='utf-8')
+    assert '; 注释行' not in (tmp_path / 'False.ass').read_text(encoding='utf-8')
+    return outputs
+
+
+def event_tuples(subs):
+    return [(event.type, event.layer, event.start, event.end, event.style, event.text) for event in subs]
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+@pytest.mark.parametrize('header', [
+    HEADER,
+    HEADER.replace('ScriptType: v4.00+\n', ''),
+    HEADER.replace('ScriptType: v4.00+\n', '').replace('PlayResX: 1280\n', ''),
+    HEADER.replace('PlayResX: 1280', 'PlayResX:'),
+], ids=['complete', 'no-script-type', 'no-script-type-or-play-res', 'empty-play-res'])
+def test_restyle_matches_full_path(tmp_path, header, newline):
+    fast, full = load_both(tmp_path, header + EVENTS, newline)
+    assert fast.info == full.info
+    assert fast.info['ScriptType'] == 'v4.00+'
+    assert fast.styles == full.styles
+    assert fast.styles['Default'].primarycolor == pysubs2.Color(0, 255, 0)
+    assert event_tuples(fast) == event_tuples(full)
+
+
+def test_restyle_through_convert_with_plan(tmp_path):
+    src = tmp_path / 'in.ass'
+    src.write_text(HEADER + EVENTS, encoding='utf-8')
+    dst = tmp_path / 'out.ass'
+    stats = {}
+    convert_with_plan(str(src), str(dst), make_plan(True), stats)
+    assert 'restyle' in stats['stages']
+    # 事件行原样复制
+    assert dst.read_text(encoding='utf-8').endswith(EVENTS)
+
+
+@pytest.mark.parametrize('content', [
+    HEADER.replace('Style: Default', 'Style: Other') + EVENTS,
+    HEADER.replace('[V4+ Styles]', '[V4 Styles]') + EVENTS,
+    HEADER,
+])
+def test_restyle_unsupported(tmp_path, content):
+    src = tmp_path / 'in.ass'
+    src.write_text(content, encoding='utf-8')
+    with pytest.raises(restyle.RestyleUnsupported):
+        restyle.restyle_file(str(src), str(tmp_path / 'out.ass'), '&H0000FF00', '&H00FF0000')
+    assert not (tmp_path / 'out.ass').exists()
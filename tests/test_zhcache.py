@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""在线转换逐行缓存的测试"""
+
+import os
+
+import pytest
+
+import zhcache
+import converter
+
+
+@pytest.fixture
+def cache_home(tmp_path, monkeypatch):
+    monkeypatch.setattr(zhcache.sys, 'platform', 'linux')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    converter._translation_cache.cache_clear()
+    yield tmp_path
+    converter._translation_cache.cache_clear()
+
+
+def test_default_path_is_user_cache_dir(cache_home, monkeypatch):
+    monkeypatch.chdir(cache_home)
+    cache = zhcache.TranslationCache()
+    try:
+        assert cache.path == os.path.join(str(cache_home), 'toass', zhcache.CACHE_NAME)
+        assert os.path.exists(cache.path)
+    finally:
+        cache.close()
+
+
+def test_cache_key_includes_url_and_service_version(cache_home):
+    keys = {
+        converter.china_engine_version('online', options)
+        for options in ({}, {'url': 'http://127.0.0.1:8000/convert'}, {'service_version': '2026.10'})
+    }
+    assert len(keys) == 3
+    # 未设置服务版本时标识与之前相同，已有的增量转换清单仍然有效
+    assert 'service_version' not in converter.china_engine_version('online', {})
+
+    default = converter.get_translation_cache()
+    other = converter.get_translation_cache({'url': 'http://127.0.0.1:8000/convert'})
+    try:
+        default.put_many([('軟體', '软件')])
+        assert default.get_many(['軟體']) == {'軟體': '软件'}
+        assert other.get_many(['軟體']) == {}
+        assert other.path == default.path
+    finally:
+        default.close()
+        other.close()
+
+
+def test_lru_eviction(tmp_path, monkeypatch):
+    clock = iter(range(1000))
+    monkeypatch.setattr(zhcache.time, 'time', lambda: next(clock))
+    cache = zhcache.TranslationCache(str(tmp_path / 'cache.db'), max_entries=10)
+    try:
+        for i in range(10):
+            cache.put_many([(f'line{i}', f'LINE{i}')])
+        # 命中刷新使用时间，line0 不再是最久未使用的条目
+        assert cache.get_many(['line0']) == {'line0': 'LINE0'}
+        cache.put_many([('line10', 'LINE10')])
+        # 超出容量时淘汰到九成
+        found = cache.get_many([f'line{i}' for i in range(11)])
+        assert sorted(found) == sorted(['line0'] + [f'line{i}' for i in range(3, 11)])
+    finally:
+        cache.close()
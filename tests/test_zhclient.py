@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""在线转换客户端的测试：重试等待时间和取消后放弃请求"""
+
+import email.utils
+from types import SimpleNamespace
+
+import pytest
+
+import zhclient
+
+pytest.importorskip('requests')
+
+
+def test_parse_retry_after_seconds_and_date():
+    now = 1700000000.0
+    assert zhclient.parse_retry_after('5') == 5.0
+    assert zhclient.parse_retry_after('-3') == 0.0
+    assert zhclient.parse_retry_after(email.utils.formatdate(now + 120, usegmt=True), now) == 120.0
+    assert zhclient.parse_retry_after(email.utils.formatdate(now - 120, usegmt=True), now) == 0.0
+    assert zhclient.parse_retry_after('soon') is None
+    assert zhclient.parse_retry_after('nan') is None
+
+
+def test_retry_delay_is_capped():
+    client = zhclient.ZhConvertClient(proxy='', backoff=1, max_backoff=10)
+
+    def response(retry_after):
+        return SimpleNamespace(headers={'retry-after': retry_after})
+
+    assert client._retry_delay(0, response('3')) == 3.0
+    assert client._retry_delay(0, response('86400')) == 10
+    assert client._retry_delay(0, response('inf')) == 10
+    future = email.utils.formatdate(zhclient.time.time() + 3600, usegmt=True)
+    assert client._retry_delay(0, response(future)) == 10
+    # 无法解析时按指数退避，退避本身也不超过上限
+    assert 0.5 <= client._retry_delay(0, response('later')) <= 1
+    assert 5 <= client._retry_delay(20) <= 10
+
+
+def test_abandoned_request_returns_promptly():
+    import zhserver
+    server = zhserver.start_server(latency=5.0)
+    try:
+        client = zhclient.ZhConvertClient(server.url, proxy='', timeout=10)
+        deadline = zhclient.time.monotonic() + 0.2
+        start = zhclient.time.monotonic()
+        with pytest.raises(zhclient.RequestAbandoned):
+            client.convert('測試', {}, abandoned=lambda: zhclient.time.monotonic() > deadline)
+        assert zhclient.time.monotonic() - start < 1.0
+    finally:
+        server.shutdown()
+
+
+def test_abandoned_during_rate_limit_wait(monkeypatch):
+    monkeypatch.setattr(zhclient, '_limiter', zhclient.TokenBucket())
+    client = zhclient.ZhConvertClient('http://127.0.0.1:9/convert', proxy='', rate=0.01, burst=1)
+    zhclient._limiter.acquire(client.rate, client.burst)
+    start = zhclient.time.monotonic()
+    with pytest.raises(zhclient.RequestAbandoned):
+        client.convert('測試', {}, abandoned=lambda: zhclient.time.monotonic() - start > 0.1)
+    assert zhclient.time.monotonic() - start < 1.0
+
+
+def test_abandoned_during_retry_wait():
+    import zhserver
+    server = zhserver.start_server(error_rate=1.0)
+    try:
+        client = zhclient.ZhConvertClient(server.url, proxy='', retries=5, backoff=10, max_backoff=10)
+        start = zhclient.time.monotonic()
+        with pytest.raises(Exception, match='HTTP Error'):
+            client.convert('測試', {}, abandoned=lambda: zhclient.time.monotonic() - start > 0.2)
+        assert zhclient.time.monotonic() - start < 1.0
+        assert client.retried == 0
+    finally:
+        server.shutdown()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""在线转换请求合并的测试：返回结果无法逐行对应时报错而不是错位"""
+
+import time
+import threading
+
+import pytest
+
+from batch import CancelToken, ConversionCancelled
+from zhdispatch import ConversionDispatcher, MisalignmentError, mark_lines, unmark_lines
+
+TEXTS = ['第一行', '第二行', '多行\n字幕', '']
+
+
+def test_unmark_roundtrip():
+    assert unmark_lines(mark_lines(TEXTS), TEXTS) == TEXTS
+
+
+def test_unmark_dropped_line():
+    lines = mark_lines(TEXTS).split('\n')
+    del lines[1]
+    with pytest.raises(MisalignmentError):
+        unmark_lines('\n'.join(lines), TEXTS)
+
+
+def test_unmark_reordered_lines():
+    lines = mark_lines(TEXTS).split('\n')
+    lines[0], lines[1] = lines[1], lines[0]
+    with pytest.raises(MisalignmentError):
+        unmark_lines('\n'.join(lines), TEXTS)
+
+
+def test_unmark_extra_newline():
+    converted = mark_lines(TEXTS).replace('第一行', '第一\n行')
+    with pytest.raises(MisalignmentError):
+        unmark_lines(converted, TEXTS)
+
+
+def test_unmark_missing_newline():
+    converted = mark_lines(TEXTS).replace('多行\n字幕', '多行字幕')
+    with pytest.raises(MisalignmentError):
+        unmark_lines(converted, TEXTS)
+
+
+class FakeService:
+    """把文本转成大写；含 bad 的请求丢掉最后一行"""
+
+    def __init__(self):
+        self.payloads = []
+        self.lock = threading.Lock()
+
+    def __call__(self, text, abandoned=None):
+        with self.lock:
+            self.payloads.append(text)
+        if 'bad' in text:
+            text = text.rsplit('\n', 1)[0]
+        return text.upper()
+
+
+def test_send_resends_pieces_and_fails_only_misaligned_group():
+    service = FakeService()
+    dispatcher = ConversionDispatcher(service, linger=0.5)
+    results = {}
+
+    def convert(name, lines):
+        try:
+            results[name] = dispatcher.convert(lines)
+        except MisalignmentError as e:
+            results[name] = e
+
+    threads = [
+        threading.Thread(target=convert, args=('good', ['a', 'b'])),
+        threading.Thread(target=convert, args=('bad', ['bad', 'c'])),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert results['good'] == ['A', 'B']
+    assert isinstance(results['bad'], MisalignmentError)
+    # 合并的请求失败后逐块重新发送
+    assert len(service.payloads) == 3
+    assert 'a' in service.payloads[0] and 'bad' in service.payloads[0]
+
+
+def test_cancel_during_linger_keeps_dispatcher_running():
+    service = FakeService()
+    dispatcher = ConversionDispatcher(service, linger=0.3)
+    token = CancelToken()
+    threading.Timer(0.1, token.cancel).start()
+    # 取消时分块还在等待其他任务加入，队列被清空
+    with pytest.raises(ConversionCancelled):
+        dispatcher.convert(['a'], token)
+    # 等到等待时间结束、队列为空时再提交下一组
+    time.sleep(0.5)
+    assert service.payloads == []
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(dispatcher.convert(['b'])), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert results == [['B']]
+    assert dispatcher._thread.is_alive()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""离线繁体中国化与在线转换（繁化姬）的对照测试
+
+tests/golden/zhconvert/source.txt 为繁体语料，online.txt 为繁化姬"中国化"的逐行结果，用
+python benchmark.py zhconvert --corpus tests/golden/zhconvert/source.txt --capture tests/golden/zhconvert/online.txt
+重新采集。已知差异列在 KNOWN_DIVERGENCES 中：离线结果固定为记录的值，词典或转换链变化时测试会提示。
+"""
+
+import os
+
+import pytest
+
+import zhlocal
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'zhconvert')
+
+# 原文 -> (离线转换结果, 原因)
+KNOWN_DIVERGENCES = {
+    '我的電腦記憶體不夠，得換一台筆記型電腦。': ('我的电脑内存不够，得换一台笔记型电脑。', 'OpenCC 词典没有"筆記型電腦"'),
+    '「你好嗎？」她問。': ('「你好吗？」她问。', '繁化姬把「」转换为“”，OpenCC 不转换标点'),
+    '『小心』，他低聲說。': ('『小心』，他低声说。', '繁化姬把『』转换为‘’，OpenCC 不转换标点'),
+    '這個資料庫的查詢速度太慢了。': ('这个数据库的查找速度太慢了。', 'TWPhrasesRev 中"查詢"的第一个候选为"查找"'),
+    '你知道怎麼設定這個介面嗎？': ('你知道怎么设置这个接口吗？', 'TWPhrasesRev 中"介面"的第一个候选为"接口"'),
+    '她喝了一杯優酪乳。': ('她喝了一杯优酪乳。', 'OpenCC 词典没有"優酪乳"'),
+}
+
+
+def read_lines(name):
+    with open(os.path.join(GOLDEN_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+SOURCE = read_lines('source.txt')
+ONLINE = read_lines('online.txt')
+
+
+def test_corpus_aligned():
+    assert len(SOURCE) == len(ONLINE)
+    assert set(KNOWN_DIVERGENCES) <= set(SOURCE)
+
+
+@pytest.mark.parametrize('source, online', list(zip(SOURCE, ONLINE)), ids=range(len(SOURCE)))
+def test_local_matches_online(source, online):
+    local = zhlocal.convert_to_china_text(source)
+    if source in KNOWN_DIVERGENCES:
+        expected, reason = KNOWN_DIVERGENCES[source]
+        assert local == expected, reason
+        assert local != online, '已与在线结果一致，从 KNOWN_DIVERGENCES 中删除'
+    else:
+        assert local == online
+
+
+def test_whole_text_matches_lines():
+    """整段转换与逐行转换结果相同（词组不会跨行匹配）"""
+    assert zhlocal.convert_to_china_text('\n'.join(SOURCE)).split('\n') == [
+        zhlocal.convert_to_china_text(line) for line in SOURCE]
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换耗时统计
+每个转换任务的结果记录带有 stages（各步骤的耗时，秒，用 time.perf_counter 计时）和 metrics（读取字节数、
+写入字节数、发给繁体转换的字符数、在线转换的请求数和 HTTP 耗时）；
+BatchTimings 把一批任务的记录汇总为各步骤耗时的 p50 / p95 / p99，供界面显示和导出 JSON。
+不依赖 PyQt5，图形界面和命令行共用。
+"""
+
+import json
+import threading
+from array import array
+
+# 步骤名称（按转换顺序），也是流水线各阶段的名称（见 pipeline）；
+# restyle / stream 为一次完成整个转换的路径，queue 为流水线中等待其他步骤的时间
+STAGE_NAMES = {
+    'read': '读取',
+    'parse': '解析',
+    'china': '繁体转换',
+    'render': '生成',
+    'write': '写入',
+    'delete': '删除原文件',
+    'restyle': '只改样式',
+    'stream': '流式转换',
+    'queue': '排队等待',
+    'total': '总耗时',
+}
+# 结果记录 metrics 中的计数项
+METRIC_KEYS = ('bytes_read', 'bytes_written', 'payload_chars', 'http_requests', 'http_seconds')
+# 导出时保留的逐个任务记录数上限，其余只计入汇总
+MAX_JOB_RECORDS = 20000
+
+
+def percentile(values, pct):
+    """返回已排序列表的百分位数"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(pct / 100 * (len(values) - 1)))))
+    return values[index]
+
+
+def job_metrics(stats):
+    """从 convert_with_plan 的 stats 字典中取出结果记录的 metrics"""
+    return {key: stats[key] for key in METRIC_KEYS if key in stats}
+
+
+class BatchTimings:
+    """一批任务的耗时汇总（线程安全）
+
+    各步骤的耗时只统计成功的任务，保存在 array 中，10 万个文件也只占几 MB；
+    逐个任务的记录最多保留 MAX_JOB_RECORDS 条。
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self.metrics = dict.fromkeys(METRIC_KEYS, 0)
+        self.events = 0
+        self.records = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, result):
+        """记录一个任务的结果"""
+        with self._lock:
+            if len(self.records) < MAX_JOB_RECORDS:
+                self.records.append(result)
+            else:
+                self.dropped += 1
+            if not result['ok']:
+                return
+            stages = result.get('stages') or {}
+            for stage, seconds in stages.items():
+                self._sample(stage, seconds)
+            if stages:
+                # 流水线中在队列里等待的时间：总耗时减去各步骤实际执行的时间
+                self._sample('queue', max(0.0, result['elapsed'] - sum(stages.values())))
+            self._sample('total', result['elapsed'])
+            self.events += result.get('lines', 0)
+            for key, value in (result.get('metrics') or {}).items():
+                self.metrics[key] = self.metrics.get(key, 0) + value
+
+    def _sample(self, stage, seconds):
+        samples = self.samples.get(stage)
+        if samples is None:
+            samples = self.samples[stage] = array('d')
+        samples.append(seconds)
+
+    def summary(self):
+        """各步骤的次数、合计和 p50 / p95 / p99 / 最大耗时（毫秒），以及整批的字节数和请求数"""
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self.samples.items()}
+            metrics = dict(self.metrics)
+            events = self.events
+        stages = {}
+        for stage in sorted(samples, key=lambda name: list(STAGE_NAMES).index(name) if name in STAGE_NAMES else 99):
+            values = samples[stage]
+            stages[stage] = {
+                'count': len(values),
+                'total_ms': round(sum(values) * 1000, 2),
+                'p50_ms': round(percentile(values, 50) * 1000, 3),
+                'p95_ms': round(percentile(values, 95) * 1000, 3),
+                'p99_ms': round(percentile(values, 99) * 1000, 3),
+                'max_ms': round(values[-1] * 1000, 3),
+            }
+        metrics['http_seconds'] = round(metrics.get('http_seconds', 0), 3)
+        return {'files': len(samples.get('total', ())), 'events': events, 'metrics': metrics, 'stages': stages}
+
+    def export(self, path, extra=None):
+        """把汇总和逐个任务的记录写入 JSON 文件；extra 为附加的字段（例如批次设置）"""
+        with self._lock:
+            records = list(self.records)
+            dropped = self.dropped
+        data = dict(extra or {})
+        data.update(summary=self.summary(), jobs=records, jobs_omitted=dropped)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def format_summary(summary):
+    """把 BatchTimings.summary() 格式化为文字表格"""
+    metrics = summary['metrics']
+    lines = [f"成功 {summary['files']} 个文件，{summary['events']} 条字幕，"
+             f"读取 {metrics['bytes_read'] / 1048576:.1f} MB，写入 {metrics['bytes_written'] / 1048576:.1f} MB"]
+    if metrics['payload_chars']:
+        line = f"繁体转换 {metrics['payload_chars']} 字"
+        if metrics['http_requests']:
+            # 合并发送的请求计入其中的每个文件，这里是按文件累计的次数和耗时
+            line += (f"，在线请求按文件累计 {metrics['http_requests']} 次、"
+                     f"HTTP 耗时 {metrics['http_seconds']:.2f} 秒")
+        lines.append(line)
+    lines.append('')
+    lines.append(f"{'步骤':<8}{'次数':>8}{'合计(秒)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'最大(ms)':>10}")
+    for stage, values in summary['stages'].items():
+        name = STAGE_NAMES.get(stage, stage)
+        # 中文名称按两个字符宽度对齐
+        lines.append(f"{name}{' ' * max(1, 12 - 2 * len(name))}{values['count']:>8}{values['total_ms'] / 1000:>10.2f}"
+                     f"{values['p50_ms']:>10.1f}{values['p95_ms']:>10.1f}{values['p99_ms']:>10.1f}"
+                     f"{values['max_ms']:>10.1f}")
+    return '\n'.join(lines)
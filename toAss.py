@@ -8,15 +8,35 @@ SRT 转 ASS 字幕转换器
 import sys
 import os
 import json
-import pysubs2
-import requests
+import time
+import logging
+from collections import deque
+
+import instance
+
+# 启动计时：各阶段结束时记录时间点，主窗口进入事件循环后输出启动耗时报告
+startup_marks = [('start', time.perf_counter())]
+# 设置了该环境变量时，启动完成后输出 JSON 格式的启动报告并退出（供 benchmark.py startup 使用），不使用单实例
+STARTUP_BENCHMARK_ENV = 'TOASS_STARTUP_BENCHMARK'
+# 日志级别（DEBUG 时输出每批的耗时统计表，WARNING 时只输出问题），默认 INFO
+LOG_LEVEL_ENV = 'TOASS_LOG_LEVEL'
+
+logger = logging.getLogger('toass')
+
+# 再次启动时把文件交给已经在运行的实例后直接退出，不必加载 PyQt5
+if __name__ == '__main__' and not os.environ.get(STARTUP_BENCHMARK_ENV):
+    if instance.forward_to_running(sys.argv[1:]):
+        sys.exit(0)
+
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-                             QListWidget, QListWidgetItem, QCheckBox, QLabel,
-                             QDialog, QFormLayout, QLineEdit, QTimeEdit, QTextEdit, QDialogButtonBox,
+                             QListWidget, QListWidgetItem, QListView, QCheckBox, QLabel, QProgressBar,
+                             QDialog, QFormLayout, QLineEdit, QTimeEdit, QTextEdit, QPlainTextEdit, QDialogButtonBox,
                              QFileDialog, QColorDialog, QAbstractItemView, QSystemTrayIcon, QMenu, QMessageBox,
                              QFontDialog, QStackedWidget)
-from PyQt5.QtCore import Qt, QRunnable, QThreadPool, pyqtSignal, QObject, QTranslator, QLibraryInfo, QTime
-from PyQt5.QtGui import QFont, QIcon
+from PyQt5.QtCore import (Qt, QRunnable, QThreadPool, QTimer, pyqtSignal, QTranslator, QLibraryInfo, QTime,
+                          QAbstractListModel, QModelIndex)
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from PyQt5.QtGui import QFont, QIcon, QPainter, QPalette
 # Try to import qfluentwidgets, fallback to standard PyQt5 if not available
 try:
     from qfluentwidgets import (PushButton, Theme, setTheme, InfoBar, InfoBarPosition, FluentIcon as FIF,
@@ -40,13 +60,20 @@ except ImportError:
 
     class InfoBar:
         @staticmethod
-        def success(title, content, duration, parent):
+        def success(title, content, **kwargs):
+            pass
+        @staticmethod
+        def error(title, content, **kwargs):
+            pass
+        @staticmethod
+        def warning(title, content, **kwargs):
             pass
         @staticmethod
-        def error(title, content, duration, parent):
+        def info(title, content, **kwargs):
             pass
 
     class InfoBarPosition:
+        TOP = "top"
         TOP_RIGHT = "top_right"
 
     class FIF:
@@ -60,114 +87,229 @@ except ImportError:
         HOME = None
         SETTING = None
 
-CONFIG_FILE = 'sub.json'
-SETTINGS_FILE = 'settings.json'
+from converter import (CONFIG_FILE, SETTINGS_FILE, SUPPORTED_EXTENSIONS, DEFAULT_CHINA_ENGINE, compile_plan,
+                       get_translation_cache, online_settings, output_path_for, find_output_collisions,
+                       format_output_collisions)
+from zhcache import default_cache_path
+from manifest import IncrementalTracker
+from pipeline import ConversionPipeline, format_stage_stats, make_result, merge_stage_stats, summarize_stage_stats
+from batch import BatchProgress, BatchScheduler, CancelToken, format_duration
+from timings import format_summary
+import tracing
+from scanner import DirectoryScanner
+
+# 转换进度的刷新间隔（毫秒）：工作线程只汇总结果，界面按固定频率读取
+PROGRESS_INTERVAL_MS = 100
+
+# 启动阶段的名称（按顺序）
+STARTUP_STAGES = {
+    'import': '导入模块',
+    'app': '创建应用',
+    'window': '创建主窗口',
+    'shown': '显示窗口',
+    'interactive': '进入事件循环',
+    'deferred': '延后初始化',
+}
+# 启动时不应导入的模块：转换依赖在第一次转换时才加载
+LAZY_MODULES = ('pysubs2', 'fastpath', 'requests', 'multiprocessing', 'engine')
+
+# 文件列表的默认样式
+FILE_LIST_STYLE = """
+    QListView {
+        border: 2px dashed #666666;
+        border-radius: 8px;
+        background-color: rgba(255, 255, 255, 0.05);
+        padding: 10px;
+        font-size: 12px;
+    }
+    QListView::item {
+        padding: 8px;
+        margin: 2px;
+        border-radius: 4px;
+        background-color: rgba(255, 255, 255, 0.1);
+    }
+    QListView::item:selected {
+        background-color: rgba(0, 120, 212, 0.6);
+    }
+    QListView::item:hover {
+        background-color: rgba(255, 255, 255, 0.15);
+    }
+"""
+
+class FileListModel(QAbstractListModel):
+    """文件列表的数据模型
+
+    路径按添加顺序保存在列表中，另用集合去重，添加 10 万个文件也只需一次插入通知；
+    视图只为可见的行取数据，不为每个文件创建列表项对象。
+    从文件夹添加的文件同时记录源根目录（与路径一一对应，同一批共用一个字符串），用于按源目录结构输出。
+    """
 
-class DragDropListWidget(QListWidget):
-    """支持拖拽的文件列表组件"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths = []
+        self._roots = []
+        self._known = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role in (Qt.DisplayRole, Qt.ToolTipRole) and index.isValid():
+            return self._paths[index.row()]
+        return None
+
+    def paths(self):
+        """当前的全部文件路径（副本）"""
+        return list(self._paths)
+
+    def source_roots(self):
+        """与 paths() 一一对应的源根目录，单独添加的文件为 None"""
+        return list(self._roots)
+
+    def add_paths(self, paths, root=None):
+        """添加文件，跳过已有的路径，返回实际添加的数量；root 为这批文件的源根目录"""
+        known = self._known
+        new_paths = []
+        for path in paths:
+            if path not in known:
+                known.add(path)
+                new_paths.append(path)
+        if new_paths:
+            first = len(self._paths)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_paths) - 1)
+            self._paths.extend(new_paths)
+            self._roots.extend([root] * len(new_paths))
+            self.endInsertRows()
+        return len(new_paths)
+
+    def remove_rows(self, rows):
+        """删除指定的行"""
+        rows = sorted(set(rows))
+        if not rows:
+            return
+        if rows[-1] - rows[0] + 1 == len(rows):
+            # 连续的一段直接删除，视图保持滚动位置
+            self.beginRemoveRows(QModelIndex(), rows[0], rows[-1])
+            removed = self._paths[rows[0]:rows[-1] + 1]
+            del self._paths[rows[0]:rows[-1] + 1]
+            del self._roots[rows[0]:rows[-1] + 1]
+            self.endRemoveRows()
+        else:
+            # 分散的多行一次重建，避免逐行删除的平方级开销
+            drop = set(rows)
+            self.beginResetModel()
+            removed = [self._paths[row] for row in rows]
+            self._paths = [path for row, path in enumerate(self._paths) if row not in drop]
+            self._roots = [root for row, root in enumerate(self._roots) if row not in drop]
+            self.endResetModel()
+        self._known.difference_update(removed)
+
+    def clear(self):
+        """清空列表"""
+        self.beginResetModel()
+        self._paths = []
+        self._roots = []
+        self._known = set()
+        self.endResetModel()
+
+
+def has_subtitle_urls(mime_data):
+    """拖拽内容中是否有支持的字幕文件或文件夹（找到一个即返回）"""
+    for url in mime_data.urls():
+        path = url.toLocalFile()
+        if path and (path.lower().endswith(('.srt', '.vtt', '.ass')) or os.path.isdir(path)):
+            return True
+    return False
+
+
+class DragDropListView(QListView):
+    """支持拖拽的文件列表组件，列表为空时显示提示文字"""
     files_dropped = pyqtSignal(list)
+    # 拖入的文件夹，由界面在后台扫描
+    folders_dropped = pyqtSignal(list)
+
+    PLACEHOLDER = "拖拽 SRT、VTT、ASS 文件或文件夹到此处，或点击'添加文件'按钮"
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAcceptDrops(True)
+        # 拖拽进入时检查一次，移动过程中沿用结果，不再重复检查（文件夹在网络盘上时检查需要访问服务器）
+        self._drag_accepted = False
+        # 所有行高度相同，视图不必逐行计算尺寸；分批布局，一次添加 10 万行也不会卡住界面
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(2000)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.model() is None or self.model().rowCount() == 0:
+            painter = QPainter(self.viewport())
+            painter.setPen(self.palette().color(QPalette.PlaceholderText))
+            painter.drawText(self.viewport().rect(), Qt.AlignCenter, self.PLACEHOLDER)
+            painter.end()
 
     def dragEnterEvent(self, event):
         """拖拽进入事件"""
-        if event.mimeData().hasUrls():
-            # 检查是否包含支持的文件类型
-            urls = event.mimeData().urls()
-            valid_files = []
-            for url in urls:
-                file_path = url.toLocalFile()
-                if file_path.lower().endswith(('.srt', '.vtt', '.ass')):
-                    valid_files.append(file_path)
-
-            if valid_files:
-                event.acceptProposedAction()
-                # 添加视觉反馈
-                self.setStyleSheet("""
-                    QListWidget {
-                        border: 2px solid #00D4FF;
-                        border-radius: 8px;
-                        background-color: rgba(0, 212, 255, 0.1);
-                        padding: 10px;
-                        font-size: 12px;
-                    }
-                    QListWidget::item {
-                        padding: 8px;
-                        margin: 2px;
-                        border-radius: 4px;
-                        background-color: rgba(255, 255, 255, 0.1);
-                    }
-                    QListWidget::item:selected {
-                        background-color: rgba(0, 120, 212, 0.6);
-                    }
-                    QListWidget::item:hover {
-                        background-color: rgba(255, 255, 255, 0.15);
-                    }
-                """)
-            else:
-                event.ignore()
+        self._drag_accepted = event.mimeData().hasUrls() and has_subtitle_urls(event.mimeData())
+        if self._drag_accepted:
+            event.acceptProposedAction()
+            # 添加视觉反馈
+            self.setStyleSheet("""
+                QListView {
+                    border: 2px solid #00D4FF;
+                    border-radius: 8px;
+                    background-color: rgba(0, 212, 255, 0.1);
+                    padding: 10px;
+                    font-size: 12px;
+                }
+                QListView::item {
+                    padding: 8px;
+                    margin: 2px;
+                    border-radius: 4px;
+                    background-color: rgba(255, 255, 255, 0.1);
+                }
+                QListView::item:selected {
+                    background-color: rgba(0, 120, 212, 0.6);
+                }
+                QListView::item:hover {
+                    background-color: rgba(255, 255, 255, 0.15);
+                }
+            """)
         else:
             event.ignore()
 
     def dragMoveEvent(self, event):
         """拖拽移动事件"""
-        if event.mimeData().hasUrls():
-            # 检查是否包含支持的文件类型
-            urls = event.mimeData().urls()
-            valid_files = []
-            for url in urls:
-                file_path = url.toLocalFile()
-                if file_path.lower().endswith(('.srt', '.vtt', '.ass')):
-                    valid_files.append(file_path)
-
-            if valid_files:
-                event.acceptProposedAction()
-            else:
-                event.ignore()
+        if self._drag_accepted:
+            event.acceptProposedAction()
         else:
             event.ignore()
 
     def dragLeaveEvent(self, event):
         """拖拽离开事件"""
         # 恢复原始样式
-        self.setStyleSheet("""
-            QListWidget {
-                border: 2px dashed #666666;
-                border-radius: 8px;
-                background-color: rgba(255, 255, 255, 0.05);
-                padding: 10px;
-                font-size: 12px;
-            }
-            QListWidget::item {
-                padding: 8px;
-                margin: 2px;
-                border-radius: 4px;
-                background-color: rgba(255, 255, 255, 0.1);
-            }
-            QListWidget::item:selected {
-                background-color: rgba(0, 120, 212, 0.6);
-            }
-            QListWidget::item:hover {
-                background-color: rgba(255, 255, 255, 0.15);
-            }
-        """)
+        self.setStyleSheet(FILE_LIST_STYLE)
         event.accept()
 
     def dropEvent(self, event):
         """拖拽放下事件"""
         if event.mimeData().hasUrls():
             files = []
+            folders = []
             urls = event.mimeData().urls()
 
             for url in urls:
                 file_path = url.toLocalFile()
                 if file_path.lower().endswith(('.srt', '.vtt', '.ass')):
                     files.append(file_path)
+                elif file_path and os.path.isdir(file_path):
+                    folders.append(file_path)
 
             if files:
                 self.files_dropped.emit(files)
+            if folders:
+                self.folders_dropped.emit(folders)
+            if files or folders:
                 event.acceptProposedAction()
             else:
                 event.ignore()
@@ -179,7 +321,8 @@ class DragDropListWidget(QListWidget):
 
 class MainInterface(ScrollArea):
     """主界面 - 文件转换"""
-    convert_requested = pyqtSignal(list, list, str, str, bool, bool)
+    # 文件列表、插入选项、颜色、删除原文件、繁体中国化、与文件一一对应的源根目录
+    convert_requested = pyqtSignal(list, list, str, str, bool, bool, list)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -191,6 +334,13 @@ class MainInterface(ScrollArea):
         self.convert_to_china = False
         self.output_directory = ""  # 输出目录配置
 
+        # 正在后台扫描的文件夹，定时取出扫描结果加入文件列表
+        self.scanners = []
+        self.scan_added = 0
+        self.scan_timer = QTimer(self)
+        self.scan_timer.setInterval(PROGRESS_INTERVAL_MS)
+        self.scan_timer.timeout.connect(self.collect_scanned_files)
+
         self.setupUI()
 
     def setupUI(self):
@@ -217,47 +367,28 @@ class MainInterface(ScrollArea):
         file_title = SubtitleLabel("文件列表")
         file_layout.addWidget(file_title)
 
-        # 文件列表 - 使用自定义的拖拽列表
-        self.file_list = DragDropListWidget()
+        # 文件列表 - 使用自定义的拖拽列表，数据保存在模型中
+        self.file_model = FileListModel(self)
+        self.file_list = DragDropListView()
+        self.file_list.setModel(self.file_model)
         self.file_list.setMinimumHeight(200)
         self.file_list.setAcceptDrops(True)
         self.file_list.setDragDropMode(QAbstractItemView.DropOnly)
         self.file_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         # 连接文件拖拽信号
         self.file_list.files_dropped.connect(self.handle_dropped_files)
+        self.file_list.folders_dropped.connect(self.add_folders)
 
         # 设置文件列表样式
-        self.file_list.setStyleSheet("""
-            QListWidget {
-                border: 2px dashed #666666;
-                border-radius: 8px;
-                background-color: rgba(255, 255, 255, 0.05);
-                padding: 10px;
-                font-size: 12px;
-            }
-            QListWidget::item {
-                padding: 8px;
-                margin: 2px;
-                border-radius: 4px;
-                background-color: rgba(255, 255, 255, 0.1);
-            }
-            QListWidget::item:selected {
-                background-color: rgba(0, 120, 212, 0.6);
-            }
-            QListWidget::item:hover {
-                background-color: rgba(255, 255, 255, 0.15);
-            }
-        """)
-
-        # 添加占位符文本
-        if self.file_list.count() == 0:
-            placeholder_item = QListWidgetItem("拖拽 SRT、VTT 或 ASS 文件到此处，或点击'添加文件'按钮")
-            placeholder_item.setFlags(Qt.NoItemFlags)
-            placeholder_item.setTextAlignment(Qt.AlignCenter)
-            self.file_list.addItem(placeholder_item)
+        self.file_list.setStyleSheet(FILE_LIST_STYLE)
 
         file_layout.addWidget(self.file_list)
 
+        # 文件夹扫描状态（扫描时显示）
+        self.scan_label = BodyLabel("")
+        self.scan_label.setVisible(False)
+        file_layout.addWidget(self.scan_label)
+
         # 文件操作按钮
         file_buttons_layout = QHBoxLayout()
 
@@ -267,6 +398,12 @@ class MainInterface(ScrollArea):
         add_files_btn.clicked.connect(self.add_files)
         file_buttons_layout.addWidget(add_files_btn)
 
+        add_folder_btn = PushButton("添加文件夹")
+        if QFLUENTWIDGETS_AVAILABLE and FIF.FOLDER:
+            add_folder_btn.setIcon(FIF.FOLDER)
+        add_folder_btn.clicked.connect(self.add_folder)
+        file_buttons_layout.addWidget(add_folder_btn)
+
         remove_files_btn = PushButton("删除选中")
         if QFLUENTWIDGETS_AVAILABLE and FIF.DELETE:
             remove_files_btn.setIcon(FIF.DELETE)
@@ -347,6 +484,14 @@ class MainInterface(ScrollArea):
 
         main_layout.addLayout(config_layout)
 
+        # 转换进度（转换开始后显示）
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        main_layout.addWidget(self.progress_bar)
+        self.progress_label = BodyLabel("")
+        self.progress_label.setVisible(False)
+        main_layout.addWidget(self.progress_label)
+
         # 转换按钮
         convert_layout = QHBoxLayout()
         convert_layout.addStretch()
@@ -358,29 +503,34 @@ class MainInterface(ScrollArea):
         self.convert_button.setMinimumSize(120, 40)
         convert_layout.addWidget(self.convert_button)
 
+        self.pause_button = PushButton("暂停")
+        self.pause_button.setMinimumSize(80, 40)
+        self.pause_button.setEnabled(False)
+        convert_layout.addWidget(self.pause_button)
+
+        self.cancel_button = PushButton("取消")
+        if QFLUENTWIDGETS_AVAILABLE and FIF.CANCEL:
+            self.cancel_button.setIcon(FIF.CANCEL)
+        self.cancel_button.setMinimumSize(80, 40)
+        self.cancel_button.setEnabled(False)
+        convert_layout.addWidget(self.cancel_button)
+
+        self.timings_button = PushButton("耗时统计")
+        self.timings_button.setMinimumSize(80, 40)
+        self.timings_button.setEnabled(False)
+        convert_layout.addWidget(self.timings_button)
+
         main_layout.addLayout(convert_layout)
         main_layout.addStretch()
 
         self.setWidget(main_widget)
 
     def handle_dropped_files(self, files):
-        """处理拖拽的文件"""
+        """处理拖拽的文件，返回新加入的文件数"""
+        added_count = 0
         if files:
-            # 如果有占位符，先清除
-            if self.file_list.count() == 1:
-                first_item = self.file_list.item(0)
-                if first_item and first_item.flags() == Qt.NoItemFlags:
-                    self.file_list.clear()
-
             # 添加文件，避免重复
-            existing_files = [self.file_list.item(i).text()
-                            for i in range(self.file_list.count())]
-
-            added_count = 0
-            for file in files:
-                if file not in existing_files:
-                    self.file_list.addItem(file)
-                    added_count += 1
+            added_count = self.file_model.add_paths(files)
 
             # 显示成功信息
             if added_count > 0:
@@ -390,6 +540,19 @@ class MainInterface(ScrollArea):
                     orient=Qt.Horizontal, isClosable=True,
                     position=InfoBarPosition.TOP, duration=2000, parent=self
                 )
+        return added_count
+
+    def open_paths(self, paths):
+        """加入命令行参数或其他实例转来的路径：字幕文件直接加入，文件夹在后台扫描
+
+        返回 (新加入的文件数, 开始扫描的文件夹数)。
+        """
+        files = [path for path in paths if path.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(path)]
+        folders = [path for path in paths if os.path.isdir(path)]
+        added_count = self.handle_dropped_files(files)
+        if folders:
+            self.add_folders(folders)
+        return added_count, len(folders)
 
     def add_files(self):
         """添加文件"""
@@ -408,25 +571,14 @@ class MainInterface(ScrollArea):
             if not files:  # 用户取消了选择
                 return
 
-            # 如果有占位符，先清除
-            if self.file_list.count() == 1:
-                first_item = self.file_list.item(0)
-                if first_item and first_item.flags() == Qt.NoItemFlags:
-                    self.file_list.clear()
-
-            # 添加选择的文件
-            for file in files:
-                # 检查文件是否已存在
-                existing_files = [self.file_list.item(i).text()
-                                for i in range(self.file_list.count())]
-                if file not in existing_files:
-                    self.file_list.addItem(file)
+            # 添加选择的文件，跳过已存在的
+            added_count = self.file_model.add_paths(files)
 
             # 显示成功信息
-            if files:
+            if added_count > 0:
                 InfoBar.success(
                     title="文件添加成功",
-                    content=f"已添加 {len(files)} 个文件",
+                    content=f"已添加 {added_count} 个文件",
                     orient=Qt.Horizontal, isClosable=True,
                     position=InfoBarPosition.TOP, duration=2000, parent=self
                 )
@@ -440,19 +592,63 @@ class MainInterface(ScrollArea):
                 position=InfoBarPosition.TOP, duration=3000, parent=self
             )
 
+    def add_folder(self):
+        """添加文件夹（递归查找其中的字幕文件）"""
+        directory = QFileDialog.getExistingDirectory(self, '选择包含字幕文件的文件夹', os.path.expanduser("~"))
+        if directory:
+            self.add_folders([directory])
+
+    def add_folders(self, folders):
+        """在后台扫描文件夹，找到的字幕文件分批加入列表"""
+        self.scanners.append(DirectoryScanner(folders))
+        self.scan_label.setText("正在扫描文件夹...")
+        self.scan_label.setVisible(True)
+        if not self.scan_timer.isActive():
+            self.scan_added = 0
+            self.scan_timer.start()
+
+    def collect_scanned_files(self):
+        """定时取出扫描结果加入列表；全部扫描结束后显示添加的数量"""
+        for scanner in self.scanners:
+            for root, paths in scanner.take():
+                self.scan_added += self.file_model.add_paths(paths, root)
+        self.scanners = [scanner for scanner in self.scanners if not scanner.finished]
+        if self.scanners:
+            found = sum(scanner.found for scanner in self.scanners)
+            self.scan_label.setText(f"正在扫描文件夹... 已找到 {found} 个字幕文件")
+            return
+
+        self.scan_timer.stop()
+        self.scan_label.setVisible(False)
+        if self.scan_added > 0:
+            InfoBar.success(
+                title="文件添加成功",
+                content=f"已从文件夹添加 {self.scan_added} 个文件",
+                orient=Qt.Horizontal, isClosable=True,
+                position=InfoBarPosition.TOP, duration=2000, parent=self
+            )
+        else:
+            InfoBar.warning(
+                title="没有添加文件",
+                content="文件夹中没有找到新的 SRT、VTT 或 ASS 文件",
+                orient=Qt.Horizontal, isClosable=True,
+                position=InfoBarPosition.TOP, duration=2000, parent=self
+            )
+
     def remove_selected_files(self):
         """删除选中文件"""
-        for item in self.file_list.selectedItems():
-            self.file_list.takeItem(self.file_list.row(item))
+        self.file_model.remove_rows(index.row() for index in self.file_list.selectionModel().selectedRows())
 
     def clear_all_files(self):
         """清除所有文件"""
-        self.file_list.clear()
-        # 重新添加占位符
-        placeholder_item = QListWidgetItem("拖拽 SRT、VTT 或 ASS 文件到此处，或点击'添加文件'按钮")
-        placeholder_item.setFlags(Qt.NoItemFlags)
-        placeholder_item.setTextAlignment(Qt.AlignCenter)
-        self.file_list.addItem(placeholder_item)
+        # 停止正在进行的文件夹扫描
+        for scanner in self.scanners:
+            scanner.cancel()
+        self.scanners = []
+        self.scan_timer.stop()
+        self.scan_label.setVisible(False)
+        # 列表为空时视图显示提示文字
+        self.file_model.clear()
 
     def on_delete_original_changed(self, state):
         """删除原文件选项改变"""
@@ -462,14 +658,22 @@ class MainInterface(ScrollArea):
         """繁体中国化选项改变"""
         self.convert_to_china = state == Qt.Checked
 
+    def show_progress(self, snapshot):
+        """按 BatchProgress.snapshot() 的结果刷新进度条和速度"""
+        self.progress_bar.setMaximum(max(1, snapshot['total']))
+        self.progress_bar.setValue(snapshot['done'])
+        self.progress_bar.setFormat(f"{snapshot['done']}/{snapshot['total']}  %p%")
+        eta = format_duration(snapshot['eta']) if snapshot['eta'] is not None else '--:--'
+        text = (f"成功 {snapshot['ok']}  失败 {snapshot['failed']}  |  "
+                f"{snapshot['files_per_sec']:.1f} 文件/秒  {snapshot['lines_per_sec']:.0f} 行/秒  |  "
+                f"用时 {format_duration(snapshot['elapsed'])}  剩余 {eta}")
+        self.progress_label.setText(text)
+        self.progress_bar.setVisible(True)
+        self.progress_label.setVisible(True)
+
     def start_convert(self):
         """开始转换"""
-        # 获取有效的文件列表（排除占位符）
-        files = []
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            if item and item.flags() != Qt.NoItemFlags:  # 排除占位符
-                files.append(item.text())
+        files = self.file_model.paths()
 
         if len(files) == 0:
             InfoBar.warning(
@@ -483,7 +687,7 @@ class MainInterface(ScrollArea):
 
         self.convert_requested.emit(
             files, insert_options, self.subtitle_color, self.outline_color,
-            self.delete_original_after_convert, self.convert_to_china
+            self.delete_original_after_convert, self.convert_to_china, self.file_model.source_roots()
         )
 
     def add_subtitle_config(self):
@@ -600,6 +804,11 @@ class SettingsInterface(ScrollArea):
 
         output_layout.addLayout(output_dir_layout)
 
+        # 按源目录结构输出
+        self.mirror_tree_checkbox = QCheckBox('按源文件夹结构输出（从文件夹添加的文件保留子目录）')
+        self.mirror_tree_checkbox.stateChanged.connect(self.on_mirror_tree_changed)
+        output_layout.addWidget(self.mirror_tree_checkbox)
+
         # 输出目录说明
         output_info = BodyLabel("• 未设置时：文件保存在原文件相同目录\n• 已设置时：所有文件统一保存到指定目录")
         output_info.setStyleSheet("color: #888888; font-size: 12px;")
@@ -691,6 +900,66 @@ class SettingsInterface(ScrollArea):
 
         main_layout.addWidget(font_card)
 
+        # 性能设置卡片
+        performance_card = CardWidget()
+        performance_layout = VBoxLayout(performance_card)
+        performance_layout.setContentsMargins(20, 20, 20, 20)
+
+        performance_title = SubtitleLabel("性能设置")
+        performance_layout.addWidget(performance_title)
+
+        self.process_pool_checkbox = QCheckBox('使用多进程转换')
+        self.process_pool_checkbox.stateChanged.connect(self.on_process_pool_changed)
+        performance_layout.addWidget(self.process_pool_checkbox)
+
+        self.online_china_checkbox = QCheckBox('繁体中国化使用在线转换（繁化姬）')
+        self.online_china_checkbox.stateChanged.connect(self.on_online_china_changed)
+        performance_layout.addWidget(self.online_china_checkbox)
+
+        self.incremental_checkbox = QCheckBox('增量转换（跳过输入和设置都没有变化的文件）')
+        self.incremental_checkbox.stateChanged.connect(self.on_incremental_changed)
+        performance_layout.addWidget(self.incremental_checkbox)
+
+        self.trace_checkbox = QCheckBox('记录转换时间线（Chrome trace 格式，保存到输出目录）')
+        self.trace_checkbox.stateChanged.connect(self.on_trace_changed)
+        performance_layout.addWidget(self.trace_checkbox)
+
+        # 在线转换代理
+        proxy_layout = QHBoxLayout()
+        proxy_label = BodyLabel("在线转换代理:")
+        proxy_layout.addWidget(proxy_label)
+
+        self.proxy_edit = QLineEdit()
+        self.proxy_edit.setPlaceholderText("留空为直连，例如 http://127.0.0.1:7890")
+        self.proxy_edit.editingFinished.connect(self.on_proxy_changed)
+        proxy_layout.addWidget(self.proxy_edit)
+
+        performance_layout.addLayout(proxy_layout)
+
+        # 在线转换缓存
+        cache_layout = QHBoxLayout()
+        self.cache_stats_label = BodyLabel("在线转换缓存: 暂无")
+        self.cache_stats_label.setStyleSheet("color: #CCCCCC; font-weight: normal;")
+        cache_layout.addWidget(self.cache_stats_label)
+        cache_layout.addStretch()
+
+        self.clear_cache_btn = PushButton("清空缓存")
+        self.clear_cache_btn.clicked.connect(self.clear_translation_cache)
+        cache_layout.addWidget(self.clear_cache_btn)
+
+        performance_layout.addLayout(cache_layout)
+
+        performance_info = BodyLabel(
+            "• 多进程转换可以使用全部CPU核心，适合大批量文件\n• 文件较少时使用默认的线程池即可\n"
+            "• 繁体中国化默认使用内置离线词典，无需网络；在线转换需要通过代理访问繁化姬\n"
+            "• 在线转换结果按行缓存，重复转换相同的字幕不会再次请求\n"
+            "• 增量转换的记录保存在输出目录的 .toass-manifest.json 中"
+        )
+        performance_info.setStyleSheet("color: #AAAAAA; font-size: 12px;")
+        performance_layout.addWidget(performance_info)
+
+        main_layout.addWidget(performance_card)
+
         # 关于卡片
         about_card = CardWidget()
         about_layout = VBoxLayout(about_card)
@@ -771,6 +1040,9 @@ class SettingsInterface(ScrollArea):
             self.output_dir_display.setText("未设置（使用原文件目录）")
             self.output_dir_display.setStyleSheet("color: #CCCCCC; font-style: italic; font-weight: normal;")
             self.clear_output_dir_btn.setEnabled(False)
+        # 按源目录结构输出只在设置了输出目录时有效
+        self.mirror_tree_checkbox.setChecked(self.parent.mirror_tree)
+        self.mirror_tree_checkbox.setEnabled(bool(output_dir))
 
     def choose_color(self, color_type):
         """选择颜色"""
@@ -843,6 +1115,80 @@ class SettingsInterface(ScrollArea):
             position=InfoBarPosition.TOP, duration=3000, parent=self
         )
 
+    def on_process_pool_changed(self, state):
+        """多进程转换选项改变"""
+        use_process_pool = state == Qt.Checked
+        if use_process_pool != self.parent.use_process_pool:
+            self.parent.use_process_pool = use_process_pool
+            self.parent.save_settings()
+
+    def on_online_china_changed(self, state):
+        """繁体中国化引擎改变"""
+        china_engine = 'online' if state == Qt.Checked else 'local'
+        if china_engine != self.parent.china_engine:
+            self.parent.china_engine = china_engine
+            self.parent.save_settings()
+
+    def on_mirror_tree_changed(self, state):
+        """按源目录结构输出选项改变"""
+        mirror_tree = state == Qt.Checked
+        if mirror_tree != self.parent.mirror_tree:
+            self.parent.mirror_tree = mirror_tree
+            self.parent.save_settings()
+
+    def on_incremental_changed(self, state):
+        """增量转换选项改变"""
+        incremental = state == Qt.Checked
+        if incremental != self.parent.incremental:
+            self.parent.incremental = incremental
+            self.parent.save_settings()
+
+    def on_trace_changed(self, state):
+        """记录转换时间线选项改变"""
+        trace_batches = state == Qt.Checked
+        if trace_batches != self.parent.trace_batches:
+            self.parent.trace_batches = trace_batches
+            self.parent.save_settings()
+
+    def on_proxy_changed(self):
+        """在线转换代理改变"""
+        proxy = self.proxy_edit.text().strip()
+        if proxy != online_settings(self.parent.online_options)['proxy']:
+            self.parent.online_options['proxy'] = proxy
+            self.parent.save_settings()
+
+    def clear_translation_cache(self):
+        """清空在线转换缓存"""
+        try:
+            get_translation_cache().clear()
+        except Exception as e:
+            print(f"清空缓存失败: {e}")
+        self.update_cache_display()
+
+    def update_cache_display(self):
+        """更新在线转换缓存统计显示"""
+        # 没有使用过在线转换时不创建缓存文件
+        if not os.path.exists(default_cache_path()):
+            self.cache_stats_label.setText("在线转换缓存: 暂无")
+            return
+        try:
+            stats = get_translation_cache().stats()
+            self.cache_stats_label.setText(
+                f"在线转换缓存: {stats['entries']} 行，命中 {stats['hits']} / 未命中 {stats['misses']}"
+                f"（命中率 {stats['hit_rate']:.0%}）"
+            )
+        except Exception as e:
+            print(f"读取缓存统计失败: {e}")
+
+    def update_performance_display(self):
+        """更新性能设置显示"""
+        self.process_pool_checkbox.setChecked(self.parent.use_process_pool)
+        self.online_china_checkbox.setChecked(self.parent.china_engine == 'online')
+        self.incremental_checkbox.setChecked(self.parent.incremental)
+        self.trace_checkbox.setChecked(self.parent.trace_batches)
+        self.proxy_edit.setText(online_settings(self.parent.online_options)['proxy'] or '')
+        self.update_cache_display()
+
     def update_font_display(self):
         """更新字体显示"""
         font_text = f"{self.parent.font_family}, {self.parent.font_size}pt"
@@ -852,6 +1198,27 @@ class SettingsInterface(ScrollArea):
         preview_font = QFont(self.parent.font_family, 16)  # 预览用较小字号
         self.font_preview.setFont(preview_font)
 
+class LazyPage(QWidget):
+    """按需创建的页面
+
+    导航栏在启动时就需要页面对象，这里先放一个空白占位，第一次切换到该页面时才调用 factory 创建真正的界面。
+    """
+
+    def __init__(self, factory, object_name, parent=None):
+        super().__init__(parent)
+        self.setObjectName(object_name)
+        self.factory = factory
+        self.content = None
+        self.content_layout = QVBoxLayout(self)
+        self.content_layout.setContentsMargins(0, 0, 0, 0)
+
+    def ensure_content(self):
+        """创建页面内容（只创建一次）并返回"""
+        if self.content is None:
+            self.content = self.factory()
+            self.content_layout.addWidget(self.content)
+        return self.content
+
 class SubtitleConfigDialog(QDialog):
     def __init__(self, config=None, parent=None):
         super().__init__(parent)
@@ -904,169 +1271,176 @@ class SubtitleConfigDialog(QDialog):
             'ass_statement': self.fields['ass_statement'].toPlainText()
         }
 
-class WorkerSignals(QObject):
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
+class BatchTimingsDialog(QDialog):
+    """上一批文件的耗时统计：各步骤耗时的 p50 / p95 / p99，可导出为 JSON"""
 
-class ConvertWorker(QRunnable):
-    def __init__(self, srt_file, ass_file, insert_options, subtitle_configs,
-                 subtitle_color, outline_color, delete_original, convert_to_china,
-                 font_family, font_size):
-        super().__init__()
-        self.srt_file, self.ass_file = srt_file, ass_file
-        self.insert_options, self.subtitle_configs = insert_options, subtitle_configs
-        self.subtitle_color = f'&{subtitle_color}'
-        self.outline_color = f'&{outline_color}'
-        self.delete_original = delete_original
-        self.convert_to_china = convert_to_china
-        self.font_family = font_family
-        self.font_size = font_size
-        self.signals = WorkerSignals()
-    
-    def convert_to_china_text(self, text):
-        """繁体中文转换"""
-        url = 'https://api.zhconvert.org/convert'
-        headers = {
-            'accept': 'application/json, text/plain, */*',
-            'content-type': 'application/json',
-            'origin': 'http://zhconvert.org',
-            'referer': 'http://zhconvert.org/',
-            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36'
-        }
-        
-        data = {
-            'text': text,
-            'converter': 'China',
-            'modules': '{"ChineseVariant":"1"}',
-            'jpTextConversionStrategy': 'none',
-            'jpStyleConversionStrategy': False,
-            'diffEnable': False,
-            'outputFormat': 'json'
-        }
-        
-        proxies = {
-            'http': 'http://127.0.0.1:7890',
-            'https': 'http://127.0.0.1:7890'
-        }
-        
+    def __init__(self, timings, extra=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('耗时统计')
+        self.resize(720, 420)
+        self.timings = timings
+        self.extra = extra
+
+        layout = QVBoxLayout(self)
+        text = QPlainTextEdit(format_summary(timings.summary()))
+        text.setReadOnly(True)
+        text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        text.setFont(QFont('monospace'))
+        layout.addWidget(text)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close, Qt.Horizontal, self)
+        export_button = buttons.addButton('导出 JSON', QDialogButtonBox.ActionRole)
+        export_button.clicked.connect(self.export_json)
+        buttons.rejected.connect(self.reject)
+        buttons.button(QDialogButtonBox.Close).setText('关闭')
+        layout.addWidget(buttons)
+
+    def export_json(self):
+        """把汇总和逐个文件的记录导出为 JSON 文件"""
+        default_name = os.path.join(os.path.expanduser("~"), f"toass-timings-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        path, _ = QFileDialog.getSaveFileName(self, '导出耗时统计', default_name, 'JSON 文件 (*.json)')
+        if not path:
+            return
         try:
-            response = requests.post(url, headers=headers, json=data, proxies=proxies, timeout=30)
-            if response.status_code == 200:
-                result = response.json()
-                if result.get('code') == 0:
-                    return result.get('data', {}).get('text', text)
-                else:
-                    raise Exception(f"API Error: {result.get('msg', 'Unknown error')}")
-            else:
-                raise Exception(f"HTTP Error: {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Request Error: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Conversion Error: {str(e)}")
-    
-    def run(self):
+            self.timings.export(path, self.extra)
+        except OSError as e:
+            QMessageBox.warning(self, '导出失败', f'无法写入 {path}:\n{e}')
+
+def report_result(progress, tracker, result):
+    """记录一条结果（在工作线程中调用）；增量转换时记录转换成功的文件"""
+    if result['ok'] and tracker:
+        tracker.record(result['output'])
+    progress.add_result(result)
+
+def remote_result(progress):
+    """脚本任务的结果（回复给提交任务的脚本）"""
+    snapshot = progress.snapshot()
+    return {
+        'total': snapshot['total'],
+        'converted': snapshot['ok'],
+        'failed': snapshot['failed'],
+        # 取消时尚未报告的任务同样算作取消
+        'cancelled': snapshot['total'] - snapshot['ok'] - snapshot['failed'],
+        'elapsed': round(snapshot['elapsed'], 3),
+        'errors': progress.error_summary() if snapshot['failed'] else '',
+        'timings': progress.timings.summary(),
+    }
+
+class InstanceServer(QLocalServer):
+    """单实例服务：接收再次启动的程序和脚本通过本地套接字发来的请求（协议见 instance.py）
+
+    每收到完整的一行 JSON 发出一次 request_received(请求, 套接字)，处理后用 reply() 回复。
+    """
+    request_received = pyqtSignal(dict, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 只允许当前用户连接
+        self.setSocketOptions(QLocalServer.UserAccessOption)
+        self.newConnection.connect(self.accept_connections)
+
+    def start(self):
+        """开始监听，返回是否成功
+
+        名称已被占用时先确认是否真有实例在运行：没有时为上次异常退出留下的套接字文件，删除后重新监听。
+        存放套接字的目录不安全时不监听（见 instance.runtime_dir）。
+        """
         try:
-            # 加载字幕文件
-            if self.srt_file.endswith('.srt'):
-                subs = pysubs2.load(self.srt_file, encoding='utf-8')
-            elif self.srt_file.endswith('.vtt'):
-                subs = pysubs2.load(self.srt_file, encoding='utf-8', format='vtt')
-            elif self.srt_file.endswith('.ass'):
-                subs = pysubs2.load(self.srt_file, encoding='utf-8')
-            else:
-                raise ValueError('Unsupported file format')
-            
-            # 设置样式信息
-            if not self.srt_file.endswith('.ass'):
-                # 对于非ASS文件，设置默认样式信息
-                subs.info = {
-                    'Title': 'Default Aegisub file',
-                    'ScriptType': 'v4.00+',
-                    'WrapStyle': '0',
-                    'ScaledBorderAndShadow': 'yes',
-                    'YCbCr Matrix': 'TV.601',
-                    'PlayResX': '1920',
-                    'PlayResY': '1080'
-                }
+            name = instance.server_name()
+        except OSError as e:
+            logger.warning("单实例服务不可用: %s", e)
+            return False
+        if self.listen(name):
+            return True
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(int(instance.CONNECT_TIMEOUT * 1000)):
+            probe.abort()
+            return False
+        QLocalServer.removeServer(name)
+        return self.listen(name)
+
+    def accept_connections(self):
+        """接受新的连接"""
+        while self.hasPendingConnections():
+            socket = self.nextPendingConnection()
+            # 只处理当前用户的进程发来的请求（Windows 由 UserAccessOption 限制）
+            uid = instance.peer_uid(int(socket.socketDescriptor()))
+            if uid is not None and uid != os.getuid():
+                logger.warning("拒绝了其他用户（uid %d）的单实例连接", uid)
+                socket.abort()
+                socket.deleteLater()
+                continue
+            socket.readyRead.connect(lambda socket=socket: self.read_requests(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def read_requests(self, socket):
+        """读取完整的请求行"""
+        while socket.canReadLine():
+            line = bytes(socket.readLine())
+            try:
+                request = instance.decode_message(line)
+            except ValueError:
+                self.reply(socket, {'ok': False, 'error': '无法解析的请求'})
+                continue
+            self.request_received.emit(request, socket)
+
+    @staticmethod
+    def reply(socket, response):
+        """回复请求；对方已经断开时忽略"""
+        if socket is None:
+            return
+        try:
+            if socket.state() == QLocalSocket.ConnectedState:
+                socket.write(instance.encode_message(response))
+                socket.flush()
+        except RuntimeError:
+            # 断开后套接字对象已被删除
+            pass
 
-                # 设置默认字幕样式
-                subs.styles['Default'] = pysubs2.SSAStyle(
-                    fontname=self.font_family,
-                    fontsize=self.font_size,
-                    primarycolor=self.subtitle_color,
-                    outlinecolor=self.outline_color,
-                    shadow=1.0
-                )
-            else:
-                # 对于ASS文件，保留原有信息但更新分辨率
-                if 'PlayResX' not in subs.info or not subs.info['PlayResX']:
-                    subs.info['PlayResX'] = '1920'
-                if 'PlayResY' not in subs.info or not subs.info['PlayResY']:
-                    subs.info['PlayResY'] = '1080'
-
-                # 更新或创建Default样式
-                if 'Default' in subs.styles:
-                    # 保留原有样式，只更新颜色
-                    default_style = subs.styles['Default']
-                    default_style.primarycolor = self.subtitle_color
-                    default_style.outlinecolor = self.outline_color
-                else:
-                    # 创建新的Default样式
-                    subs.styles['Default'] = pysubs2.SSAStyle(
-                        fontname=self.font_family,
-                        fontsize=self.font_size,
-                        primarycolor=self.subtitle_color,
-                        outlinecolor=self.outline_color,
-                        shadow=1.0
-                    )
-            
-            # 繁体转换
-            if self.convert_to_china:
-                all_texts = []
-                for event in subs.events:
-                    all_texts.append(event.text)
-                
-                combined_text = '\n'.join(all_texts)
-                converted_text = self.convert_to_china_text(combined_text)
-                converted_texts = converted_text.split('\n')
-                
-                for event, text in zip(subs.events, converted_texts):
-                    event.text = text
-            
-            # 插入自定义字幕
-            for insert_option in self.insert_options:
-                if insert_option != '不插入字幕':
-                    config = next((c for c in self.subtitle_configs if c['name'] == insert_option), None)
-                    if config:
-                        start = pysubs2.make_time(
-                            int(config['start_time'][:2]),
-                            int(config['start_time'][3:5]),
-                            int(config['start_time'][6:8]),
-                            int(config['start_time'][9:12])
-                        )
-                        end = pysubs2.make_time(
-                            int(config['end_time'][:2]),
-                            int(config['end_time'][3:5]),
-                            int(config['end_time'][6:8]),
-                            int(config['end_time'][9:12])
-                        )
-                        subs.events.append(pysubs2.SSAEvent(
-                            start=start,
-                            end=end,
-                            text=config['ass_statement']
-                        ))
-            
-            # 保存文件
-            subs.save(self.ass_file)
-            
-            # 删除原文件
-            if self.delete_original:
-                os.remove(self.srt_file)
-            
-            self.signals.finished.emit(f"已保存到: {self.ass_file}")
-            
+class PipelineReporter:
+    """线程模式下流水线的结果回调（在流水线的工作线程中调用），每个文件结束时通知调度器"""
+    def __init__(self, progress, tracker=None):
+        self.progress = progress
+        self.tracker = tracker
+        # 调度器在流水线创建之后才建立，由调用方设置
+        self.scheduler = None
+
+    def __call__(self, result):
+        report_result(self.progress, self.tracker, result)
+        self.scheduler.task_done()
+
+class ProcessPoolWorker(QRunnable):
+    """把一组文件交给常驻进程池转换，并逐个汇总结果"""
+    def __init__(self, engine, jobs, plan, progress, scheduler, tracker=None, stage_stats=None, token=None,
+                 chunksize=None):
+        super().__init__()
+        self.engine = engine
+        self.jobs = jobs
+        self.plan = plan
+        self.chunksize = chunksize
+        self.progress = progress
+        # 整段结束时通知调度器
+        self.scheduler = scheduler
+        self.tracker = tracker
+        # 累加工作进程中流水线各阶段的统计
+        self.stage_stats = stage_stats
+        self.token = token
+
+    def run(self):
+        reported = set()
+        try:
+            with tracing.span('segment', 'batch', {'files': len(self.jobs)}):
+                for result in self.engine.run(self.jobs, self.plan, self.chunksize, self.stage_stats, self.token):
+                    reported.add(result['path'])
+                    report_result(self.progress, self.tracker, result)
         except Exception as e:
-            self.signals.error.emit(str(e))
+            # 进程池本身出错时，剩余文件全部计为失败
+            for src, dst in self.jobs:
+                if src not in reported:
+                    self.progress.add_result(make_result(src, dst, False, str(e), 0.0))
+        finally:
+            self.scheduler.task_done()
 
 class CheckableListWidget(QListWidget):
     def __init__(self, parent=None):
@@ -1093,7 +1467,6 @@ class SrtToAssConverter(MSFluentWindow):
         super().__init__()
         self.threadpool = QThreadPool()
         self.load_subtitle_configs()
-        self.conversion_count = self.total_conversions = 0
         self.delete_original_after_convert = False
         self.convert_to_china = False
 
@@ -1101,14 +1474,58 @@ class SrtToAssConverter(MSFluentWindow):
         self.font_family = "方正粗圆_GBK"
         self.font_size = 70
 
+        # 转换后端：默认线程池，可选常驻进程池
+        self.use_process_pool = False
+        self.process_engine = None
+        # 进程池模式投放各段任务的线程池（第一次使用进程池时创建）
+        self.segment_pool = None
+
+        # 繁体中国化引擎：默认使用内置离线词典
+        self.china_engine = DEFAULT_CHINA_ENGINE
+        # 在线转换的高级参数（见 converter.ONLINE_DEFAULTS），只能在 settings.json 中修改
+        self.online_options = {}
+
+        # 按源目录结构输出：从文件夹添加的文件在输出目录中保持原来的子目录
+        self.mirror_tree = False
+
+        # 增量转换：跳过输入和设置都没有变化的文件
+        self.incremental = False
+        self.incremental_tracker = None
+
+        # 记录每批转换的时间线（见 tracing），以及正在记录的批次的开始时间
+        self.trace_batches = False
+        self.trace_start = None
+
+        # 当前批次的任务调度器和线程模式的流水线（转换中时有效），以及各阶段的统计
+        self.scheduler = None
+        self.pipeline = None
+        # 当前批次已取消、正在等待已投放的任务交回结果
+        self.cancelling = False
+        self.stage_stats = {}
+        # 当前批次的进度汇总，由定时器按固定频率刷新到界面；上一批的耗时统计
+        self.progress = None
+        self.last_timings = None
+        # 当前批次的取消标记
+        self.cancel_token = None
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(PROGRESS_INTERVAL_MS)
+        self.progress_timer.timeout.connect(self.refresh_progress)
+
         # 如果没有qfluentwidgets，添加fallback组件
         if not QFLUENTWIDGETS_AVAILABLE:
             self.stackedWidget = QStackedWidget()
             self.setCentralWidget(self.stackedWidget)
 
+        # 托盘图标在主窗口显示之后才创建（见 finish_startup）
+        self.tray_icon = None
+
+        # 单实例服务，以及脚本提交的转换任务：排队中的任务和正在转换的任务
+        self.instance_server = None
+        self.remote_jobs = deque()
+        self.remote_job = None
+
         self.initUI()
         self.load_settings()  # 在UI初始化后加载设置
-        self.init_tray()
 
     def addSubInterface(self, widget, icon, text):
         """为标准QMainWindow提供的fallback方法"""
@@ -1139,9 +1556,10 @@ class SrtToAssConverter(MSFluentWindow):
         self.main_interface = MainInterface(self)
         self.addSubInterface(self.main_interface, FIF.HOME, '主页')
 
-        # 创建设置界面
-        self.settings_interface = SettingsInterface(self)
-        self.addSubInterface(self.settings_interface, FIF.SETTING, '设置')
+        # 设置界面在第一次切换过去时才创建，启动时只创建主页
+        self.settings_interface = None
+        self.settings_page = LazyPage(self.create_settings_interface, 'settingsPage')
+        self.addSubInterface(self.settings_page, FIF.SETTING, '设置')
 
         # 设置默认界面
         self.stackedWidget.setCurrentWidget(self.main_interface)
@@ -1155,31 +1573,46 @@ class SrtToAssConverter(MSFluentWindow):
 
         # 连接转换信号
         self.main_interface.convert_requested.connect(self.start_conversion)
-        self.settings_interface.config_changed.connect(self.on_config_changed)
+        self.main_interface.pause_button.clicked.connect(self.toggle_pause)
+        self.main_interface.cancel_button.clicked.connect(self.cancel_conversion)
+        self.main_interface.timings_button.clicked.connect(self.show_batch_timings)
 
         # 连接页面切换信号，用于更新设置界面显示
         self.stackedWidget.currentChanged.connect(self.on_page_changed)
 
         # 初始化配置列表
         self.main_interface.refresh_config_list()
+
+    def create_settings_interface(self):
+        """创建设置界面（第一次切换到设置页面时调用）"""
+        self.settings_interface = SettingsInterface(self)
+        self.settings_interface.config_changed.connect(self.on_config_changed)
         self.settings_interface.update_color_buttons()
+        return self.settings_interface
 
     def on_page_changed(self, index):
         """页面切换时的处理"""
         current_widget = self.stackedWidget.widget(index)
-        if current_widget == self.settings_interface:
+        if current_widget == self.settings_page:
+            self.settings_page.ensure_content()
             # 切换到设置页面时，更新所有显示
             self.settings_interface.update_output_dir_display()
             self.settings_interface.update_font_display()
+            self.settings_interface.update_performance_display()
+
+    def start_conversion(self, files, insert_options, subtitle_color, outline_color, delete_original, convert_to_china,
+                         source_roots=None, output_directory=None):
+        """开始转换处理，返回开始转换的文件数（全部跳过时为 0），没有开始时返回 None
 
-    def start_conversion(self, files, insert_options, subtitle_color, outline_color, delete_original, convert_to_china):
-        """开始转换处理"""
+        source_roots 与 files 一一对应（从文件夹添加的文件为其源根目录），开启按源目录结构输出时使用。
+        output_directory 不为空时代替设置中的输出目录（脚本提交的任务使用，不询问也不保存）。
+        """
         try:
-            print(f"开始转换，文件数量: {len(files)}")
-            print(f"输出目录: {self.main_interface.output_directory}")
+            output_directory = output_directory or self.main_interface.output_directory
+            logger.info("开始转换，文件数量: %d，输出目录: %s", len(files), output_directory)
 
             # 检查输出目录设置
-            if not self.main_interface.output_directory:
+            if not output_directory:
                 # 没有设置输出目录，询问用户
                 output_dir = QFileDialog.getExistingDirectory(
                     self,
@@ -1193,14 +1626,15 @@ class SrtToAssConverter(MSFluentWindow):
                         orient=Qt.Horizontal, isClosable=True,
                         position=InfoBarPosition.TOP, duration=3000, parent=self.main_interface
                     )
-                    return
+                    return None
 
                 # 保存用户选择的目录
+                output_directory = output_dir
                 self.main_interface.output_directory = output_dir
                 self.save_settings()
 
                 # 更新设置界面显示
-                if hasattr(self, 'settings_interface'):
+                if self.settings_interface is not None:
                     self.settings_interface.update_output_dir_display()
 
                 InfoBar.success(
@@ -1209,41 +1643,103 @@ class SrtToAssConverter(MSFluentWindow):
                     position=InfoBarPosition.TOP, duration=3000, parent=self.main_interface
                 )
 
-            self.total_conversions = len(files)
-            self.conversion_count = 0
-
-            # 记录输出信息
-            self.main_interface.output_directory_used = self.main_interface.output_directory
-            self.main_interface.output_files = []
-
-            for file_path in files:
-                # 使用统一的输出目录
-                filename = os.path.splitext(os.path.basename(file_path))[0] + '.ass'
-                ass_file = os.path.join(self.main_interface.output_directory, filename)
-
-                # 记录输出文件
-                self.main_interface.output_files.append(ass_file)
-
-                worker = ConvertWorker(
-                    file_path, ass_file, insert_options, self.subtitle_configs,
-                    subtitle_color, outline_color, delete_original, convert_to_china,
-                    self.font_family, self.font_size
+            batch_start = time.perf_counter()
+            # 使用统一的输出目录；按源目录结构输出时在其中重建从文件夹添加的文件的子目录
+            from_folders = any(source_roots or ())
+            if not (self.mirror_tree and source_roots):
+                source_roots = [None] * len(files)
+            jobs = [(file_path, output_path_for(file_path, output_directory, root))
+                    for file_path, root in zip(files, source_roots)]
+            # 不同文件夹中的同名文件会输出到同一个文件，互相覆盖，不开始转换
+            collisions = find_output_collisions(jobs)
+            if collisions:
+                content = f"{len(collisions)} 个输出文件对应多个输入文件，转换后会互相覆盖:\n" \
+                          f"{format_output_collisions(collisions)}"
+                if not self.mirror_tree and from_folders:
+                    content += "\n可在设置中勾选“按源文件夹结构输出”保留子目录"
+                logger.warning("%s", content)
+                InfoBar.error(
+                    title="输出文件重名", content=content,
+                    orient=Qt.Horizontal, isClosable=True,
+                    position=InfoBarPosition.TOP, duration=10000, parent=self.main_interface
                 )
+                return None
+            for ass_dir in {os.path.dirname(ass_file) for _, ass_file in jobs}:
+                os.makedirs(ass_dir, exist_ok=True)
+
+            options = {
+                'insert_options': insert_options,
+                'subtitle_configs': self.subtitle_configs,
+                'subtitle_color': subtitle_color,
+                'outline_color': outline_color,
+                'delete_original': delete_original,
+                'convert_to_china': convert_to_china,
+                'font_family': self.font_family,
+                'font_size': self.font_size,
+                'china_engine': self.china_engine,
+                'online_options': self.online_options
+            }
 
-                worker.signals.finished.connect(self.on_conversion_finished)
-                worker.signals.error.connect(self.on_conversion_error)
-                self.threadpool.start(worker)
+            # 整批文件共用的转换计划：样式、文件头和插入字幕只生成一次，配置有误时在开始前报错
+            plan = compile_plan(**options)
+
+            skipped = []
+            self.incremental_tracker = None
+            if self.incremental:
+                self.incremental_tracker = IncrementalTracker(options)
+                jobs, skipped = self.incremental_tracker.filter(jobs)
+                if not jobs:
+                    self.incremental_tracker = None
+                    InfoBar.info(
+                        title="无需转换", content=f"{len(skipped)} 个文件的输入和设置都没有变化，已跳过",
+                        orient=Qt.Horizontal, isClosable=True,
+                        position=InfoBarPosition.TOP, duration=3000, parent=self.main_interface
+                    )
+                    return 0
+
+            # 记录输出信息
+            self.main_interface.output_directory_used = output_directory
+            self.main_interface.output_files = [ass_file for _, ass_file in jobs]
+
+            # 工作线程只把结果汇总到 progress，界面由定时器刷新，任务由调度器按需创建
+            self.progress = BatchProgress(len(jobs))
+            self.cancel_token = CancelToken()
+            self.stage_stats = {}
+            if self.use_process_pool:
+                self.scheduler = self.make_process_pool_scheduler(jobs, plan)
+            else:
+                # 读取、解析、在线转换、写入分阶段执行，各阶段有自己的线程
+                reporter = PipelineReporter(self.progress, self.incremental_tracker)
+                self.pipeline = ConversionPipeline(plan, reporter, token=self.cancel_token)
+                # 窗口不超过第一个队列的长度，投放时不会阻塞
+                self.scheduler = reporter.scheduler = BatchScheduler(self.pipeline.submit, jobs,
+                                                                     self.pipeline.queue_size)
 
             # 禁用转换按钮
             self.main_interface.convert_button.setEnabled(False)
             self.main_interface.convert_button.setText("转换中...")
+            self.main_interface.pause_button.setEnabled(True)
+            self.main_interface.pause_button.setText("暂停")
+            self.main_interface.cancel_button.setEnabled(True)
+            self.main_interface.show_progress(self.progress.snapshot())
+            if self.trace_batches:
+                # 从准备任务列表开始记录，批次结束时由 finish_batch 导出
+                tracing.start()
+                tracing.add_span('prepare', 'batch', batch_start, args={'files': len(jobs), 'skipped': len(skipped)})
+                self.trace_start = batch_start
+            self.scheduler.start()
+            self.progress_timer.start()
 
             # 显示开始转换信息
+            content = f"正在转换 {len(jobs)} 个文件..."
+            if skipped:
+                content += f"（跳过未变化的文件 {len(skipped)} 个）"
             InfoBar.success(
-                title="开始转换", content=f"正在转换 {len(files)} 个文件...",
+                title="开始转换", content=content,
                 orient=Qt.Horizontal, isClosable=True,
                 position=InfoBarPosition.TOP, duration=2000, parent=self.main_interface
             )
+            return len(jobs)
 
         except Exception as e:
             print(f"转换启动失败: {e}")
@@ -1254,21 +1750,111 @@ class SrtToAssConverter(MSFluentWindow):
                 orient=Qt.Horizontal, isClosable=True,
                 position=InfoBarPosition.TOP, duration=5000, parent=self.main_interface
             )
+            return None
+
+    def make_process_pool_scheduler(self, jobs, plan):
+        """使用常驻进程池转换一批文件：按段交给进程池，同时最多两段，一段收尾时另一段让进程保持忙碌
+
+        每段只给每个进程一块任务，暂停后已经投放的两段很快结束，进程池随即停下。
+        """
+        # 进程池（及 multiprocessing）只在第一次使用时导入，不拖慢启动
+        from engine import SEGMENT_PER_WORKER, ProcessPoolEngine, split_chunks
+
+        if self.process_engine is None:
+            self.process_engine = ProcessPoolEngine()
+
+        engine = self.process_engine
+        progress = self.progress
+        tracker = self.incremental_tracker
+        token = self.cancel_token
+
+        def tasks():
+            for segment in split_chunks(jobs, engine.workers * SEGMENT_PER_WORKER):
+                yield ProcessPoolWorker(engine, segment, plan, progress, scheduler, tracker, self.stage_stats, token,
+                                        chunksize=SEGMENT_PER_WORKER)
+
+        if self.segment_pool is None:
+            # 同时最多两段，用专用的线程池投放，不改变窗口共用线程池的线程数
+            self.segment_pool = QThreadPool(self)
+            self.segment_pool.setMaxThreadCount(2)
+        scheduler = BatchScheduler(self.segment_pool.start, tasks(), 2)
+        return scheduler
+
+    def toggle_pause(self):
+        """暂停或继续当前批次"""
+        if self.scheduler is None:
+            return
+        if self.scheduler.paused:
+            self.scheduler.resume()
+            self.progress.resume()
+            self.main_interface.pause_button.setText("暂停")
+            self.main_interface.convert_button.setText("转换中...")
+        else:
+            self.scheduler.pause()
+            self.main_interface.pause_button.setText("继续")
+            self.main_interface.convert_button.setText("已暂停")
 
-    def on_conversion_finished(self, _):
-        """转换完成处理"""
-        self.conversion_count += 1
-
-        if self.conversion_count == self.total_conversions:
-            # 所有文件转换完成
-            self.main_interface.convert_button.setEnabled(True)
-            self.main_interface.convert_button.setText("开始转换")
+    def cancel_conversion(self):
+        """取消当前批次：丢弃未开始的文件，通知执行中的任务尽快结束
 
-            # 显示转换完成消息
-            content = f"所有文件已转换完成！保存在: {self.main_interface.output_directory_used}"
+        已投放的任务都交回结果（包括取消的结果）之后，由 refresh_progress 按正常流程收尾，
+        增量清单只在这之后保存，不会记下还在写入的文件。
+        """
+        if self.scheduler is None or self.cancelling:
+            return
+        self.cancelling = True
+        self.scheduler.cancel()
+        self.cancel_token.cancel()
+        self.main_interface.pause_button.setEnabled(False)
+        self.main_interface.cancel_button.setEnabled(False)
+        self.main_interface.convert_button.setText("正在取消...")
+        self.refresh_progress()
+
+    def wait_for_cancelled_batch(self, timeout):
+        """等待取消的批次交回所有结果并收尾，最多 timeout 秒（退出程序前调用）"""
+        deadline = time.monotonic() + timeout
+        while self.scheduler is not None and time.monotonic() < deadline:
+            QApplication.processEvents()
+            self.refresh_progress()
+            time.sleep(0.01)
+
+    def refresh_progress(self):
+        """定时刷新进度；全部文件结束后收尾"""
+        if self.progress is None:
+            self.progress_timer.stop()
+            return
+        if self.scheduler.paused and self.scheduler.in_flight == 0:
+            # 已投放的任务都结束后才停止计时，暂停期间不计入速度和剩余时间
+            self.progress.pause()
+        progress = self.progress
+        if self.cancelling and self.scheduler.in_flight == 0:
+            # 已投放的任务都交回了结果，没有投放的文件记为取消
+            progress.cancel_remaining()
+        snapshot = progress.snapshot()
+        self.main_interface.show_progress(snapshot)
+        if snapshot['finished']:
+            # 脚本提交的任务结束时由 finish_batch 回复结果，不弹出对话框
+            local_batch = self.remote_job is None
+            cancelled = self.cancelling
+            self.finish_batch()
+            if not local_batch:
+                return
+            if cancelled:
+                InfoBar.warning(
+                    title="转换已取消",
+                    content=f"已完成 {snapshot['ok']} 个，失败 {snapshot['failed']} 个，取消 {snapshot['cancelled']} 个",
+                    orient=Qt.Horizontal, isClosable=True,
+                    position=InfoBarPosition.TOP, duration=5000, parent=self.main_interface
+                )
+            else:
+                self.report_batch(snapshot, progress)
 
+    def report_batch(self, snapshot, progress):
+        """一批文件结束后的提示：全部成功时显示输出位置，有失败时汇总为一条提示和一个可展开的详情"""
+        output_dir = self.main_interface.output_directory_used
+        if not snapshot['failed']:
             InfoBar.success(
-                title="转换完成", content=content,
+                title="转换完成", content=f"所有文件已转换完成！保存在: {output_dir}",
                 orient=Qt.Horizontal, isClosable=True,
                 position=InfoBarPosition.TOP, duration=5000, parent=self.main_interface
             )
@@ -1278,6 +1864,14 @@ class SrtToAssConverter(MSFluentWindow):
 
             # 显示输出位置信息
             self.show_output_location_info()
+            return
+
+        InfoBar.warning(
+            title="转换结束", content=f"成功 {snapshot['ok']} 个，失败 {snapshot['failed']} 个",
+            orient=Qt.Horizontal, isClosable=True,
+            position=InfoBarPosition.TOP, duration=5000, parent=self.main_interface
+        )
+        self.show_error_summary(snapshot, progress.error_summary())
 
     def show_output_location_info(self):
         """显示输出位置信息"""
@@ -1336,19 +1930,172 @@ class SrtToAssConverter(MSFluentWindow):
         except Exception as e:
             print(f"无法显示文件列表: {e}")
 
-    def on_conversion_error(self, error_msg):
-        """转换错误处理"""
-        self.conversion_count += 1
+    def show_error_summary(self, snapshot, summary):
+        """失败文件汇总对话框，逐个文件的错误信息在可展开的详情中"""
+        try:
+            msg_box = QMessageBox(self.main_interface)
+            msg_box.setIcon(QMessageBox.Warning)
+            msg_box.setWindowTitle("转换结束")
+            msg_box.setText(f"{snapshot['failed']} 个文件转换失败，{snapshot['ok']} 个文件已保存到:\n"
+                            f"{self.main_interface.output_directory_used}")
+            msg_box.setInformativeText("点击“显示详细信息”查看失败原因")
+            msg_box.setDetailedText(summary)
+            msg_box.setStandardButtons(QMessageBox.Ok)
+            msg_box.exec_()
+        except Exception as e:
+            print(f"无法显示失败详情: {e}")
+
+    def finish_batch(self):
+        """一批文件全部结束：停止刷新、保存增量清单、输出各阶段利用率、耗时统计和时间线并恢复按钮；
+        接着开始下一个排队的脚本任务"""
+        progress = self.progress
+        self.progress_timer.stop()
+        self.progress = None
+        self.cancel_token = None
+        self.cancelling = False
+        self.save_incremental_manifest()
+        self.scheduler = None
+        if self.pipeline is not None:
+            self.pipeline.close(wait=False)
+            merge_stage_stats(self.stage_stats, self.pipeline.stage_stats())
+            self.pipeline = None
+        if self.stage_stats:
+            logger.info("阶段利用率: %s", format_stage_stats(self.stage_stats))
+        if self.trace_start is not None:
+            self.export_batch_trace(progress)
+        summary = progress.timings.summary() if progress is not None else None
+        if summary and summary['files']:
+            self.last_timings = progress.timings
+            self.main_interface.timings_button.setEnabled(True)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("耗时统计:\n%s", format_summary(summary))
+        self.main_interface.convert_button.setEnabled(True)
+        self.main_interface.convert_button.setText("开始转换")
+        self.main_interface.pause_button.setEnabled(False)
+        self.main_interface.pause_button.setText("暂停")
+        self.main_interface.cancel_button.setEnabled(False)
+
+        remote_job, self.remote_job = self.remote_job, None
+        if remote_job is not None and progress is not None:
+            self.finish_remote_job(remote_job, progress)
+        if self.remote_jobs:
+            QTimer.singleShot(0, self.start_next_remote_job)
+
+    def export_batch_trace(self, progress):
+        """停止记录时间线，保存到本批的输出目录"""
+        snapshot = progress.snapshot() if progress is not None else {}
+        tracing.add_span('batch', 'batch', self.trace_start,
+                         args={key: snapshot.get(key) for key in ('total', 'ok', 'failed')})
+        self.trace_start = None
+        spans, dropped = tracing.stop()
+        path = os.path.join(self.main_interface.output_directory_used,
+                            f"toass-trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        try:
+            tracing.export(path, spans, dropped, {'process_pool': self.use_process_pool,
+                                                  'stage_utilization': summarize_stage_stats(self.stage_stats)})
+            logger.info("时间线已保存: %s（可在 chrome://tracing 或 https://ui.perfetto.dev 中打开）", path)
+        except OSError as e:
+            logger.warning("保存时间线失败: %s", e)
+
+    def show_batch_timings(self):
+        """显示上一批文件的耗时统计"""
+        if self.last_timings is None:
+            return
+        extra = {'output_directory': self.main_interface.output_directory_used,
+                 'stage_utilization': summarize_stage_stats(self.stage_stats)}
+        BatchTimingsDialog(self.last_timings, extra, self).exec_()
+
+    def start_instance_server(self):
+        """开始接收再次启动的程序和脚本发来的请求（协议见 instance.py）"""
+        server = InstanceServer(self)
+        if not server.start():
+            print(f"单实例服务启动失败: {server.errorString()}")
+            return
+        server.request_received.connect(self.handle_instance_request)
+        self.instance_server = server
+
+    def handle_instance_request(self, request, socket):
+        """处理再次启动的程序或脚本发来的请求"""
+        reply = self.instance_server.reply
+        command = request.get('command')
+        if command == 'show':
+            self.show_main_window()
+            reply(socket, {'ok': True})
+        elif command == 'open':
+            self.show_main_window()
+            added, folders = self.main_interface.open_paths(request.get('files') or [])
+            reply(socket, {'ok': True, 'added': added, 'folders': folders})
+        elif command == 'convert':
+            self.queue_remote_job(request, socket)
+        elif command == 'status':
+            reply(socket, {
+                'ok': True,
+                'busy': self.scheduler is not None,
+                'queued': len(self.remote_jobs),
+                'progress': self.progress.snapshot() if self.progress is not None else None,
+            })
+        else:
+            reply(socket, {'ok': False, 'error': f'未知命令: {command}'})
+
+    def queue_remote_job(self, request, socket):
+        """脚本提交的转换任务：检查后排队，没有批次在转换时立即开始
 
-        InfoBar.error(
-            title="转换错误", content=f"转换失败: {error_msg}",
+        wait 为 true 时转换结束后才回复结果，否则立即回复排队位置。
+        """
+        reply = self.instance_server.reply
+        files = request.get('files')
+        if not isinstance(files, list) or not files:
+            reply(socket, {'ok': False, 'error': '没有要转换的文件'})
+            return
+        output_directory = request.get('output_directory') or self.main_interface.output_directory
+        if not output_directory:
+            reply(socket, {'ok': False, 'error': '没有指定输出目录，程序中也未设置'})
+            return
+
+        wait = bool(request.get('wait'))
+        self.remote_jobs.append({'files': files, 'output_directory': output_directory,
+                                 'socket': socket if wait else None})
+        if not wait:
+            reply(socket, {'ok': True, 'position': len(self.remote_jobs)})
+        self.start_next_remote_job()
+
+    def start_next_remote_job(self):
+        """没有批次在转换时开始下一个排队的脚本任务（使用界面当前的插入字幕、颜色和繁体转换设置）"""
+        while self.scheduler is None and self.remote_jobs:
+            job = self.remote_jobs.popleft()
+            main = self.main_interface
+            self.remote_job = job
+            count = self.start_conversion(job['files'], main.insert_options.getCheckedItems(), main.subtitle_color,
+                                          main.outline_color, main.delete_original_after_convert,
+                                          main.convert_to_china, output_directory=job['output_directory'])
+            if count:
+                return
+            self.remote_job = None
+            if count is None:
+                self.instance_server.reply(job['socket'], {'ok': False, 'error': '转换启动失败，详见程序窗口'})
+            else:
+                self.instance_server.reply(job['socket'], {'ok': True, 'result': remote_result(BatchProgress(0))})
+
+    def finish_remote_job(self, job, progress):
+        """脚本提交的任务结束：提示并回复结果"""
+        result = remote_result(progress)
+        InfoBar.info(
+            title="脚本任务结束",
+            content=f"成功 {result['converted']} 个，失败 {result['failed']} 个，保存在: {job['output_directory']}",
             orient=Qt.Horizontal, isClosable=True,
             position=InfoBarPosition.TOP, duration=5000, parent=self.main_interface
         )
+        self.instance_server.reply(job['socket'], {'ok': True, 'result': result})
 
-        if self.conversion_count == self.total_conversions:
-            self.main_interface.convert_button.setEnabled(True)
-            self.main_interface.convert_button.setText("开始转换")
+    def save_incremental_manifest(self):
+        """一批文件全部结束后写入增量转换清单"""
+        if self.incremental_tracker is None:
+            return
+        try:
+            self.incremental_tracker.save()
+        except Exception as e:
+            print(f"保存增量转换清单失败: {e}")
+        self.incremental_tracker = None
 
     def on_config_changed(self):
         """配置改变处理"""
@@ -1389,7 +2136,19 @@ class SrtToAssConverter(MSFluentWindow):
 
     def quit_application(self):
         """退出应用程序"""
-        self.tray_icon.hide()
+        if self.tray_icon:
+            self.tray_icon.hide()
+        # 退出前取消正在进行的转换，进程池不必等待整批完成
+        self.remote_jobs, queued_jobs = deque(), self.remote_jobs
+        self.cancel_conversion()
+        # 执行中的任务在取消后很快结束；超时未结束时不保存增量清单，下次重新转换这些文件
+        self.wait_for_cancelled_batch(5.0)
+        if self.instance_server is not None:
+            for job in queued_jobs:
+                self.instance_server.reply(job['socket'], {'ok': False, 'error': '程序已退出'})
+            self.instance_server.close()
+        if self.process_engine is not None:
+            self.process_engine.close()
         QApplication.instance().quit()
 
     def tray_icon_clicked(self, reason):
@@ -1453,6 +2212,12 @@ class SrtToAssConverter(MSFluentWindow):
                     self.main_interface.output_directory = settings.get('output_directory', '')
                     self.font_family = settings.get('font_family', '方正粗圆_GBK')
                     self.font_size = settings.get('font_size', 70)
+                    self.use_process_pool = settings.get('use_process_pool', False)
+                    self.china_engine = settings.get('china_engine', DEFAULT_CHINA_ENGINE)
+                    self.online_options = settings.get('online_options', {})
+                    self.incremental = settings.get('incremental', False)
+                    self.mirror_tree = settings.get('mirror_tree', False)
+                    self.trace_batches = settings.get('trace_batches', False)
                     print(f"加载字体设置: {self.font_family}, {self.font_size}pt")
             else:
                 # 设置默认值
@@ -1471,7 +2236,13 @@ class SrtToAssConverter(MSFluentWindow):
             settings = {
                 'output_directory': self.main_interface.output_directory,
                 'font_family': self.font_family,
-                'font_size': self.font_size
+                'font_size': self.font_size,
+                'use_process_pool': self.use_process_pool,
+                'china_engine': self.china_engine,
+                'online_options': self.online_options,
+                'incremental': self.incremental,
+                'mirror_tree': self.mirror_tree,
+                'trace_batches': self.trace_batches
             }
             with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
                 json.dump(settings, f, indent=4, ensure_ascii=False)
@@ -1501,7 +2272,61 @@ class SrtToAssConverter(MSFluentWindow):
 
 
 
+def mark_startup(stage):
+    """记录启动阶段（见 STARTUP_STAGES）的结束时间"""
+    startup_marks.append((stage, time.perf_counter()))
+
+
+def startup_report():
+    """各启动阶段的耗时（毫秒），total 为从开始导入到最后一个阶段结束"""
+    report = {}
+    for (_, previous), (stage, moment) in zip(startup_marks, startup_marks[1:]):
+        report[stage] = round((moment - previous) * 1000, 1)
+    report['total'] = round((startup_marks[-1][1] - startup_marks[0][1]) * 1000, 1)
+    return report
+
+
+def install_translator(app):
+    """加载 Qt 自带对话框的中文翻译"""
+    translator = QTranslator(app)
+    if hasattr(QLibraryInfo, 'path'):  # Qt6
+        translations_path = QLibraryInfo.path(QLibraryInfo.TranslationsPath)
+    else:  # Qt5
+        translations_path = QLibraryInfo.location(QLibraryInfo.TranslationsPath)
+
+    if translator.load('qt_zh_CN.qm', translations_path):
+        app.installTranslator(translator)
+
+
+def finish_startup(app, window):
+    """主窗口进入事件循环后完成其余初始化，并输出启动耗时报告"""
+    mark_startup('interactive')
+    interactive_at = time.time()
+    window.init_tray()
+    install_translator(app)
+    mark_startup('deferred')
+
+    report = startup_report()
+    stages = ' | '.join(f"{STARTUP_STAGES[stage]} {report[stage]:.0f} ms"
+                        for stage, _ in startup_marks[1:])
+    print(f"启动耗时: {stages} | 合计 {report['total']:.0f} ms")
+
+    if os.environ.get(STARTUP_BENCHMARK_ENV):
+        report['interactive_at'] = interactive_at
+        report['lazy_modules_loaded'] = [name for name in LAZY_MODULES if name in sys.modules]
+        print(json.dumps(report))
+        window.quit_application()
+
+
 if __name__ == '__main__':
+    # 打包后的程序启动进程池子进程时需要（未打包时什么也不做，不必导入 multiprocessing）
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+    mark_startup('import')
+    log_level = logging.getLevelName(os.environ.get(LOG_LEVEL_ENV, 'INFO').upper())
+    logging.basicConfig(level=log_level if isinstance(log_level, int) else logging.INFO, format='%(message)s')
+
     try:
         # 设置环境变量，减少警告信息
         if QFLUENTWIDGETS_AVAILABLE:
@@ -1527,6 +2352,7 @@ if __name__ == '__main__':
         app.setApplicationName("SRT转ASS字幕转换器")
         app.setApplicationVersion("1.0.0")
         app.setOrganizationName("SubtitleConverter")
+        mark_startup('app')
 
         # 设置默认字体，避免字体警告
         font = QFont()
@@ -1539,72 +2365,21 @@ if __name__ == '__main__':
         font.setPointSize(10)
         app.setFont(font)
 
-        # 加载中文翻译
-        translator = QTranslator()
-        if hasattr(QLibraryInfo, 'path'):  # Qt6
-            translations_path = QLibraryInfo.path(QLibraryInfo.TranslationsPath)
-        else:  # Qt5
-            translations_path = QLibraryInfo.location(QLibraryInfo.TranslationsPath)
-
-        if translator.load('qt_zh_CN.qm', translations_path):
-            app.installTranslator(translator)
-
         # 设置深色主题
         setTheme(Theme.DARK)
 
-        # 创建启动画面（可选）
-        splash_widget = None
-        try:
-            # 创建简单的启动提示
-            splash_widget = QWidget()
-            splash_widget.setWindowFlags(Qt.SplashScreen | Qt.WindowStaysOnTopHint)
-            splash_widget.setFixedSize(400, 200)
-            splash_widget.setStyleSheet("""
-                QWidget {
-                    background-color: #2d2d30;
-                    border-radius: 10px;
-                    color: white;
-                }
-            """)
-
-            splash_layout = QVBoxLayout(splash_widget)
-            splash_layout.setAlignment(Qt.AlignCenter)
-
-            title_label = QLabel("SRT 转 ASS 字幕转换器")
-            title_label.setAlignment(Qt.AlignCenter)
-            title_label.setStyleSheet("font-size: 18px; font-weight: bold; margin: 20px;")
-
-            loading_label = QLabel("正在启动...")
-            loading_label.setAlignment(Qt.AlignCenter)
-            loading_label.setStyleSheet("font-size: 12px; color: #cccccc;")
-
-            splash_layout.addWidget(title_label)
-            splash_layout.addWidget(loading_label)
-
-            # 居中显示
-            screen = app.primaryScreen().geometry()
-            splash_widget.move(
-                (screen.width() - splash_widget.width()) // 2,
-                (screen.height() - splash_widget.height()) // 2
-            )
-
-            splash_widget.show()
-            app.processEvents()
-
-            # 短暂延迟
-            import time
-            time.sleep(0.5)
-
-        except Exception:
-            splash_widget = None  # 如果启动画面失败，设置为None
-
         # 创建并显示主窗口
         window = SrtToAssConverter()
+        if not os.environ.get(STARTUP_BENCHMARK_ENV):
+            window.start_instance_server()
+            # 从文件管理器“打开方式”启动时带着的文件和文件夹
+            window.main_interface.open_paths(instance.file_arguments(sys.argv[1:]))
+        mark_startup('window')
         window.show()
+        mark_startup('shown')
 
-        # 隐藏启动画面
-        if splash_widget:
-            splash_widget.hide()
+        # 托盘图标和翻译等不影响首屏的初始化放到事件循环开始之后
+        QTimer.singleShot(0, lambda: finish_startup(app, window))
 
         # 启动应用程序
         sys.exit(app.exec_())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换时间线（Chrome trace-event 格式）
+开启后记录一批转换中每个任务、每个步骤、每个在线转换请求的开始和结束时间，以及所在的进程和线程，
+导出的 JSON 可以在 chrome://tracing 或 https://ui.perfetto.dev 中打开，查看线程/进程池随时间的忙闲、
+拖住收尾的大文件、排在代理后面依次执行的 HTTP 请求等汇总统计看不出的调度问题。
+
+每个进程各自记录（未开启时各处的记录函数直接返回）；进程池的工作进程在主进程开启时同样记录，
+随每块任务的结果把记录交回主进程合并。时间使用 time.perf_counter，在 Windows / Linux / macOS 上
+是系统范围的单调时钟，各进程的时间可以直接对齐。
+
+用法:
+  tracing.start()
+  ... 转换 ...
+  tracing.export('trace.json', *tracing.stop())
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# 一次最多记录的跨度数（10 万个文件约 70 万个），超出的只计数，避免超大批次占满内存
+MAX_SPANS = 1000000
+
+_spans = None
+_dropped = 0
+_lock = threading.Lock()
+
+
+def start():
+    """开始记录（清空之前的记录）"""
+    global _spans, _dropped
+    with _lock:
+        _spans = []
+        _dropped = 0
+
+
+def active():
+    """当前进程是否正在记录"""
+    return _spans is not None
+
+
+def stop():
+    """停止记录，返回 (跨度列表, 超出上限未记录的个数)"""
+    global _spans, _dropped
+    with _lock:
+        spans, dropped = _spans or [], _dropped
+        _spans = None
+        _dropped = 0
+    return spans, dropped
+
+
+def _append(span):
+    global _dropped
+    with _lock:
+        if _spans is None:
+            return
+        if len(_spans) < MAX_SPANS:
+            _spans.append(span)
+        else:
+            _dropped += 1
+
+
+def add_span(name, category, start, end=None, args=None):
+    """记录当前线程中从 start 到 end（time.perf_counter() 的值，省略为现在）的一个跨度"""
+    if _spans is None:
+        return
+    thread = threading.current_thread()
+    _append(('span', name, category, start, time.perf_counter() if end is None else end,
+             os.getpid(), thread.native_id, thread.name, args))
+
+
+def add_job(path, start, end, ok, cancelled=False):
+    """记录一个任务从提交到产出结果的跨度（可能经过多个线程，导出为异步事件）"""
+    if _spans is None:
+        return
+    thread = threading.current_thread()
+    _append(('job', os.path.basename(path), 'job', start, end, os.getpid(), thread.native_id, thread.name,
+             {'path': path, 'ok': ok, 'cancelled': cancelled}))
+
+
+@contextmanager
+def span(name, category, args=None):
+    """with 语句包围的代码记为一个跨度"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_span(name, category, start, args=args)
+
+
+def extend(spans, dropped=0):
+    """合并工作进程交回的记录"""
+    global _dropped
+    with _lock:
+        if _spans is None:
+            return
+        room = MAX_SPANS - len(_spans)
+        _spans.extend(spans[:room])
+        _dropped += dropped + max(0, len(spans) - room)
+
+
+def trace_events(spans, dropped=0):
+    """把跨度转换为 Chrome trace-event 列表（时间为微秒，从第一个跨度开始）
+
+    步骤和请求为同一线程中的 B / E 事件；任务跨越多个线程，记为 b / e 异步事件；
+    另外按进程输出"进行中的任务"计数器，显示进程池随时间的利用情况。
+    """
+    if not spans:
+        return []
+    origin = min(span[3] for span in spans)
+    main_pid = os.getpid()
+    threads = {}
+    keyed = []
+    in_flight = []
+
+    def micros(seconds):
+        return round((seconds - origin) * 1e6, 1)
+
+    for job_id, (kind, name, category, start, end, pid, tid, thread_name, args) in enumerate(spans):
+        threads.setdefault((pid, tid), thread_name)
+        end = max(start, end)
+        begin = {'name': name, 'cat': category, 'ts': micros(start), 'pid': pid, 'tid': tid}
+        finish = {'name': name, 'cat': category, 'ts': micros(end), 'pid': pid, 'tid': tid}
+        if args:
+            begin['args'] = args
+        if kind == 'job':
+            begin.update(ph='b', id=job_id)
+            finish.update(ph='e', id=job_id)
+            in_flight.append((start, 1, pid))
+            in_flight.append((end, -1, pid))
+        else:
+            begin['ph'] = 'B'
+            finish['ph'] = 'E'
+        # 同一时刻先结束再开始；开始时间相同时外层先开始，结束时间相同时内层先结束
+        keyed.append(((start, 1, -end), begin))
+        keyed.append(((end, 0, -start), finish))
+    keyed.sort(key=lambda item: item[0])
+
+    events = []
+    for pid in sorted({pid for pid, _ in threads}):
+        label = '主进程' if pid == main_pid else f'工作进程 {pid}'
+        events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': label}})
+    for (pid, tid), thread_name in sorted(threads.items()):
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}})
+    events.extend(event for _, event in keyed)
+
+    counts = {}
+    for moment, delta, pid in sorted(in_flight, key=lambda item: (item[0], item[1])):
+        counts[pid] = counts.get(pid, 0) + delta
+        events.append({'name': '进行中的任务', 'ph': 'C', 'ts': micros(moment), 'pid': pid,
+                       'args': {'jobs': counts[pid]}})
+    if dropped:
+        events.append({'name': 'dropped_spans', 'ph': 'M', 'pid': main_pid, 'tid': 0, 'args': {'count': dropped}})
+    return events
+
+
+def export(path, spans, dropped=0, metadata=None):
+    """把跨度写入 Chrome trace-event JSON 文件；metadata 为附加的说明（例如批次设置）"""
+    data = {'traceEvents': trace_events(spans, dropped), 'displayTimeUnit': 'ms'}
+    if metadata:
+        data['otherData'] = metadata
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
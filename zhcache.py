@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+在线繁体转换的逐行持久化缓存
+以 (转换设置, 行文本) 的哈希为键保存转换结果，按最近使用时间淘汰超出容量的条目，
+并记录累计的命中 / 未命中次数。
+
+缓存保存在用户缓存目录（见 default_cache_dir）的 SQLite 数据库中，
+线程池和进程池中的多个转换任务可以同时读写。
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import threading
+
+CACHE_NAME = 'zhconvert_cache.db'
+DEFAULT_MAX_ENTRIES = 200000
+
+# 一次 SQL 查询中的最大参数个数（SQLite 旧版本的限制为 999）
+_BATCH = 900
+
+
+def default_cache_dir():
+    """当前用户的缓存目录：Windows 为 %LOCALAPPDATA%\\toass，macOS 为 ~/Library/Caches/toass，
+    其他系统为 $XDG_CACHE_HOME/toass（默认 ~/.cache/toass）"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    elif sys.platform == 'darwin':
+        base = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'toass')
+
+
+def default_cache_path():
+    """默认的缓存数据库路径"""
+    return os.path.join(default_cache_dir(), CACHE_NAME)
+
+
+def line_key(settings_key, text):
+    """缓存键：转换设置和行文本的 SHA-1"""
+    return hashlib.sha1(f'{settings_key}\n{text}'.encode('utf-8')).digest()
+
+
+def _batches(items):
+    for i in range(0, len(items), _BATCH):
+        yield items[i:i + _BATCH]
+
+
+class TranslationCache:
+    """容量有限的逐行转换缓存（最近最少使用的条目先被淘汰）"""
+
+    def __init__(self, path=None, settings_key='', max_entries=DEFAULT_MAX_ENTRIES):
+        """path 为 None 时使用 default_cache_path()，目录不存在时自动创建"""
+        self.path = path or default_cache_path()
+        self.settings_key = settings_key
+        self.max_entries = max_entries
+        # 本进程内的统计，累计统计保存在数据库中
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._conn:
+            # WAL 模式下读写互不阻塞，适合多个进程同时转换
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS lines '
+                               '(key BLOB PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS lines_used ON lines (used)')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+
+    def get_many(self, texts):
+        """查询一组行，返回 {原文: 转换结果}，只包含命中的行"""
+        unique = list(dict.fromkeys(texts))
+        keys = {line_key(self.settings_key, text): text for text in unique}
+        found = {}
+        with self._lock, self._conn:
+            for batch in _batches(list(keys)):
+                rows = self._conn.execute(
+                    'SELECT key, value FROM lines WHERE key IN (%s)' % ','.join('?' * len(batch)), batch
+                ).fetchall()
+                for key, value in rows:
+                    found[keys[key]] = value
+                # 刷新命中条目的使用时间
+                hit_keys = [(time.time(), key) for key, _ in rows]
+                self._conn.executemany('UPDATE lines SET used = ? WHERE key = ?', hit_keys)
+
+            hits = len(found)
+            misses = len(unique) - hits
+            self.hits += hits
+            self.misses += misses
+            self._conn.executemany(
+                'INSERT INTO stats (name, value) VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+                [('hits', hits), ('misses', misses)]
+            )
+        return found
+
+    def put_many(self, pairs):
+        """保存 (原文, 转换结果) 对，超出容量时淘汰最久未使用的条目"""
+        now = time.time()
+        rows = [(line_key(self.settings_key, text), value, now) for text, value in pairs]
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO lines (key, value, used) VALUES (?, ?, ?)', rows)
+            count = self._conn.execute('SELECT COUNT(*) FROM lines').fetchone()[0]
+            if count > self.max_entries:
+                # 多淘汰一成，避免每次写入都触发淘汰
+                excess = count - int(self.max_entries * 0.9)
+                self._conn.execute(
+                    'DELETE FROM lines WHERE key IN (SELECT key FROM lines ORDER BY used LIMIT ?)', (excess,)
+                )
+
+    def stats(self):
+        """返回缓存统计：条目数、累计和本进程的命中 / 未命中次数"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM lines').fetchone()[0]
+            totals = dict(self._conn.execute('SELECT name, value FROM stats').fetchall())
+        total_hits = totals.get('hits', 0)
+        total_misses = totals.get('misses', 0)
+        looked_up = total_hits + total_misses
+        return {
+            'path': self.path,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'hits': total_hits,
+            'misses': total_misses,
+            'hit_rate': round(total_hits / looked_up, 4) if looked_up else 0.0,
+            'session_hits': self.hits,
+            'session_misses': self.misses,
+        }
+
+    def clear(self):
+        """清空缓存条目和统计"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM lines')
+            self._conn.execute('DELETE FROM stats')
+        with self._lock:
+            self._conn.execute('VACUUM')
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
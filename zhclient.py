@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+繁化姬在线转换客户端
+复用连接（Session 长连接和连接池）、可配置代理、可选 gzip 压缩请求体，
+按令牌桶限制请求速率，遇到网络错误、429 和 5xx 时按指数退避重试，并记录每个请求的耗时。
+结果已经不需要（任务已取消）时，等待令牌、等待响应和重试前的等待都会在 ABANDON_POLL_INTERVAL 内结束。
+
+令牌桶默认只在本进程内共享；进程池通过 install_shared_limiter 让所有工作进程共用一个令牌桶。
+"""
+
+import gzip
+import json
+import math
+import time
+import random
+import threading
+import email.utils
+from collections import deque
+
+from timings import percentile
+
+DEFAULT_URL = 'https://api.zhconvert.org/convert'
+
+HEADERS = {
+    'accept': 'application/json, text/plain, */*',
+    'content-type': 'application/json',
+    'origin': 'http://zhconvert.org',
+    'referer': 'http://zhconvert.org/',
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36'
+}
+
+# 可以重试的 HTTP 状态码
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# 保留的耗时记录条数
+LATENCY_HISTORY = 10000
+# 两次重试之间的最长等待（秒），服务端的 Retry-After 也不超过该值
+DEFAULT_MAX_BACKOFF = 30.0
+# 等待期间检查结果是否已经不需要的间隔（秒）
+ABANDON_POLL_INTERVAL = 0.05
+
+
+class RequestAbandoned(Exception):
+    """请求的结果已经不需要（任务已取消），不再等待"""
+
+
+def _sleep(seconds, abandoned=None):
+    """等待 seconds 秒；abandoned 返回 True 时提前结束并返回 True"""
+    if abandoned is None:
+        time.sleep(seconds)
+        return False
+    deadline = time.monotonic() + seconds
+    while not abandoned():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(remaining, ABANDON_POLL_INTERVAL))
+    return True
+
+
+class TokenBucket:
+    """令牌桶限速器
+
+    shared 为 multiprocessing.Array('d', 2) 时状态保存在共享内存中，多个进程共用一个令牌桶；
+    速率和容量在每次取令牌时传入，同一个令牌桶可以服务不同设置的客户端。
+    """
+
+    def __init__(self, shared=None):
+        if shared is None:
+            self._state = [0.0, 0.0]
+            self._lock = threading.Lock()
+        else:
+            self._state = shared
+            self._lock = shared.get_lock()
+
+    def acquire(self, rate, capacity, abandoned=None):
+        """取一个令牌，必要时等待；返回等待的秒数。rate <= 0 表示不限速
+
+        abandoned 返回 True 时不再等待，抛出 RequestAbandoned。
+        """
+        if rate <= 0:
+            return 0.0
+        capacity = max(1.0, capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._state[0], self._state[1]
+                if last == 0:
+                    tokens = capacity
+                else:
+                    tokens = min(capacity, tokens + (now - last) * rate)
+                if tokens >= 1:
+                    self._state[0] = tokens - 1
+                    self._state[1] = now
+                    return waited
+                self._state[0] = tokens
+                self._state[1] = now
+                wait = (1 - tokens) / rate
+            if _sleep(wait, abandoned):
+                raise RequestAbandoned()
+            waited += wait
+
+
+# 本进程使用的令牌桶
+_limiter = TokenBucket()
+
+
+def install_shared_limiter(shared):
+    """让本进程使用跨进程共享的令牌桶（在进程池的初始化函数中调用）"""
+    global _limiter
+    _limiter = TokenBucket(shared)
+
+
+def parse_retry_after(value, now=None):
+    """解析 Retry-After 头：秒数或 HTTP 日期，返回需要等待的秒数，无法解析时返回 None"""
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if when is None:
+            return None
+        seconds = when.timestamp() - (time.time() if now is None else now)
+    if math.isnan(seconds):
+        return None
+    return max(0.0, seconds)
+
+
+class ZhConvertClient:
+    """繁化姬 API 客户端，可在多个线程中共用"""
+
+    def __init__(self, url=DEFAULT_URL, proxy=None, timeout=30, gzip_body=False,
+                 rate=0, burst=1, retries=3, backoff=0.5, pool_size=8, max_backoff=DEFAULT_MAX_BACKOFF):
+        """proxy 为 None 时使用系统代理设置，为空字符串时直连；max_backoff 为两次重试之间的最长等待（秒）"""
+        # requests 导入较慢，只在真正需要时加载
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = url
+        self.timeout = timeout
+        self.gzip_body = gzip_body
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(HEADERS)
+        if proxy == '':
+            self.session.trust_env = False
+        elif proxy:
+            self.session.proxies = {'http': proxy, 'https': proxy}
+
+        self._metrics_lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_HISTORY)
+        self.requests = 0
+        self.failures = 0
+        self.retried = 0
+        self.throttled_seconds = 0.0
+        self.bytes_sent = 0
+
+    def _post(self, payload, abandoned=None):
+        """发送一次请求，返回响应对象；abandoned 返回 True 时抛出 RequestAbandoned"""
+        body = json.dumps(payload).encode('utf-8')
+        headers = {}
+        if self.gzip_body:
+            body = gzip.compress(body)
+            headers['content-encoding'] = 'gzip'
+
+        waited = _limiter.acquire(self.rate, self.burst, abandoned)
+        start = time.perf_counter()
+        try:
+            if abandoned is None:
+                response = self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+            else:
+                response = self._post_abandonable(body, headers, abandoned)
+        finally:
+            with self._metrics_lock:
+                self._latencies.append(time.perf_counter() - start)
+                self.requests += 1
+                self.throttled_seconds += waited
+                self.bytes_sent += len(body)
+        return response
+
+    def _post_abandonable(self, body, headers, abandoned):
+        """在辅助线程中发送请求，每隔 ABANDON_POLL_INTERVAL 秒检查一次 abandoned
+
+        结果不再需要时立即放弃等待并抛出 RequestAbandoned，调用者（调度器的请求线程）随即空出来；
+        requests 无法从其他线程中断正在读取响应的连接（关闭 Session 只关闭空闲连接），
+        放弃的请求在辅助线程中最多再持续 timeout 秒，结束后连接回到连接池，结果丢弃。
+        """
+        outcome = {}
+        done = threading.Event()
+
+        def send():
+            try:
+                outcome['response'] = self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+            except BaseException as e:
+                outcome['error'] = e
+            finally:
+                done.set()
+
+        # 守护线程：退出程序时不等待放弃的请求
+        threading.Thread(target=send, name='zhconvert-http', daemon=True).start()
+        while not done.wait(ABANDON_POLL_INTERVAL):
+            if abandoned():
+                raise RequestAbandoned()
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['response']
+
+    def _retry_delay(self, attempt, response=None):
+        """第 attempt 次重试前的等待时间：指数退避加随机抖动，优先使用 Retry-After，都不超过 max_backoff"""
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+            if retry_after:
+                seconds = parse_retry_after(retry_after)
+                if seconds is not None:
+                    return min(seconds, self.max_backoff)
+        return min(self.backoff * (2 ** attempt), self.max_backoff) * (0.5 + random.random() / 2)
+
+    def convert(self, text, options, abandoned=None):
+        """转换文本，options 为繁化姬的转换参数；失败时抛出异常
+
+        abandoned 为无参数的函数，返回 True 表示结果已经不需要（任务已取消）：此时不再重试，
+        正在进行的等待在 ABANDON_POLL_INTERVAL 内结束：等待令牌或响应时抛出 RequestAbandoned，
+        等待重试时抛出上一次请求的错误。
+        """
+        import requests
+
+        payload = {'text': text, **options, 'diffEnable': False, 'outputFormat': 'json'}
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self._post(payload, abandoned)
+                if response.status_code == 200:
+                    result = response.json()
+                    if result.get('code') == 0:
+                        return result.get('data', {}).get('text', text)
+                    # 接口返回的业务错误不重试
+                    with self._metrics_lock:
+                        self.failures += 1
+                    raise Exception(f"API Error: {result.get('msg', 'Unknown error')}")
+                error = Exception(f"HTTP Error: {response.status_code}")
+                retryable = response.status_code in RETRY_STATUS
+            except requests.exceptions.RequestException as e:
+                error = Exception(f"Request Error: {str(e)}")
+                retryable = True
+
+            if not retryable or attempt >= self.retries or (abandoned and abandoned()):
+                with self._metrics_lock:
+                    self.failures += 1
+                raise error
+            if _sleep(self._retry_delay(attempt, response), abandoned):
+                with self._metrics_lock:
+                    self.failures += 1
+                raise error
+            attempt += 1
+            with self._metrics_lock:
+                self.retried += 1
+
+    def metrics(self):
+        """返回请求统计和耗时分布（毫秒）"""
+        with self._metrics_lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'requests': self.requests,
+                'failures': self.failures,
+                'retries': self.retried,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+                'bytes_sent': self.bytes_sent,
+            }
+        stats['latency_ms'] = {
+            'mean': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p95': round(percentile(latencies, 95) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+        return stats
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+在线繁体转换请求合并与分块
+同一进程内多个转换任务提交的文本行由一个后台线程收集，打包成不超过指定大小的请求，
+超长的文本切成多个分块，多个请求并发发送，结果再按行切回各自的任务。
+
+每一行在请求中都带有行号标记，返回结果按标记逐行对应；
+服务端丢行、插入换行或打乱顺序时抛出 MisalignmentError，而不是静默地错位。
+任务取消时排队中的分块直接丢弃，只属于已取消任务的请求不再重试。
+"""
+
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+from batch import ConversionCancelled
+
+# 单个请求的最大字符数
+DEFAULT_MAX_PAYLOAD = 100000
+# 同时发送的请求数
+DEFAULT_CONCURRENCY = 4
+# 收到第一组文本后等待其他任务加入的时间（秒）
+DEFAULT_LINGER = 0.05
+
+# 行号标记：只用 ASCII 字符，繁体转换不会改变
+LINE_MARKER = '[[%d]]'
+_MARKER_RE = re.compile(r'\[\[(\d+)\]\]')
+# 估算请求大小时每行额外计入的字符数（行号标记和换行）
+_LINE_OVERHEAD = 10
+
+
+class MisalignmentError(Exception):
+    """转换结果无法与原文逐行对应"""
+
+
+def mark_lines(texts):
+    """给每行加上行号标记并用换行连接"""
+    return '\n'.join(LINE_MARKER % i + text for i, text in enumerate(texts))
+
+
+def unmark_lines(converted, texts):
+    """按行号标记还原转换结果，返回与 texts 一一对应的列表
+
+    原文本身含换行时，后续没有标记的行属于同一条；
+    标记缺失、重复、乱序或某行的换行数与原文不同时抛出 MisalignmentError。
+    """
+    results = []
+    for line in converted.split('\n'):
+        m = _MARKER_RE.match(line)
+        if m and int(m.group(1)) == len(results):
+            results.append(line[m.end():])
+        elif results:
+            results[-1] += '\n' + line
+        else:
+            raise MisalignmentError('在线转换结果缺少第 0 行的标记')
+
+    if len(results) != len(texts):
+        raise MisalignmentError(f'在线转换结果行数不一致：发送 {len(texts)} 行，对应上 {len(results)} 行')
+    for i, (text, result) in enumerate(zip(texts, results)):
+        if result.count('\n') != text.count('\n'):
+            raise MisalignmentError(f'在线转换结果第 {i} 行的换行与原文不一致')
+    return results
+
+
+class _Group:
+    """一个任务提交的一组文本行"""
+
+    def __init__(self, count):
+        self.result = [None] * count
+        self.remaining = count
+        self.done = threading.Event()
+        self.error = None
+        # 携带本组文本的请求数和这些请求的耗时合计（秒）
+        self.requests = 0
+        self.http_seconds = 0.0
+
+
+class _Piece:
+    """一组文本中连续的若干行，是打包请求的最小单位"""
+
+    def __init__(self, group, start, texts):
+        self.group = group
+        self.start = start
+        self.texts = texts
+        self.size = sum(len(text) + _LINE_OVERHEAD for text in texts)
+
+
+class ConversionDispatcher:
+    """把多个任务的文本合并、分块，并发发送
+
+    convert_func 接收以换行连接的文本和关键字参数 abandoned（无参数的函数，请求的结果已经没有任务需要时返回 True），
+    返回转换后的文本，需要可以在多个线程中同时调用。
+    """
+
+    def __init__(self, convert_func, max_payload=DEFAULT_MAX_PAYLOAD, concurrency=DEFAULT_CONCURRENCY,
+                 linger=DEFAULT_LINGER):
+        self.convert_func = convert_func
+        self.max_payload = max_payload
+        self.concurrency = max(1, concurrency)
+        self.linger = linger
+        self.requests = 0
+        self.groups = 0
+        self._pending = []
+        self._cond = threading.Condition()
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(self.concurrency)
+        self._executor = None
+        self._thread = None
+
+    def convert(self, lines, token=None, stats=None):
+        """提交一组文本行并等待结果，返回转换后的行列表（与输入逐行对应）
+
+        token 为 batch.CancelToken 时，取消后立即抛出 ConversionCancelled，排队中的分块不再发送。
+        stats 为字典时累加 payload_chars（本组文本的字符数）、http_requests 和 http_seconds
+        （携带本组文本的请求数和耗时，请求同时携带其他任务的文本时耗时计入每个任务）。
+        """
+        if not lines:
+            return []
+        group = _Group(len(lines))
+        pieces = self._split(group, lines)
+        with self._cond:
+            self.groups += 1
+            self._pending.extend(pieces)
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix='zhconvert-request')
+                self._thread = threading.Thread(target=self._loop, name='zhconvert-dispatcher', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        unregister = token.register(lambda: self._cancel(group)) if token else None
+        try:
+            group.done.wait()
+        finally:
+            if unregister:
+                unregister()
+        if stats is not None:
+            stats['payload_chars'] = stats.get('payload_chars', 0) + sum(len(text) for text in lines)
+            with self._lock:
+                requests, http_seconds = group.requests, group.http_seconds
+            stats['http_requests'] = stats.get('http_requests', 0) + requests
+            stats['http_seconds'] = stats.get('http_seconds', 0.0) + http_seconds
+        if group.error is not None:
+            raise group.error
+        return group.result
+
+    def _split(self, group, lines):
+        """把一组文本切成不超过单个请求大小的分块"""
+        pieces = []
+        start = 0
+        size = 0
+        for i, text in enumerate(lines):
+            line_size = len(text) + _LINE_OVERHEAD
+            if i > start and size + line_size > self.max_payload:
+                pieces.append(_Piece(group, start, lines[start:i]))
+                start = i
+                size = 0
+            size += line_size
+        pieces.append(_Piece(group, start, lines[start:]))
+        return pieces
+
+    def _cancel(self, group):
+        """取消一组文本：从队列中移除它的分块并唤醒等待的任务"""
+        with self._cond:
+            self._pending = [piece for piece in self._pending if piece.group is not group]
+        with self._lock:
+            if group.error is None:
+                group.error = ConversionCancelled()
+        group.done.set()
+
+    def _pending_size(self):
+        return sum(piece.size for piece in self._pending)
+
+    def _take_batch(self):
+        """从队列头部取出总大小不超过上限的若干分块（至少一块）"""
+        batch = [self._pending.pop(0)]
+        size = batch[0].size
+        while self._pending and size + self._pending[0].size <= self.max_payload:
+            piece = self._pending.pop(0)
+            size += piece.size
+            batch.append(piece)
+        return batch
+
+    def _loop(self):
+        while True:
+            # 请求数达到并发上限时不取新的批次，让队列中的文本继续合并
+            self._slots.acquire()
+            submitted = False
+            try:
+                with self._cond:
+                    while not self._pending:
+                        self._cond.wait()
+                    # 等待其他任务的文本加入，凑满一个请求或超时后发送
+                    deadline = time.monotonic() + self.linger
+                    while self._pending_size() < self.max_payload:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    # 等待期间任务被取消、分块已从队列中移除时重新等待
+                    if not self._pending:
+                        continue
+                    batch = self._take_batch()
+                self._executor.submit(self._run, batch)
+                submitted = True
+            finally:
+                # 没有交给发送线程时归还名额（发送线程在 _run 结束时归还）
+                if not submitted:
+                    self._slots.release()
+
+    def _run(self, batch):
+        try:
+            self._send(batch)
+        finally:
+            self._slots.release()
+
+    def _send(self, batch):
+        """发送一批分块并把结果按行号分回各组"""
+        # 同一任务的其他分块已经失败时不再发送
+        batch = [piece for piece in batch if piece.group.error is None]
+        if not batch:
+            return
+        texts = [text for piece in batch for text in piece.texts]
+        try:
+            with self._lock:
+                self.requests += 1
+            abandoned = lambda: all(piece.group.error is not None for piece in batch)
+            start = time.perf_counter()
+            try:
+                converted = self.convert_func(mark_lines(texts), abandoned=abandoned)
+            finally:
+                end = time.perf_counter()
+                groups = {id(piece.group): piece.group for piece in batch}.values()
+                with self._lock:
+                    for group in groups:
+                        group.requests += 1
+                        group.http_seconds += end - start
+                tracing.add_span('http', 'http', start, end, {'lines': len(texts), 'groups': len(groups)})
+            results = unmark_lines(converted, texts)
+        except MisalignmentError as e:
+            if len(batch) > 1:
+                # 无法确定是哪一块出错，逐块重新发送，只让出错的任务失败
+                for piece in batch:
+                    self._send([piece])
+                return
+            self._fail(batch, e)
+            return
+        except Exception as e:
+            self._fail(batch, e)
+            return
+
+        pos = 0
+        for piece in batch:
+            group = piece.group
+            count = len(piece.texts)
+            group.result[piece.start:piece.start + count] = results[pos:pos + count]
+            pos += count
+            with self._lock:
+                group.remaining -= count
+                finished = group.remaining == 0
+            if finished:
+                group.done.set()
+
+    def _fail(self, batch, error):
+        for piece in batch:
+            group = piece.group
+            with self._lock:
+                if group.error is None:
+                    group.error = error
+            group.done.set()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线繁体中国化转换
+使用 zhdict 目录中的 OpenCC 词典（台湾正体 → 大陆简体，含地区用语），
+词组按最长匹配优先替换，其余单字用 str.translate 批量转换，全程不访问网络。
+
+词典在每个进程第一次使用时编译一次，之后的调用直接复用。
+"""
+
+import os
+import re
+import sys
+import hashlib
+import functools
+
+# 打包后数据文件位于 PyInstaller 的解压目录
+DICT_DIR = os.path.join(getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__))), 'zhdict')
+
+# 转换链：先把台湾用语和异体字换成大陆用语，再把繁体换成简体（同 OpenCC tw2sp）
+# 同一组内的词典取最长匹配，长度相同时排在前面的词典优先
+CONVERSION_CHAIN = (
+    ('TWPhrasesRev.txt', 'TWVariantsRevPhrases.txt', 'TWVariantsRev.txt'),
+    ('TSPhrases.txt', 'TSCharacters.txt'),
+)
+
+
+def load_dictionary(filename):
+    """读取词典文件，每行为 原文<TAB>候选1 候选2 ...，只取第一个候选"""
+    entries = {}
+    with open(os.path.join(DICT_DIR, filename), 'r', encoding='utf-8') as f:
+        for line in f:
+            key, _, values = line.strip().partition('\t')
+            if key and values:
+                entries[key] = values.split(' ')[0]
+    return entries
+
+
+class ConversionStage:
+    """一组词典编译成的最长匹配转换器
+
+    单字映射编译成 str.translate 的转换表；多字词组按首字索引候选长度，
+    只在可能是词组开头的位置做字典查找。
+    """
+
+    def __init__(self, dictionaries):
+        table = {}
+        for entries in dictionaries:
+            for key, value in entries.items():
+                table.setdefault(key, value)
+
+        self.chars = str.maketrans({k: v for k, v in table.items() if len(k) == 1})
+        self.phrases = {k: v for k, v in table.items() if len(k) > 1}
+
+        lengths = {}
+        for key in self.phrases:
+            lengths.setdefault(key[0], set()).add(len(key))
+        # 同一首字的候选长度从长到短尝试，保证最长匹配
+        self.lengths = {c: sorted(ls, reverse=True) for c, ls in lengths.items()}
+        self.starts = None
+        if self.lengths:
+            self.starts = re.compile('[%s]' % ''.join(re.escape(c) for c in sorted(self.lengths)))
+
+    def convert(self, text):
+        """转换一段文本"""
+        if self.starts is None:
+            return text.translate(self.chars)
+
+        phrases = self.phrases
+        lengths = self.lengths
+        chars = self.chars
+        parts = []
+        pos = 0
+        for m in self.starts.finditer(text):
+            i = m.start()
+            if i < pos:
+                # 已被前面的词组覆盖
+                continue
+            for length in lengths[text[i]]:
+                value = phrases.get(text[i:i + length])
+                if value is not None:
+                    parts.append(text[pos:i].translate(chars))
+                    parts.append(value)
+                    pos = i + length
+                    break
+        if not parts:
+            return text.translate(chars)
+        parts.append(text[pos:].translate(chars))
+        return ''.join(parts)
+
+
+class LocalConverter:
+    """按顺序执行转换链中的各个阶段"""
+
+    def __init__(self, chain=CONVERSION_CHAIN):
+        self.stages = [ConversionStage([load_dictionary(name) for name in group]) for group in chain]
+
+    def convert(self, text):
+        """转换一段文本"""
+        for stage in self.stages:
+            text = stage.convert(text)
+        return text
+
+
+@functools.lru_cache(maxsize=None)
+def dictionary_version():
+    """转换链和词典内容的哈希，词典更新后据此判断已有输出需要重新生成"""
+    digest = hashlib.sha1(repr(CONVERSION_CHAIN).encode('utf-8'))
+    for group in CONVERSION_CHAIN:
+        for filename in group:
+            with open(os.path.join(DICT_DIR, filename), 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def get_converter():
+    """返回当前进程共用的转换器，第一次调用时加载词典"""
+    return LocalConverter()
+
+
+def convert_to_china_text(text):
+    """繁体中国化（离线）"""
+    return get_converter().convert(text)
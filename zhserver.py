@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+繁化姬 API 本地模拟服务
+接口与 https://api.zhconvert.org/convert 相同，使用离线词典转换，
+可以模拟网络延迟、服务端错误和限流，用于离线测试在线转换客户端的吞吐量和容错。
+
+用法:
+  python zhserver.py [--port 8765] [--latency 0.05] [--error-rate 0.1] [--throttle-rate 0.05]
+  python cli.py convert 文件... --china --china-engine online --url http://127.0.0.1:8765/convert --proxy ""
+"""
+
+import sys
+import gzip
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import zhlocal
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """处理转换请求，行为由服务器对象上的参数控制"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, extra_headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server.count('requests')
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+            server.count('gzip_requests')
+
+        if server.latency or server.latency_per_kchar:
+            time.sleep(server.latency + server.latency_per_kchar * len(body) / 1000)
+
+        roll = server.rng.random()
+        if roll < server.throttle_rate:
+            server.count('throttled')
+            self.send_json(429, {'code': 429, 'msg': 'Too Many Requests'}, {'Retry-After': '0.1'})
+            return
+        if roll < server.throttle_rate + server.error_rate:
+            server.count('errors')
+            self.send_json(503, {'code': 503, 'msg': 'Service Unavailable'})
+            return
+
+        try:
+            data = json.loads(body.decode('utf-8'))
+        except ValueError:
+            self.send_json(400, {'code': 400, 'msg': 'Bad Request'})
+            return
+
+        text = data.get('text', '')
+        server.count('chars', len(text))
+        self.send_json(200, {'code': 0, 'msg': '', 'data': {'text': zhlocal.convert_to_china_text(text)}})
+
+
+class StandInServer(ThreadingHTTPServer):
+    """模拟服务，记录连接数、请求数、错误数和字符数"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, latency_per_kchar=0.0, error_rate=0.0, throttle_rate=0.0,
+                 seed=0, verbose=False):
+        super().__init__(address, StandInHandler)
+        self.latency = latency
+        # 与请求大小成正比的延迟（每千字节的秒数），模拟服务端按文本长度处理的耗时
+        self.latency_per_kchar = latency_per_kchar
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.verbose = verbose
+        self.rng = random.Random(seed)
+        self.stats = {'connections': 0, 'requests': 0, 'gzip_requests': 0, 'errors': 0, 'throttled': 0, 'chars': 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, name, value=1):
+        with self._stats_lock:
+            self.stats[name] += value
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/convert'
+
+
+def start_server(port=0, **kwargs):
+    """在后台线程中启动模拟服务（port 为 0 时自动选择端口），返回服务器对象"""
+    server = StandInServer(('127.0.0.1', port), **kwargs)
+    threading.Thread(target=server.serve_forever, name='zhconvert-stand-in', daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    """主函数"""
+    parser = argparse.ArgumentParser(description='繁化姬 API 本地模拟服务')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口（默认 8765）')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--latency-per-kchar', type=float, default=0.0, help='每千字节请求体增加的延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 503 的概率')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='返回 429 的概率')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出每个请求的日志')
+    args = parser.parse_args(argv)
+
+    server = StandInServer(('127.0.0.1', args.port), latency=args.latency,
+                           latency_per_kchar=args.latency_per_kchar, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, verbose=args.verbose)
+    print(f"模拟服务已启动: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())